@@ -0,0 +1,107 @@
+-- Change feed: NOTIFY on writes so the Python service can invalidate its
+-- in-process caches and stream lifecycle changes over SSE.
+-- Payloads stay small (table, op, ids, lifecycle fields) to remain well
+-- under the 8000-byte NOTIFY limit. Fields are read off the row directly,
+-- so large JSONB columns are never serialized just to build a payload.
+
+CREATE OR REPLACE FUNCTION ecolab_notify_change() RETURNS trigger AS $$
+DECLARE
+  rec record;
+  payload jsonb;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    rec := OLD;
+  ELSE
+    rec := NEW;
+  END IF;
+
+  payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'id', rec."id");
+  IF TG_TABLE_NAME = 'BinderTest' THEN
+    payload := payload || jsonb_build_object(
+      'binderTestId', rec."id",
+      'lifecycleStatus', rec."lifecycleStatus",
+      'status', rec."status"
+    );
+  ELSIF TG_TABLE_NAME = 'BinderTestSummary' THEN
+    payload := payload || jsonb_build_object(
+      'binderTestId', rec."binderTestId",
+      'status', rec."status",
+      'version', rec."version"
+    );
+  END IF;
+
+  PERFORM pg_notify('ecolab_changes', payload::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Metrics are written and confirmed in batches: one NOTIFY per binder test
+-- per statement instead of one per metric row.
+CREATE OR REPLACE FUNCTION ecolab_notify_metric_change() RETURNS trigger AS $$
+DECLARE
+  test_id text;
+  row_count bigint;
+BEGIN
+  FOR test_id, row_count IN
+    SELECT "binderTestId", COUNT(*) FROM changed_rows GROUP BY "binderTestId"
+  LOOP
+    PERFORM pg_notify(
+      'ecolab_changes',
+      jsonb_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'binderTestId', test_id,
+        'rows', row_count
+      )::text
+    );
+  END LOOP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  tbl text;
+BEGIN
+  FOREACH tbl IN ARRAY ARRAY[
+    'BinderTest',
+    'BinderTestSummary',
+    'BitumenBaseTest',
+    'BitumenOrigin',
+    'CapsuleFormula',
+    'CapsuleFormulaMaterial',
+    'PmaFormula',
+    'PmaBatch',
+    'User'
+  ]
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', tbl || '_notify_change', tbl);
+    EXECUTE format(
+      'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I FOR EACH ROW EXECUTE FUNCTION ecolab_notify_change()',
+      tbl || '_notify_change',
+      tbl
+    );
+  END LOOP;
+END;
+$$;
+
+-- Transition tables allow a single event per trigger, hence three statement-level triggers.
+DROP TRIGGER IF EXISTS "BinderTestMetric_notify_change" ON "BinderTestMetric";
+DROP TRIGGER IF EXISTS "BinderTestMetric_notify_insert" ON "BinderTestMetric";
+DROP TRIGGER IF EXISTS "BinderTestMetric_notify_update" ON "BinderTestMetric";
+DROP TRIGGER IF EXISTS "BinderTestMetric_notify_delete" ON "BinderTestMetric";
+
+CREATE TRIGGER "BinderTestMetric_notify_insert"
+  AFTER INSERT ON "BinderTestMetric"
+  REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION ecolab_notify_metric_change();
+
+CREATE TRIGGER "BinderTestMetric_notify_update"
+  AFTER UPDATE ON "BinderTestMetric"
+  REFERENCING NEW TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION ecolab_notify_metric_change();
+
+CREATE TRIGGER "BinderTestMetric_notify_delete"
+  AFTER DELETE ON "BinderTestMetric"
+  REFERENCING OLD TABLE AS changed_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION ecolab_notify_metric_change();
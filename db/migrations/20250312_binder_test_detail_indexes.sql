@@ -0,0 +1,11 @@
+-- Indexes for binder test detail / batch-get lookups.
+
+-- BinderTest."batchId" is text while TestResult."batchId" is integer, so the
+-- linked-result lookup compares tr."batchId"::text. An expression index on the
+-- same cast (with createdAt for the "latest result" ordering) lets it seek
+-- instead of scanning TestResult.
+CREATE INDEX IF NOT EXISTS "TestResult_batchId_text_createdAt_idx"
+  ON "TestResult" ((("batchId")::text), "createdAt" DESC);
+
+CREATE INDEX IF NOT EXISTS "BinderTestDataFile_binderTestId_createdAt_idx"
+  ON "BinderTestDataFile" ("binderTestId", "createdAt" DESC);
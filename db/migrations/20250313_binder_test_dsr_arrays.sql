@@ -0,0 +1,9 @@
+-- Compact column-array copy of BinderTest."dsrData" (see ecolab-python/services/dsr_arrays.py
+-- for the packed layout). "dsrArraysSourceHash" is md5("dsrData"::text) when the arrays were
+-- derived from dsrData, so stale copies are detectable; NULL marks arrays uploaded directly.
+ALTER TABLE "BinderTest"
+  ADD COLUMN IF NOT EXISTS "dsrArrays" bytea,
+  ADD COLUMN IF NOT EXISTS "dsrArraysSourceHash" text;
+
+-- Float data barely compresses; skip pglz and store out of line.
+ALTER TABLE "BinderTest" ALTER COLUMN "dsrArrays" SET STORAGE EXTERNAL;
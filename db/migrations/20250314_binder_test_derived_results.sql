@@ -0,0 +1,57 @@
+-- Derived results (DSR smoothing, PG grade, trendlines, viscosity) computed by the Python
+-- service when metrics are confirmed. One current row per binder test, tagged with the
+-- confirmed-metrics hash it was computed from.
+
+CREATE TABLE IF NOT EXISTS "BinderTestDerivedResult" (
+  "binderTestId" text PRIMARY KEY REFERENCES "BinderTest"("id") ON DELETE CASCADE,
+  "metricsHash" text NOT NULL,
+  "workupVersion" integer NOT NULL,
+  "results" jsonb NOT NULL,
+  "computedAt" timestamptz NOT NULL DEFAULT now()
+);
+
+-- Any change to confirmed metrics or to the raw DSR data makes the stored row stale, whichever
+-- application performed the write.
+CREATE OR REPLACE FUNCTION ecolab_invalidate_derived_results() RETURNS trigger AS $$
+DECLARE
+  target text;
+BEGIN
+  IF TG_TABLE_NAME = 'BinderTest' THEN
+    target := NEW."id";
+  ELSIF TG_OP = 'DELETE' THEN
+    target := OLD."binderTestId";
+  ELSE
+    target := NEW."binderTestId";
+  END IF;
+  DELETE FROM "BinderTestDerivedResult" WHERE "binderTestId" = target;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "BinderTestMetric_invalidate_derived_ins" ON "BinderTestMetric";
+CREATE TRIGGER "BinderTestMetric_invalidate_derived_ins"
+  AFTER INSERT ON "BinderTestMetric"
+  FOR EACH ROW WHEN (NEW."isUserConfirmed")
+  EXECUTE FUNCTION ecolab_invalidate_derived_results();
+
+DROP TRIGGER IF EXISTS "BinderTestMetric_invalidate_derived_upd" ON "BinderTestMetric";
+CREATE TRIGGER "BinderTestMetric_invalidate_derived_upd"
+  AFTER UPDATE ON "BinderTestMetric"
+  FOR EACH ROW WHEN (OLD."isUserConfirmed" OR NEW."isUserConfirmed")
+  EXECUTE FUNCTION ecolab_invalidate_derived_results();
+
+DROP TRIGGER IF EXISTS "BinderTestMetric_invalidate_derived_del" ON "BinderTestMetric";
+CREATE TRIGGER "BinderTestMetric_invalidate_derived_del"
+  AFTER DELETE ON "BinderTestMetric"
+  FOR EACH ROW WHEN (OLD."isUserConfirmed")
+  EXECUTE FUNCTION ecolab_invalidate_derived_results();
+
+DROP TRIGGER IF EXISTS "BinderTest_invalidate_derived" ON "BinderTest";
+CREATE TRIGGER "BinderTest_invalidate_derived"
+  AFTER UPDATE OF "dsrData", "dsrArrays" ON "BinderTest"
+  FOR EACH ROW WHEN (
+    OLD."dsrData" IS DISTINCT FROM NEW."dsrData"
+    -- arrays backfilled from dsrData carry a source hash and hold the same values
+    OR (NEW."dsrArraysSourceHash" IS NULL AND OLD."dsrArrays" IS DISTINCT FROM NEW."dsrArrays")
+  )
+  EXECUTE FUNCTION ecolab_invalidate_derived_results();
@@ -0,0 +1,13 @@
+-- Delta-encoded summary versions. Every version after the first stores "summaryPatch", a JSON
+-- Patch from the previous version; "summaryJson" is only kept on snapshot versions (every
+-- SUMMARY_SNAPSHOT_EVERY-th) and is reconstructed by the Python service for the rest.
+-- Existing rows keep their full summaryJson and act as snapshots.
+
+ALTER TABLE "BinderTestSummary"
+  ALTER COLUMN "summaryJson" DROP NOT NULL,
+  ADD COLUMN IF NOT EXISTS "summaryPatch" jsonb;
+
+ALTER TABLE "BinderTestSummary" DROP CONSTRAINT IF EXISTS "BinderTestSummary_json_or_patch";
+ALTER TABLE "BinderTestSummary"
+  ADD CONSTRAINT "BinderTestSummary_json_or_patch"
+  CHECK ("summaryJson" IS NOT NULL OR "summaryPatch" IS NOT NULL);
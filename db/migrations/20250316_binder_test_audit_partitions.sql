@@ -0,0 +1,108 @@
+-- Monthly range partitioning of "BinderTestAuditEvent" on "performedAt".
+-- Reads with a time window only touch the partitions it overlaps, and old months are retired by
+-- detaching their partition (ecolab_audit_detach_partitions) instead of bulk deletes.
+-- The primary key must include the partition key, so it becomes ("id", "performedAt").
+-- Copying existing rows takes an exclusive lock on the old table for the length of the copy.
+
+ALTER TABLE "BinderTestAuditEvent" RENAME TO "BinderTestAuditEvent_unpartitioned";
+ALTER INDEX IF EXISTS "BinderTestAuditEvent_pkey" RENAME TO "BinderTestAuditEvent_unpartitioned_pkey";
+DROP INDEX IF EXISTS "BinderTestAuditEvent_binderTestId_idx";
+DROP INDEX IF EXISTS "BinderTestAuditEvent_performedAt_idx";
+
+CREATE TABLE "BinderTestAuditEvent" (
+  "id" uuid NOT NULL,
+  "binderTestId" text NOT NULL REFERENCES "BinderTest"("id") ON DELETE CASCADE,
+  "eventType" text NOT NULL,
+  "entityType" text,
+  "entityId" text,
+  "performedByUserId" text,
+  "performedByRole" text,
+  "performedAt" timestamptz NOT NULL DEFAULT now(),
+  "beforeJson" jsonb,
+  "afterJson" jsonb,
+  "notes" text,
+  PRIMARY KEY ("id", "performedAt")
+) PARTITION BY RANGE ("performedAt");
+
+-- Rows for a month without a partition land here; ecolab_audit_ensure_partition moves them out.
+CREATE TABLE "BinderTestAuditEvent_default" PARTITION OF "BinderTestAuditEvent" DEFAULT;
+
+-- Keyset order for the per-test listing, optionally narrowed by event type.
+CREATE INDEX "BinderTestAuditEvent_binderTestId_performedAt_idx"
+  ON "BinderTestAuditEvent" ("binderTestId", "performedAt" DESC, "id" DESC);
+CREATE INDEX "BinderTestAuditEvent_binderTestId_eventType_performedAt_idx"
+  ON "BinderTestAuditEvent" ("binderTestId", "eventType", "performedAt" DESC, "id" DESC);
+
+-- Partition for the (UTC) month containing month_start, e.g. "BinderTestAuditEvent_y2025m03".
+CREATE OR REPLACE FUNCTION ecolab_audit_ensure_partition(month_start date) RETURNS text AS $$
+DECLARE
+  lower_bound timestamptz := date_trunc('month', month_start::timestamp) AT TIME ZONE 'UTC';
+  upper_bound timestamptz := (date_trunc('month', month_start::timestamp) + interval '1 month') AT TIME ZONE 'UTC';
+  part text := 'BinderTestAuditEvent_' || to_char(month_start, '"y"YYYY"m"MM');
+BEGIN
+  IF to_regclass(format('%I', part)) IS NOT NULL THEN
+    RETURN part;
+  END IF;
+  EXECUTE format('CREATE TABLE %I (LIKE "BinderTestAuditEvent" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part);
+  EXECUTE format(
+    'ALTER TABLE %I ADD CONSTRAINT %I CHECK ("performedAt" >= %L AND "performedAt" < %L)',
+    part, part || '_range', lower_bound, upper_bound
+  );
+  -- The default partition may already hold rows for this month; they must move before attaching.
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM "BinderTestAuditEvent_default" WHERE "performedAt" >= %L AND "performedAt" < %L RETURNING *)
+     INSERT INTO %I SELECT * FROM moved',
+    lower_bound, upper_bound, part
+  );
+  EXECUTE format(
+    'ALTER TABLE "BinderTestAuditEvent" ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    part, lower_bound, upper_bound
+  );
+  EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', part, part || '_range');
+  RETURN part;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Current month plus months_ahead, so inserts never fall through to the default partition.
+CREATE OR REPLACE FUNCTION ecolab_audit_ensure_partitions(months_ahead integer DEFAULT 2) RETURNS SETOF text AS $$
+  SELECT ecolab_audit_ensure_partition((date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => n))::date)
+  FROM generate_series(0, months_ahead) AS n;
+$$ LANGUAGE sql;
+
+-- Detach (not drop) every monthly partition that ends on or before cutoff. The detached tables
+-- keep their names and data for archival (pg_dump) and can be dropped afterwards.
+CREATE OR REPLACE FUNCTION ecolab_audit_detach_partitions(cutoff timestamptz) RETURNS SETOF text AS $$
+DECLARE
+  part record;
+BEGIN
+  FOR part IN
+    SELECT c.relname,
+      (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \(''([^'']+)''\)'))[1]::timestamptz AS upper_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = '"BinderTestAuditEvent"'::regclass
+      AND c.relname <> 'BinderTestAuditEvent_default'
+    ORDER BY c.relname
+  LOOP
+    IF part.upper_bound <= cutoff THEN
+      EXECUTE format('ALTER TABLE "BinderTestAuditEvent" DETACH PARTITION %I', part.relname);
+      RETURN NEXT part.relname;
+    END IF;
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One partition per month that has existing events, plus the months ahead.
+SELECT ecolab_audit_ensure_partition(month::date)
+FROM (
+  SELECT DISTINCT date_trunc('month', "performedAt" AT TIME ZONE 'UTC') AS month
+  FROM "BinderTestAuditEvent_unpartitioned"
+) AS months;
+SELECT ecolab_audit_ensure_partitions(2);
+
+INSERT INTO "BinderTestAuditEvent"
+SELECT "id", "binderTestId", "eventType", "entityType", "entityId", "performedByUserId",
+  "performedByRole", "performedAt", "beforeJson", "afterJson", "notes"
+FROM "BinderTestAuditEvent_unpartitioned";
+
+DROP TABLE "BinderTestAuditEvent_unpartitioned";
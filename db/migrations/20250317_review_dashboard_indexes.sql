@@ -0,0 +1,11 @@
+-- Indexes for GET /review/dashboard.
+
+-- Unresolved comment counts per test: an index-only count over ("binderTestId", false).
+CREATE INDEX IF NOT EXISTS "BinderTestPeerComment_binderTestId_resolved_idx"
+  ON "BinderTestPeerComment" ("binderTestId", "resolved");
+
+-- Latest decision per (test, summary version) and the "has this version been decided" probe.
+-- Supersedes the single-column "binderTestId" index, which is a prefix of this one.
+CREATE INDEX IF NOT EXISTS "BinderTestPeerReviewDecision_binderTestId_summaryVersion_idx"
+  ON "BinderTestPeerReviewDecision" ("binderTestId", "summaryVersion", "createdAt" DESC);
+DROP INDEX IF EXISTS "BinderTestPeerReviewDecision_binderTestId_idx";
@@ -0,0 +1,12 @@
+-- Foreign-key indexes for the catalog listings (/db/capsules, /db/pma-formulas) and for
+-- cascading deletes, which otherwise scan the child tables.
+
+-- ("capsuleFormulaId", "createdAt") also serves the per-capsule material ordering.
+CREATE INDEX IF NOT EXISTS "CapsuleFormulaMaterial_capsuleFormulaId_createdAt_idx"
+  ON "CapsuleFormulaMaterial" ("capsuleFormulaId", "createdAt");
+
+CREATE INDEX IF NOT EXISTS "PmaFormula_capsuleFormulaId_idx"
+  ON "PmaFormula" ("capsuleFormulaId");
+
+CREATE INDEX IF NOT EXISTS "PmaBatch_pmaFormulaId_idx"
+  ON "PmaBatch" ("pmaFormulaId");
@@ -0,0 +1,119 @@
+import io
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from services.dsr_arrays import pack_columns, unpack_columns
+
+try:
+  import pyarrow as pa
+except ImportError:  # Arrow IPC payloads are optional
+  pa = None
+
+# Non-JSON request/response bodies for array endpoints, keyed by format name.
+ARRAY_MEDIA_TYPES = {
+  "packed": "application/octet-stream",
+  "npy": "application/x-npy",
+  "arrow": "application/vnd.apache.arrow.stream",
+}
+_FORMAT_FOR_MEDIA_TYPE = {media: name for name, media in ARRAY_MEDIA_TYPES.items()}
+
+_NPY_HEADER_READERS = {
+  (1, 0): np.lib.format.read_array_header_1_0,
+  (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def array_format(content_type: Optional[str]) -> Optional[str]:
+  """Format name for a Content-Type/Accept value, or None for JSON and anything unknown."""
+  media = (content_type or "").split(";")[0].strip().lower()
+  return _FORMAT_FOR_MEDIA_TYPE.get(media)
+
+
+def _as_float64(value: Any, name: str) -> np.ndarray:
+  arr = np.asarray(value)
+  if arr.dtype.kind not in "fiu":
+    raise ValueError(f"Field {name!r} must be numeric")
+  return arr.astype(np.float64, copy=False).reshape(-1)
+
+
+def _select(columns: Mapping[str, Any], fields: List[str]) -> Dict[str, np.ndarray]:
+  missing = [f for f in fields if f not in columns]
+  if missing:
+    raise ValueError(f"Missing array fields: {', '.join(missing)}")
+  return {f: _as_float64(columns[f], f) for f in fields}
+
+
+def _decode_npy(body: bytes, fields: List[str]) -> Dict[str, np.ndarray]:
+  """Structured arrays match by field name; a plain (len(fields), n) array matches by position."""
+  stream = io.BytesIO(body)
+  reader = _NPY_HEADER_READERS.get(np.lib.format.read_magic(stream))
+  if reader is None:
+    raise ValueError("Unsupported .npy version")
+  shape, fortran_order, dtype = reader(stream)
+  if dtype.hasobject:
+    raise ValueError(".npy payloads with object dtype are not accepted")
+  count = int(np.prod(shape))
+  if len(body) - stream.tell() < count * dtype.itemsize:
+    raise ValueError(".npy payload is truncated")
+  arr = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+  arr = arr.reshape(shape, order="F" if fortran_order else "C")
+  if dtype.names:
+    return _select({name: arr[name] for name in dtype.names}, fields)
+  if arr.ndim == 1 and len(fields) == 1:
+    arr = arr.reshape(1, -1)
+  if arr.ndim != 2 or arr.shape[0] != len(fields):
+    raise ValueError(f"Plain .npy payloads must have shape ({len(fields)}, n) in field order {fields}")
+  return _select(dict(zip(fields, arr)), fields)
+
+
+def _decode_arrow(body: bytes, fields: List[str]) -> Dict[str, np.ndarray]:
+  if pa is None:
+    raise ValueError("pyarrow is required for Arrow IPC payloads")
+  try:
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+  except pa.ArrowInvalid as exc:
+    raise ValueError(f"Invalid Arrow IPC stream: {exc}")
+  columns = {}
+  for name in fields:
+    if name not in table.column_names:
+      continue
+    column = table.column(name)
+    if column.null_count:
+      raise ValueError(f"Field {name!r} contains nulls")
+    columns[name] = column.combine_chunks().to_numpy(zero_copy_only=False)
+  return _select(columns, fields)
+
+
+def decode_arrays(body: bytes, fmt: str, fields: List[str]) -> Dict[str, np.ndarray]:
+  """Decode a binary body into one float64 array per field without per-element Python objects."""
+  if fmt == "packed":
+    return _select(unpack_columns(body), fields)
+  if fmt == "npy":
+    return _decode_npy(body, fields)
+  if fmt == "arrow":
+    return _decode_arrow(body, fields)
+  raise ValueError(f"Unsupported array format {fmt!r}")
+
+
+def encode_arrays(columns: Mapping[str, Any], fmt: str) -> bytes:
+  arrays = {name: np.atleast_1d(np.asarray(values, dtype=np.float64)) for name, values in columns.items()}
+  if fmt == "packed":
+    return pack_columns(arrays)
+  if fmt == "npy":
+    rows = next(iter(arrays.values())).size
+    out = np.empty(rows, dtype=[(name, "<f8") for name in arrays])
+    for name, values in arrays.items():
+      out[name] = values
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, out, allow_pickle=False)
+    return buffer.getvalue()
+  if fmt == "arrow":
+    if pa is None:
+      raise ValueError("pyarrow is required for Arrow IPC payloads")
+    table = pa.table({name: pa.array(values) for name, values in arrays.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+      writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+  raise ValueError(f"Unsupported array format {fmt!r}")
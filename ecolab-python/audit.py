@@ -0,0 +1,95 @@
+import os
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
+from uuid import uuid4
+
+from json_codec import json_dumps
+
+AUDIT_RETENTION_MONTHS = int(os.environ.get("AUDIT_RETENTION_MONTHS", "24"))
+AUDIT_PARTITIONS_AHEAD = int(os.environ.get("AUDIT_PARTITIONS_AHEAD", "2"))
+
+AUDIT_COLUMNS = (
+  '"id", "binderTestId", "eventType", "entityType", "entityId", '
+  '"performedByUserId", "performedByRole", "performedAt", "beforeJson", "afterJson", "notes"'
+)
+# performedAt is the transaction's NOW(), as when each event was inserted on its own.
+_ROW_SQL = "(%s, %s, %s, %s, %s, %s, %s, NOW(), %s::jsonb, %s::jsonb, %s)"
+
+
+def encode_json(value: Any) -> Optional[str]:
+  """jsonb parameter text, encoded the same way as every other jsonb value (json_codec)."""
+  if value is None:
+    return None
+  return json_dumps(value)
+
+
+class AuditBuffer:
+  """BinderTestAuditEvent rows raised during a unit of work, written in one INSERT at commit."""
+
+  def __init__(self):
+    self._rows: List[Tuple[Any, ...]] = []
+
+  def __len__(self) -> int:
+    return len(self._rows)
+
+  def add(
+    self,
+    binder_test_id: str,
+    event_type: str,
+    *,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    before: Optional[dict] = None,
+    after: Optional[dict] = None,
+    notes: Optional[str] = None,
+    user_id: Optional[str] = None,
+    user_role: Optional[str] = None,
+  ) -> str:
+    event_id = str(uuid4())
+    self._rows.append(
+      (
+        event_id,
+        binder_test_id,
+        event_type,
+        entity_type,
+        entity_id,
+        user_id,
+        user_role,
+        encode_json(before),
+        encode_json(after),
+        notes,
+      )
+    )
+    return event_id
+
+  def clear(self) -> None:
+    self._rows.clear()
+
+  def flush(self, cur) -> int:
+    if not self._rows:
+      return 0
+    rows, self._rows = self._rows, []
+    values_sql = ", ".join([_ROW_SQL] * len(rows))
+    cur.execute(
+      f'INSERT INTO "BinderTestAuditEvent" ({AUDIT_COLUMNS}) VALUES {values_sql}',
+      [value for row in rows for value in row],
+    )
+    return len(rows)
+
+
+def retention_cutoff(retain_months: int, now: Optional[datetime] = None) -> datetime:
+  """Start of the UTC month retain_months before the current one; older partitions are retired."""
+  now = now or datetime.now(timezone.utc)
+  months = now.year * 12 + now.month - 1 - retain_months
+  return datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def ensure_audit_partitions(cur, months_ahead: int = AUDIT_PARTITIONS_AHEAD) -> List[str]:
+  cur.execute("SELECT ecolab_audit_ensure_partitions(%s) AS name", (months_ahead,))
+  return [row["name"] for row in cur.fetchall()]
+
+
+def detach_audit_partitions(cur, cutoff: datetime) -> List[str]:
+  """Detach monthly partitions ending on or before cutoff; the tables are left for archival."""
+  cur.execute("SELECT ecolab_audit_detach_partitions(%s) AS name", (cutoff,))
+  return [row["name"] for row in cur.fetchall()]
@@ -0,0 +1,149 @@
+"""Query-time regression benchmark for GET /db/capsules and GET /db/pma-formulas.
+
+Seeds a synthetic catalog (10k PMA formulas, 100k batches by default) inside a transaction on
+DATABASE_URL, times the listing queries against the previous correlated-subquery versions, and
+rolls everything back. Apply db/migrations/20250318_catalog_fk_indexes.sql first.
+
+  cd ecolab-python && DATABASE_URL=... python -m benchmarks.catalog_listing [--max-ms 250]
+
+Exits non-zero when a current query's median exceeds --max-ms.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from db import get_conn
+from main import CAPSULE_LIST_SQL, PMA_FORMULA_LIST_SQL
+
+LEGACY_CAPSULE_LIST_SQL = """
+SELECT
+  cf."id", cf."name", cf."description", cf."createdAt", cf."updatedAt",
+  COALESCE(
+    (
+      SELECT json_agg(json_build_object(
+        'id', m."id", 'materialName', m."materialName", 'percentage', m."percentage"
+      ) ORDER BY m."createdAt")
+      FROM "CapsuleFormulaMaterial" m
+      WHERE m."capsuleFormulaId" = cf."id"
+    ),
+    '[]'
+  ) AS "materials",
+  (SELECT COUNT(*) FROM "PmaFormula" p WHERE p."capsuleFormulaId" = cf."id") AS "pmaCount"
+FROM "CapsuleFormula" cf
+ORDER BY cf."createdAt" DESC
+"""
+
+LEGACY_PMA_FORMULA_LIST_SQL = """
+SELECT
+  "id", "name", "capsuleFormulaId", "bitumenOriginId", "bitumenTestId", "ecoCapPercentage",
+  "reagentPercentage", "pmaTargetPgHigh", "pmaTargetPgLow", "bitumenGradeOverride", "notes",
+  (SELECT json_build_object('id', cf."id", 'name', cf."name")
+   FROM "CapsuleFormula" cf WHERE cf."id" = pf."capsuleFormulaId") AS "capsuleFormula",
+  (SELECT json_build_object('id', bo."id", 'refineryName', bo."refineryName", 'binderGrade', bo."binderGrade")
+   FROM "BitumenOrigin" bo WHERE bo."id" = pf."bitumenOriginId") AS "bitumenOrigin",
+  (SELECT json_build_object('id', bt."id", 'batchCode', bt."batchCode")
+   FROM "BitumenBaseTest" bt WHERE bt."id" = pf."bitumenTestId") AS "bitumenTest",
+  (SELECT COUNT(*) FROM "PmaBatch" pb WHERE pb."pmaFormulaId" = pf."id") AS "batchCount",
+  "createdAt", "updatedAt"
+FROM "PmaFormula" pf
+ORDER BY pf."createdAt" DESC
+"""
+
+# Seed ids carry a prefix so they cannot collide with real rows; everything is rolled back anyway.
+SEED_SQL = [
+  """
+  INSERT INTO "BitumenOrigin" ("id", "refineryName", "binderGrade", "originCountry", "updatedAt")
+  SELECT 'bench-bo-' || n, 'Refinery ' || n, 'PG 64-22', 'US', now()
+  FROM generate_series(1, %(origins)s) AS n
+  """,
+  """
+  INSERT INTO "BitumenBaseTest" ("id", "bitumenOriginId", "batchCode", "updatedAt")
+  SELECT 'bench-bt-' || n, 'bench-bo-' || (1 + n %% %(origins)s), 'BENCH-BT-' || n, now()
+  FROM generate_series(1, %(origins)s * 5) AS n
+  """,
+  """
+  INSERT INTO "CapsuleFormula" ("id", "name", "createdAt", "updatedAt")
+  SELECT 'bench-cf-' || n, 'Capsule ' || n, now() - n * interval '1 minute', now()
+  FROM generate_series(1, %(capsules)s) AS n
+  """,
+  """
+  INSERT INTO "CapsuleFormulaMaterial" ("id", "capsuleFormulaId", "materialName", "percentage", "updatedAt")
+  SELECT 'bench-cm-' || n || '-' || k, 'bench-cf-' || n, 'Material ' || k, 100.0 / %(materials)s, now()
+  FROM generate_series(1, %(capsules)s) AS n, generate_series(1, %(materials)s) AS k
+  """,
+  """
+  INSERT INTO "PmaFormula" (
+    "id", "capsuleFormulaId", "bitumenOriginId", "bitumenTestId",
+    "ecoCapPercentage", "reagentPercentage", "createdAt", "updatedAt"
+  )
+  SELECT 'bench-pf-' || n, 'bench-cf-' || (1 + n %% %(capsules)s), 'bench-bo-' || (1 + n %% %(origins)s),
+    'bench-bt-' || (1 + n %% (%(origins)s * 5)), 5.0, 1.0, now() - n * interval '1 second', now()
+  FROM generate_series(1, %(formulas)s) AS n
+  """,
+  """
+  INSERT INTO "PmaBatch" ("id", "pmaFormulaId", "batchCode", "updatedAt")
+  SELECT 'bench-pb-' || n, 'bench-pf-' || (1 + n %% %(formulas)s), 'BENCH-PB-' || n, now()
+  FROM generate_series(1, %(batches)s) AS n
+  """,
+]
+
+ANALYZE_TABLES = (
+  "BitumenOrigin", "BitumenBaseTest", "CapsuleFormula", "CapsuleFormulaMaterial", "PmaFormula", "PmaBatch"
+)
+
+
+def _time_query(cur, query: str, repeat: int) -> dict:
+  timings = []
+  rows = 0
+  for _ in range(repeat):
+    started = time.perf_counter()
+    cur.execute(query)
+    rows = len(cur.fetchall())
+    timings.append((time.perf_counter() - started) * 1000)
+  return {"rows": rows, "medianMs": statistics.median(timings), "minMs": min(timings)}
+
+
+def main(argv=None) -> int:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--capsules", type=int, default=2_000)
+  parser.add_argument("--materials", type=int, default=4, help="materials per capsule")
+  parser.add_argument("--formulas", type=int, default=10_000)
+  parser.add_argument("--batches", type=int, default=100_000)
+  parser.add_argument("--origins", type=int, default=200)
+  parser.add_argument("--repeat", type=int, default=5)
+  parser.add_argument("--max-ms", type=float, default=None, help="fail when a current query's median exceeds this")
+  parser.add_argument("--skip-legacy", action="store_true", help="only time the current queries")
+  args = parser.parse_args(argv)
+
+  seed = {k: getattr(args, k) for k in ("capsules", "materials", "formulas", "batches", "origins")}
+  cases = [
+    ("capsules", CAPSULE_LIST_SQL, LEGACY_CAPSULE_LIST_SQL),
+    ("pma-formulas", PMA_FORMULA_LIST_SQL, LEGACY_PMA_FORMULA_LIST_SQL),
+  ]
+  failed = False
+  with get_conn() as conn, conn.cursor() as cur:
+    try:
+      started = time.perf_counter()
+      for statement in SEED_SQL:
+        cur.execute(statement, seed)
+      for table in ANALYZE_TABLES:
+        cur.execute(f'ANALYZE "{table}"')
+      print(f"seeded {seed} in {time.perf_counter() - started:.1f}s")
+      for name, query, legacy in cases:
+        current = _time_query(cur, query, args.repeat)
+        line = f"{name:<13} current {current['medianMs']:8.1f} ms (min {current['minMs']:.1f}, {current['rows']} rows)"
+        if not args.skip_legacy:
+          before = _time_query(cur, legacy, args.repeat)
+          line += f" | legacy {before['medianMs']:8.1f} ms ({before['medianMs'] / max(current['medianMs'], 1e-9):.1f}x)"
+        if args.max_ms is not None and current["medianMs"] > args.max_ms:
+          line += f"  REGRESSION (> {args.max_ms} ms)"
+          failed = True
+        print(line)
+    finally:
+      conn.rollback()
+  return 1 if failed else 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from db import UnitOfWork, primary_reads, routes_to_replica
+
+
+class ResponseCache:
+  """In-process TTL cache with LRU eviction, keyed by (namespace, key)."""
+
+  def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+    self.max_entries = max_entries
+    self.ttl_seconds = ttl_seconds
+    self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+    self._lock = threading.Lock()
+    # Bumped by invalidate()/clear(); a load that started before a bump is not stored.
+    self._generations: Dict[str, int] = {}
+    self._epoch = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+
+  def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    entry_key = (namespace, key)
+    now = time.monotonic()
+    with self._lock:
+      entry = self._entries.get(entry_key)
+      if entry is not None and entry[0] > now:
+        self._entries.move_to_end(entry_key)
+        self.hits += 1
+        return entry[1]
+      if entry is not None:
+        del self._entries[entry_key]
+      self.misses += 1
+      generation = (self._epoch, self._generations.get(namespace, 0))
+
+    value = loader()
+    with self._lock:
+      if generation != (self._epoch, self._generations.get(namespace, 0)):
+        return value
+      self._entries[entry_key] = (time.monotonic() + self.ttl_seconds, value)
+      self._entries.move_to_end(entry_key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        self.evictions += 1
+    return value
+
+  def invalidate(self, *namespaces: str) -> int:
+    with self._lock:
+      for namespace in namespaces:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+      stale = [k for k in self._entries if k[0] in namespaces]
+      for k in stale:
+        del self._entries[k]
+      self.invalidations += len(stale)
+    return len(stale)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._epoch += 1
+      self.invalidations += len(self._entries)
+      self._entries.clear()
+
+  def stats(self) -> dict:
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "entries": len(self._entries),
+        "maxEntries": self.max_entries,
+        "ttlSeconds": self.ttl_seconds,
+        "hits": self.hits,
+        "misses": self.misses,
+        "hitRate": self.hits / lookups if lookups else 0.0,
+        "evictions": self.evictions,
+        "invalidations": self.invalidations,
+      }
+
+
+response_cache = ResponseCache(
+  max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+  ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def _load(uow: UnitOfWork, method: str, query: str, params: Optional[Iterable[Any]]):
+  """Cache misses read the primary: rows loaded from a lagging replica right after an invalidation
+  would otherwise be pinned until the next write or the TTL."""
+  if not routes_to_replica(uow.readonly):
+    return getattr(uow, method)(query, params)
+  with primary_reads():
+    primary = UnitOfWork(readonly=True)
+    try:
+      return getattr(primary, method)(query, params)
+    finally:
+      primary.close()
+
+
+def cached_fetch_all(uow: UnitOfWork, namespace: str, query: str, params: Optional[Iterable[Any]] = None):
+  key = (query, tuple(params or ()))
+  return response_cache.get_or_load(namespace, key, lambda: _load(uow, "fetch_all", query, params))
+
+
+def cached_fetch_one(uow: UnitOfWork, namespace: str, query: str, params: Optional[Iterable[Any]] = None):
+  key = (query, tuple(params or ()))
+  return response_cache.get_or_load(namespace, key, lambda: _load(uow, "fetch_one", query, params))
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Optional, Set
+
+import psycopg
+
+from cache import response_cache
+from db import _dsn
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "ecolab_changes"
+
+# Which response-cache namespaces a write to each table makes stale.
+TABLE_NAMESPACES = {
+  "User": ("users",),
+  "CapsuleFormula": ("capsules", "pma-formulas"),
+  "CapsuleFormulaMaterial": ("capsules",),
+  "PmaFormula": ("pma-formulas", "capsules"),
+  "PmaBatch": ("pma-formulas",),
+  # Joined into the PMA formula listing for origin / base test names.
+  "BitumenOrigin": ("pma-formulas",),
+  "BitumenBaseTest": ("pma-formulas",),
+}
+
+
+class ChangeFeed:
+  """Background LISTEN loop that invalidates caches and fans events out to async subscribers."""
+
+  def __init__(self, channel: str = CHANNEL):
+    self.channel = channel
+    self._subscribers: Set[tuple] = set()
+    self._lock = threading.Lock()
+    self._stop = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+    self.connected = False
+    self.events_received = 0
+
+  def start(self) -> None:
+    if self._thread and self._thread.is_alive():
+      return
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, name="changefeed", daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    self._stop.set()
+    if self._thread:
+      self._thread.join(timeout=10)
+
+  def subscribe(self) -> asyncio.Queue:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    with self._lock:
+      self._subscribers.add((asyncio.get_running_loop(), queue))
+    return queue
+
+  def unsubscribe(self, queue: asyncio.Queue) -> None:
+    with self._lock:
+      self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+  def dispatch(self, event: dict) -> None:
+    self.events_received += 1
+    namespaces = TABLE_NAMESPACES.get(event.get("table") or "")
+    if namespaces:
+      response_cache.invalidate(*namespaces)
+    with self._lock:
+      subscribers = list(self._subscribers)
+    for loop, queue in subscribers:
+      loop.call_soon_threadsafe(_offer, queue, event)
+
+  def _run(self) -> None:
+    backoff = 1.0
+    while not self._stop.is_set():
+      try:
+        with psycopg.connect(_dsn(), autocommit=True) as conn:
+          conn.execute(f'LISTEN "{self.channel}"')
+          self.connected = True
+          backoff = 1.0
+          # Writes may have happened while we were disconnected.
+          response_cache.clear()
+          while not self._stop.is_set():
+            for notify in conn.notifies(timeout=5.0):
+              try:
+                event = json.loads(notify.payload)
+              except ValueError:
+                logger.warning("Ignoring malformed change notification: %r", notify.payload)
+                continue
+              self.dispatch(event)
+      except Exception:
+        logger.exception("Change feed connection lost; retrying in %.0fs", backoff)
+      self.connected = False
+      self._stop.wait(backoff)
+      backoff = min(backoff * 2, 60.0)
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+  # Slow SSE clients drop events rather than growing without bound.
+  if not queue.full():
+    queue.put_nowait(event)
+
+
+def change_feed_enabled() -> bool:
+  return os.environ.get("CHANGE_FEED_ENABLED", "1") not in ("0", "false", "False") and bool(
+    os.environ.get("DATABASE_URL")
+  )
+
+
+change_feed = ChangeFeed()
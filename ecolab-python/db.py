@@ -1,9 +1,32 @@
+import itertools
 import os
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import uuid4
 
 import psycopg
+from psycopg import IsolationLevel
+from psycopg.conninfo import conninfo_to_dict
 from psycopg.rows import dict_row
+from psycopg.types.json import JsonbDumper, set_json_dumps
+
+from audit import AuditBuffer
+from json_codec import json_dumps
+
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get("DATABASE_REPLICA_CONNECT_TIMEOUT", "3"))
+REPLICA_RETRY_SECONDS = float(os.environ.get("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+READ_YOUR_WRITES_SECONDS = float(os.environ.get("DATABASE_READ_YOUR_WRITES_SECONDS", "5"))
+
+
+# Plain dicts (audit before/after, summaryJson, derived results) are written as jsonb.
+psycopg.adapters.register_dumper(dict, JsonbDumper)
+set_json_dumps(json_dumps)
+
+# When set, reads go to the primary even if replicas are configured (read-your-writes).
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
 
 
 def _dsn() -> str:
@@ -13,22 +36,236 @@ def _dsn() -> str:
   return url
 
 
+def _replica_dsns() -> List[str]:
+  urls = [u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+  legacy = os.environ.get("DATABASE_READONLY_URL")
+  if legacy and legacy not in urls:
+    urls.append(legacy)
+  return urls
+
+
+def _describe_dsn(dsn: str) -> str:
+  info = conninfo_to_dict(dsn)
+  return f'{info.get("host") or "localhost"}:{info.get("port") or 5432}/{info.get("dbname") or ""}'
+
+
+class ReplicaRouter:
+  """Round-robin over replica DSNs; a replica that fails to connect sits out for retry_seconds."""
+
+  def __init__(self, dsns: List[str], retry_seconds: float = REPLICA_RETRY_SECONDS):
+    self.dsns = dsns
+    self.retry_seconds = retry_seconds
+    self._down_until: Dict[str, float] = {}
+    self._cycle = itertools.cycle(range(len(dsns))) if dsns else None
+    self._lock = threading.Lock()
+
+  def candidates(self) -> List[str]:
+    if not self._cycle:
+      return []
+    with self._lock:
+      start = next(self._cycle)
+    now = time.monotonic()
+    ordered = self.dsns[start:] + self.dsns[:start]
+    return [d for d in ordered if self._down_until.get(d, 0) <= now]
+
+  def mark_down(self, dsn: str) -> None:
+    self._down_until[dsn] = time.monotonic() + self.retry_seconds
+
+  def mark_up(self, dsn: str) -> None:
+    self._down_until.pop(dsn, None)
+
+  def connect(self):
+    for dsn in self.candidates():
+      try:
+        conn = psycopg.connect(dsn, row_factory=dict_row, connect_timeout=REPLICA_CONNECT_TIMEOUT)
+      except psycopg.OperationalError:
+        self.mark_down(dsn)
+        continue
+      self.mark_up(dsn)
+      return conn
+    return None
+
+  def check(self) -> List[dict]:
+    """Actively probe every replica, updating health and reporting replay lag."""
+    report = []
+    for dsn in self.dsns:
+      entry: dict = {"replica": _describe_dsn(dsn), "healthy": False}
+      try:
+        with psycopg.connect(dsn, connect_timeout=REPLICA_CONNECT_TIMEOUT) as conn:
+          in_recovery, lag = conn.execute(
+            "SELECT pg_is_in_recovery(), EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+          ).fetchone()
+        entry.update(healthy=True, inRecovery=in_recovery, lagSeconds=float(lag) if lag is not None else None)
+        self.mark_up(dsn)
+      except psycopg.Error as exc:
+        entry["error"] = type(exc).__name__
+        self.mark_down(dsn)
+      report.append(entry)
+    return report
+
+
+_router: Optional[ReplicaRouter] = None
+
+
+def replica_router() -> ReplicaRouter:
+  global _router
+  if _router is None:
+    _router = ReplicaRouter(_replica_dsns())
+  return _router
+
+
 @contextmanager
-def get_conn():
-  conn = psycopg.connect(_dsn(), row_factory=dict_row)
+def primary_reads():
+  token = _primary_reads.set(True)
+  try:
+    yield
+  finally:
+    _primary_reads.reset(token)
+
+
+class ReadRoutingMiddleware:
+  """Pins reads to the primary for write requests, for callers sending X-Read-Primary, and for
+  READ_YOUR_WRITES_SECONDS after a write by the same x_user_id (so replica lag is never visible
+  to the user who just wrote)."""
+
+  def __init__(self, app):
+    self.app = app
+    self._recent_writers: Dict[bytes, float] = {}
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+    headers = dict(scope.get("headers", []))
+    user_id = headers.get(b"x_user_id") or headers.get(b"x-user-id")
+    is_write = scope["method"] not in ("GET", "HEAD", "OPTIONS")
+    now = time.monotonic()
+    pin = (
+      is_write
+      or headers.get(b"x-read-primary", b"").lower() in (b"1", b"true")
+      or (user_id is not None and self._recent_writers.get(user_id, 0) > now)
+    )
+    if is_write and user_id is not None:
+      self._recent_writers = {u: t for u, t in self._recent_writers.items() if t > now}
+      self._recent_writers[user_id] = now + READ_YOUR_WRITES_SECONDS
+    if not pin:
+      await self.app(scope, receive, send)
+      return
+    with primary_reads():
+      await self.app(scope, receive, send)
+
+
+def routes_to_replica(readonly: bool) -> bool:
+  return readonly and not _primary_reads.get() and bool(replica_router().dsns)
+
+
+def _connect(readonly: bool = False):
+  conn = None
+  if routes_to_replica(readonly):
+    conn = replica_router().connect()
+  if conn is None:
+    conn = psycopg.connect(_dsn(), row_factory=dict_row)
+  if readonly:
+    conn.read_only = True
+  return conn
+
+
+@contextmanager
+def get_conn(readonly: bool = False):
+  conn = _connect(readonly)
   try:
     yield conn
   finally:
     conn.close()
 
 
+class UnitOfWork:
+  """One lazily opened connection and transaction shared by everything a request does.
+
+  Read-only units run at REPEATABLE READ so every query sees the same snapshot; writers stay at
+  READ COMMITTED and must call commit() explicitly. Closing without commit rolls back.
+  Audit events added to .audit are written just before the commit and dropped on rollback.
+  """
+
+  def __init__(self, readonly: bool = False):
+    self.readonly = readonly
+    self._conn = None
+    self.audit = AuditBuffer()
+
+  @property
+  def conn(self):
+    if self._conn is None:
+      self._conn = _connect(self.readonly)
+      if self.readonly:
+        self._conn.isolation_level = IsolationLevel.REPEATABLE_READ
+    return self._conn
+
+  def cursor(self):
+    return self.conn.cursor()
+
+  def fetch_all(self, query: str, params: Optional[Iterable[Any]] = None):
+    with self.conn.cursor() as cur:
+      cur.execute(query, params or ())
+      return cur.fetchall()
+
+  def fetch_one(self, query: str, params: Optional[Iterable[Any]] = None):
+    with self.conn.cursor() as cur:
+      cur.execute(query, params or ())
+      return cur.fetchone()
+
+  def commit(self) -> None:
+    if self.audit:
+      with self.conn.cursor() as cur:
+        self.audit.flush(cur)
+    if self._conn is not None:
+      self._conn.commit()
+
+  def rollback(self) -> None:
+    self.audit.clear()
+    if self._conn is not None:
+      self._conn.rollback()
+
+  def close(self) -> None:
+    if self._conn is not None:
+      self._conn.close()
+      self._conn = None
+
+
 def fetch_all(query: str, params: Optional[Iterable[Any]] = None):
-  with get_conn() as conn, conn.cursor() as cur:
+  with get_conn(readonly=True) as conn, conn.cursor() as cur:
     cur.execute(query, params or ())
     return cur.fetchall()
 
 
 def fetch_one(query: str, params: Optional[Iterable[Any]] = None):
-  with get_conn() as conn, conn.cursor() as cur:
+  with get_conn(readonly=True) as conn, conn.cursor() as cur:
     cur.execute(query, params or ())
     return cur.fetchone()
+
+
+def set_statement_timeout(cur, timeout_ms: int) -> None:
+  """Transaction-scoped statement_timeout (SET LOCAL cannot take bind parameters)."""
+  cur.execute("SELECT set_config('statement_timeout', %s, true)", (str(int(timeout_ms)),))
+
+
+def stream_rows(
+  query: str,
+  params: Optional[Iterable[Any]] = None,
+  chunk_size: int = 1000,
+  *,
+  readonly: bool = False,
+  statement_timeout_ms: Optional[int] = None,
+):
+  """Yield lists of at most chunk_size rows from a named (server-side) cursor."""
+  with get_conn(readonly=readonly) as conn:
+    if statement_timeout_ms:
+      with conn.cursor() as setup:
+        set_statement_timeout(setup, statement_timeout_ms)
+    with conn.cursor(name=f"stream_{uuid4().hex}") as cur:
+      cur.itersize = chunk_size
+      cur.execute(query, params or ())
+      while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+          break
+        yield rows
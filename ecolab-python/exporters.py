@@ -0,0 +1,135 @@
+import csv
+import io
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from json_codec import json_dumps
+
+try:
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+except ImportError:  # parquet export is optional
+  pa = None
+  pq = None
+
+EXPORT_MEDIA_TYPES = {
+  "ndjson": "application/x-ndjson",
+  "csv": "text/csv",
+  "parquet": "application/vnd.apache.parquet",
+}
+
+# Column kinds: "str", "float", "int", "bool", "timestamp", "json"
+ExportColumns = Dict[str, str]
+
+
+def parquet_available() -> bool:
+  return pa is not None
+
+
+def _flatten_json(rows: List[dict], columns: ExportColumns) -> List[dict]:
+  json_cols = [name for name, kind in columns.items() if kind == "json"]
+  if not json_cols:
+    return rows
+  for row in rows:
+    for name in json_cols:
+      if row.get(name) is not None:
+        row[name] = json_dumps(row[name])
+  return rows
+
+
+def ndjson_stream(chunks: Iterable[List[dict]]) -> Iterator[bytes]:
+  for rows in chunks:
+    yield "".join(json_dumps(row) + "\n" for row in rows).encode()
+
+
+def csv_stream(chunks: Iterable[List[dict]], columns: ExportColumns) -> Iterator[bytes]:
+  buffer = io.StringIO()
+  writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+  writer.writeheader()
+  yield buffer.getvalue().encode()
+  for rows in chunks:
+    buffer.seek(0)
+    buffer.truncate()
+    writer.writerows(_flatten_json(rows, columns))
+    yield buffer.getvalue().encode()
+
+
+def _arrow_schema(columns: ExportColumns):
+  kinds = {
+    "str": pa.string(),
+    "json": pa.string(),
+    "float": pa.float64(),
+    "int": pa.int64(),
+    "bool": pa.bool_(),
+    "timestamp": pa.timestamp("ms"),
+  }
+  return pa.schema([(name, kinds[kind]) for name, kind in columns.items()])
+
+
+class _DrainableSink(io.RawIOBase):
+  """Write-only file that hands back whatever was written since the last drain."""
+
+  def __init__(self):
+    self._chunks: List[bytes] = []
+    self._position = 0
+
+  def writable(self) -> bool:
+    return True
+
+  def write(self, data) -> int:
+    self._chunks.append(bytes(data))
+    self._position += len(data)
+    return len(data)
+
+  def tell(self) -> int:
+    return self._position
+
+  def drain(self) -> bytes:
+    out = b"".join(self._chunks)
+    self._chunks.clear()
+    return out
+
+
+def parquet_stream(chunks: Iterable[List[dict]], columns: ExportColumns) -> Iterator[bytes]:
+  """One Parquet row group per chunk, flushed to the client as soon as it is written."""
+  if pa is None:
+    raise RuntimeError("pyarrow is required for parquet export")
+  schema = _arrow_schema(columns)
+  sink = _DrainableSink()
+  writer = pq.ParquetWriter(sink, schema)
+  try:
+    for rows in chunks:
+      for row in rows:
+        for name, kind in columns.items():
+          if kind == "timestamp" and isinstance(row.get(name), datetime) and row[name].tzinfo is not None:
+            row[name] = row[name].astimezone(timezone.utc).replace(tzinfo=None)
+      writer.write_table(pa.Table.from_pylist(_flatten_json(rows, columns), schema=schema))
+      data = sink.drain()
+      if data:
+        yield data
+  finally:
+    writer.close()
+  yield sink.drain()
+
+
+def zip_stream(files: Iterable[Tuple[str, Union[bytes, Iterable[bytes]]]]) -> Iterator[bytes]:
+  """Deflated zip written entry by entry. The sink cannot seek, so zipfile emits data descriptors
+  instead of patching local headers, and each entry is flushed to the client once compressed.
+  An entry's data may be an iterable of byte chunks, which is compressed as it is consumed."""
+  sink = _DrainableSink()
+  with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+    for name, data in files:
+      if isinstance(data, (bytes, bytearray)):
+        archive.writestr(name, data)
+      else:
+        with archive.open(name, mode="w", force_zip64=True) as entry:
+          for part in data:
+            entry.write(part)
+            chunk = sink.drain()
+            if chunk:
+              yield chunk
+      chunk = sink.drain()
+      if chunk:
+        yield chunk
+  yield sink.drain()
@@ -0,0 +1,89 @@
+import hashlib
+from typing import Optional
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+NOT_MODIFIED_HEADERS = (b"etag", b"cache-control", b"vary")
+
+
+def make_etag(*parts: object) -> str:
+  digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+  return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  if not if_none_match:
+    return False
+  candidates = [c.strip() for c in if_none_match.split(",")]
+  if "*" in candidates:
+    return True
+  bare = etag[2:] if etag.startswith("W/") else etag
+  return any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+
+
+class ConditionalGetMiddleware:
+  """Adds a body-hash ETag to JSON GET responses and answers matching If-None-Match with 304.
+
+  Responses that already carry an ETag (set by the endpoint) are only checked, not re-hashed.
+  Non-JSON responses (streams, files, SSE) pass through untouched.
+  """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+      await self.app(scope, receive, send)
+      return
+
+    if_none_match = None
+    for name, value in scope.get("headers", []):
+      if name == b"if-none-match":
+        if_none_match = value.decode("latin-1")
+        break
+
+    start_message: dict = {}
+    body = bytearray()
+    passthrough = False
+
+    async def send_wrapper(message):
+      nonlocal passthrough
+      if message["type"] == "http.response.start":
+        headers = {k.lower(): v for k, v in message.get("headers", [])}
+        content_type = headers.get(b"content-type", b"")
+        if message["status"] != 200 or not content_type.startswith(b"application/json"):
+          passthrough = True
+          await send(message)
+          return
+        start_message.update(message)
+        return
+
+      if passthrough:
+        await send(message)
+        return
+
+      body.extend(message.get("body", b""))
+      if message.get("more_body", False):
+        return
+
+      headers = [(k, v) for k, v in start_message.get("headers", [])]
+      existing = next((v for k, v in headers if k.lower() == b"etag"), None)
+      etag = existing.decode("latin-1") if existing else f'"{hashlib.sha256(bytes(body)).hexdigest()[:32]}"'
+      if not existing:
+        headers.append((b"etag", etag.encode("latin-1")))
+
+      if etag_matches(if_none_match, etag):
+        # CORS headers from the inner middleware must survive, or browsers reject the 304.
+        kept = [
+          (k, v)
+          for k, v in headers
+          if k.lower() in NOT_MODIFIED_HEADERS or k.lower().startswith(b"access-control-")
+        ]
+        await send({"type": "http.response.start", "status": 304, "headers": kept})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+      await send({**start_message, "headers": headers})
+      await send({"type": "http.response.body", "body": bytes(body)})
+
+    await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,28 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+try:
+  import orjson
+except ImportError:  # falls back to the stdlib encoder
+  orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+
+
+def json_default(value: Any):
+  """Encoding for values outside plain JSON, shared by jsonb parameters, audit rows and exports."""
+  if isinstance(value, (datetime, date)):
+    return value.isoformat()
+  if isinstance(value, Decimal):
+    return float(value)
+  return str(value)
+
+
+def json_dumps(value: Any) -> str:
+  """JSON as stored in jsonb columns: timestamps as ISO strings, UUIDs and other scalars as text.
+  orjson (which also encodes numpy values) when installed, else the stdlib encoder."""
+  if orjson is not None:
+    return orjson.dumps(value, default=json_default, option=_ORJSON_OPTIONS).decode()
+  return json.dumps(value, default=json_default)
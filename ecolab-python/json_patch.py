@@ -0,0 +1,88 @@
+"""Minimal RFC 6902 JSON Patch (add / remove / replace) for summary version deltas.
+
+Generated operations also carry the previous value under "old" (ignored by RFC 6902
+consumers), which lets a patch be inverted without the document it was made from.
+"""
+from typing import Any, List
+
+Patch = List[dict]
+
+
+def _escape(token: Any) -> str:
+  return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+  return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> Patch:
+  if type(old) is not type(new):
+    return [{"op": "replace", "path": path, "value": new, "old": old}]
+  if isinstance(old, dict):
+    ops: Patch = []
+    for key in old:
+      child = f"{path}/{_escape(key)}"
+      if key not in new:
+        ops.append({"op": "remove", "path": child, "old": old[key]})
+      else:
+        ops.extend(make_patch(old[key], new[key], child))
+    for key in new:
+      if key not in old:
+        ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": new[key]})
+    return ops
+  if isinstance(old, list):
+    ops = []
+    shared = min(len(old), len(new))
+    for index in range(shared):
+      ops.extend(make_patch(old[index], new[index], f"{path}/{index}"))
+    for index in range(len(old) - 1, shared - 1, -1):
+      ops.append({"op": "remove", "path": f"{path}/{index}", "old": old[index]})
+    for index in range(shared, len(new)):
+      ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+    return ops
+  if old != new:
+    return [{"op": "replace", "path": path, "value": new, "old": old}]
+  return []
+
+
+def _parent(doc: Any, path: str):
+  tokens = [_unescape(t) for t in path.split("/")[1:]]
+  target = doc
+  for token in tokens[:-1]:
+    target = target[int(token)] if isinstance(target, list) else target[token]
+  last = tokens[-1]
+  return target, (int(last) if isinstance(target, list) and last != "-" else last)
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+  """Apply in place (the caller owns doc) and return the result; "" replaces the whole doc."""
+  for op in patch:
+    kind, path = op["op"], op["path"]
+    if path == "":
+      if kind == "remove":
+        raise ValueError("Cannot remove the document root")
+      doc = op["value"]
+      continue
+    parent, key = _parent(doc, path)
+    if kind == "remove":
+      del parent[key]
+    elif kind == "add" and isinstance(parent, list):
+      parent.insert(len(parent) if key == "-" else key, op["value"])
+    elif kind in ("add", "replace"):
+      parent[key] = op["value"]
+    else:
+      raise ValueError(f"Unsupported patch op {kind!r}")
+  return doc
+
+
+def invert_patch(patch: Patch) -> Patch:
+  inverse: Patch = []
+  for op in reversed(patch):
+    if op["op"] == "add":
+      inverse.append({"op": "remove", "path": op["path"], "old": op.get("value")})
+    elif op["op"] == "remove":
+      inverse.append({"op": "add", "path": op["path"], "value": op["old"]})
+    else:
+      inverse.append({"op": "replace", "path": op["path"], "value": op["old"], "old": op["value"]})
+  return inverse
@@ -1,25 +1,92 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+import asyncio
+import base64
+import csv
 import hashlib
+import io
+import itertools
+import json
+import os
 import re
-from uuid import uuid4
-
-from fastapi import FastAPI, HTTPException, Header
+import struct
+import tempfile
+import time
+from uuid import UUID, uuid4
+
+import numpy as np
+import pandas as pd
+from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from db import fetch_all, fetch_one, get_conn
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from python_multipart.multipart import MultipartParseError
+from starlette.concurrency import run_in_threadpool
+import psycopg
+from psycopg.types.json import Jsonb
+from audit import (
+    AUDIT_PARTITIONS_AHEAD,
+    AUDIT_RETENTION_MONTHS,
+    detach_audit_partitions,
+    ensure_audit_partitions,
+    retention_cutoff,
+)
+from db import (
+    ReadRoutingMiddleware,
+    UnitOfWork,
+    get_conn,
+    json_dumps,
+    replica_router,
+    set_statement_timeout,
+    stream_rows,
+)
+from cache import cached_fetch_all, cached_fetch_one, response_cache
+from changefeed import change_feed, change_feed_enabled
+from array_codec import ARRAY_MEDIA_TYPES, array_format, decode_arrays, encode_arrays
+from uploads import MultipartColumnUpload, UploadTooLarge
+from json_patch import apply_patch, invert_patch, make_patch
+from exporters import (
+    EXPORT_MEDIA_TYPES,
+    csv_stream,
+    ndjson_stream,
+    parquet_available,
+    parquet_stream,
+    zip_stream,
+)
+from http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    ConditionalGetMiddleware,
+    etag_matches,
+    make_etag,
+)
 
 from services.pg import compute_pg_grade
-from services.dsr import compute_dsr_curve
+from services.dsr import compute_dsr_curve, smooth_dsr_curve
 from services.softening_point import estimate_softening_point
 from services.viscosity import estimate_viscosity
-from services.trendline import compute_trendline
+from services.trendline import compute_confidence_band, compute_trendline
+from services.downsample import bin_aggregate, lttb_indices
+from services.memo import memo_store
+from services.workup import WORKUP_VERSION, run_workup
+from services.dsr_arrays import dsr_json_to_columns, pack_columns, unpack_columns
 from ml.predict_storage_stability import predict_storage_stability
 
 
-app = FastAPI(title="EcoLAB Scientific Engine", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if change_feed_enabled():
+        change_feed.start()
+    yield
+    change_feed.stop()
+
+
+app = FastAPI(title="EcoLAB Scientific Engine", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +94,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Query-Time-Ms", "X-Query-Truncated"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(ReadRoutingMiddleware)
+
+
+def get_uow(request: Request):
+    """Request-scoped connection/transaction; GET/HEAD requests get a read-only snapshot."""
+    uow = UnitOfWork(readonly=request.method in ("GET", "HEAD"))
+    try:
+        yield uow
+    finally:
+        uow.close()
 
 
 def stable_hash(parts: List[str]) -> str:
@@ -36,7 +115,7 @@ def stable_hash(parts: List[str]) -> str:
 
 
 def log_audit_event(
-    cur,
+    uow: UnitOfWork,
     binder_test_id: str,
     event_type: str,
     *,
@@ -47,31 +126,18 @@ def log_audit_event(
     notes: Optional[str] = None,
     user_id: Optional[str] = None,
     user_role: Optional[str] = None,
-):
-    cur.execute(
-        """
-        INSERT INTO "BinderTestAuditEvent" (
-          "id", "binderTestId", "eventType", "entityType", "entityId",
-          "performedByUserId", "performedByRole", "performedAt",
-          "beforeJson", "afterJson", "notes"
-        ) VALUES (
-          %s, %s, %s, %s, %s,
-          %s, %s, NOW(),
-          %s, %s, %s
-        )
-        """,
-        (
-            str(uuid4()),
-            binder_test_id,
-            event_type,
-            entity_type,
-            entity_id,
-            user_id,
-            user_role,
-            before,
-            after,
-            notes,
-        ),
+) -> str:
+    """Queue an audit event on the unit of work; it is inserted with the others at commit."""
+    return uow.audit.add(
+        binder_test_id,
+        event_type,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        before=before,
+        after=after,
+        notes=notes,
+        user_id=user_id,
+        user_role=user_role,
     )
 
 
@@ -126,6 +192,21 @@ def schema_version():
     return {"version": SCHEMA_VERSION}
 
 
+@app.get("/health/db")
+def db_health():
+    return {"replicas": replica_router().check()}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    return {
+        **response_cache.stats(),
+        "changeFeed": {"connected": change_feed.connected, "eventsReceived": change_feed.events_received},
+        "queryGateway": _prepare_gateway_sql.cache_info()._asdict(),
+        "computeMemo": memo_store.stats(),
+    }
+
+
 # ----------------------------- DB intent models -----------------------------
 class UserSummary(BaseModel):
     id: str
@@ -334,8 +415,10 @@ class PmaFormulaCreate(BaseModel):
 
 # ----------------------------- DB intent endpoints (read-only) -----------------------------
 @app.get("/db/users", response_model=List[UserSummary])
-def list_users():
-    rows = fetch_all(
+def list_users(uow: UnitOfWork = Depends(get_uow)):
+    rows = cached_fetch_all(
+        uow,
+        "users",
         """
         SELECT "id", "email", "name", "role", "status", "createdAt"
         FROM "User"
@@ -346,8 +429,10 @@ def list_users():
 
 
 @app.get("/db/users/{user_id}", response_model=UserSummary)
-def get_user(user_id: str):
-    row = fetch_one(
+def get_user(user_id: str, uow: UnitOfWork = Depends(get_uow)):
+    row = cached_fetch_one(
+        uow,
+        "users",
         """
         SELECT "id", "email", "name", "role", "status", "createdAt"
         FROM "User"
@@ -360,39 +445,49 @@ def get_user(user_id: str):
     return row
 
 
+# Materials and PMA counts are aggregated once per table and joined, rather than run as
+# correlated subqueries per capsule.
+CAPSULE_LIST_SQL = """
+SELECT
+  cf."id",
+  cf."name",
+  cf."description",
+  cf."createdAt",
+  cf."updatedAt",
+  COALESCE(m."materials", '[]') AS "materials",
+  COALESCE(p."pmaCount", 0) AS "pmaCount"
+FROM "CapsuleFormula" cf
+LEFT JOIN (
+  SELECT
+    "capsuleFormulaId",
+    json_agg(json_build_object(
+      'id', "id",
+      'materialName', "materialName",
+      'percentage', "percentage"
+    ) ORDER BY "createdAt") AS "materials"
+  FROM "CapsuleFormulaMaterial"
+  GROUP BY "capsuleFormulaId"
+) m ON m."capsuleFormulaId" = cf."id"
+LEFT JOIN (
+  SELECT "capsuleFormulaId", COUNT(*) AS "pmaCount"
+  FROM "PmaFormula"
+  GROUP BY "capsuleFormulaId"
+) p ON p."capsuleFormulaId" = cf."id"
+ORDER BY cf."createdAt" DESC
+"""
+
+
 @app.get("/db/capsules", response_model=List[CapsuleFormulaResponse])
-def list_capsules():
-    rows = fetch_all(
-        """
-        SELECT
-          cf."id",
-          cf."name",
-          cf."description",
-          cf."createdAt",
-          cf."updatedAt",
-          COALESCE(
-            (
-              SELECT json_agg(json_build_object(
-                'id', m."id",
-                'materialName', m."materialName",
-                'percentage', m."percentage"
-              ) ORDER BY m."createdAt")
-              FROM "CapsuleFormulaMaterial" m
-              WHERE m."capsuleFormulaId" = cf."id"
-            ),
-            '[]'
-          ) AS "materials",
-          (SELECT COUNT(*) FROM "PmaFormula" p WHERE p."capsuleFormulaId" = cf."id") AS "pmaCount"
-        FROM "CapsuleFormula" cf
-        ORDER BY cf."createdAt" DESC
-        """
-    )
+def list_capsules(uow: UnitOfWork = Depends(get_uow)):
+    rows = cached_fetch_all(uow, "capsules", CAPSULE_LIST_SQL)
     return rows
 
 
 @app.get("/db/capsules/{capsule_id}", response_model=CapsuleFormulaDetail)
-def get_capsule(capsule_id: str):
-    row = fetch_one(
+def get_capsule(capsule_id: str, uow: UnitOfWork = Depends(get_uow)):
+    row = cached_fetch_one(
+        uow,
+        "capsules",
         """
         SELECT
           cf."id",
@@ -454,7 +549,11 @@ def get_capsule(capsule_id: str):
 
 
 @app.get("/db/binder-tests", response_model=List[BinderTestResponse])
-def list_binder_tests(q: Optional[str] = None, status: Optional[str] = None):
+def list_binder_tests(
+    q: Optional[str] = None,
+    status: Optional[str] = None,
+    uow: UnitOfWork = Depends(get_uow),
+):
     clauses: list[str] = []
     params: list[object] = []
 
@@ -476,7 +575,7 @@ def list_binder_tests(q: Optional[str] = None, status: Optional[str] = None):
     if clauses:
         where_sql = "WHERE " + " AND ".join(clauses)
 
-    rows = fetch_all(
+    rows = uow.fetch_all(
         f"""
         SELECT
           "id",
@@ -506,11 +605,7 @@ def list_binder_tests(q: Optional[str] = None, status: Optional[str] = None):
     return rows
 
 
-@app.get("/db/binder-tests/{test_id}", response_model=BinderTestDetail)
-def get_binder_test(test_id: str):
-    row = fetch_one(
-        """
-        SELECT
+BINDER_TEST_DETAIL_COLUMNS = """
           bt."id",
           bt."name",
           bt."testName",
@@ -527,8 +622,6 @@ def get_binder_test(test_id: str):
           bt."materialDescription",
           bt."testStandard",
           bt."keywords",
-          bt."aiExtractedData",
-          bt."dsrData",
           bt."lab",
           bt."operator",
           bt."jnr_3_2",
@@ -540,8 +633,12 @@ def get_binder_test(test_id: str):
           bt."notes",
           bt."bitumenTestId",
           bt."bitumenOriginId",
-          (
-            SELECT json_build_object(
+          bt."createdAt",
+          bt."updatedAt"
+"""
+
+LINKED_TEST_RESULT_JSON = """
+            json_build_object(
               'storageStabilityRecoveryPercent', tr."storageStabilityRecoveryPercent",
               'storageStabilityGstarPercent', tr."storageStabilityGstarPercent",
               'storageStabilityJnrPercent', tr."storageStabilityJnrPercent",
@@ -554,13 +651,61 @@ def get_binder_test(test_id: str):
               'pgHigh', tr."pgHigh",
               'pgLow', tr."pgLow"
             )
+"""
+
+BINDER_TEST_FILE_COLUMNS = """
+          "id",
+          COALESCE("label", "fileUrl") AS "fileName",
+          "fileType" AS "mimeType",
+          NULL::int AS "size",
+          "fileUrl" AS "url",
+          "createdAt"
+"""
+
+BINDER_TEST_BATCH_GET_LIMIT = 200
+
+# Parts of the detail payload that are only fetched when asked for via include=.
+HEAVY_BINDER_TEST_COLUMNS = {"aiExtractedData": 'bt."aiExtractedData"', "dsrData": 'bt."dsrData"'}
+BINDER_TEST_INCLUDES = {*HEAVY_BINDER_TEST_COLUMNS, "linkedTestResult", "files"}
+
+
+def _parse_binder_test_include(include: Optional[str]) -> set[str]:
+    # Omitting include keeps the legacy full payload; include= (empty) returns header fields only.
+    if include is None:
+        return set(BINDER_TEST_INCLUDES)
+    parts = {p.strip() for p in include.split(",") if p.strip()}
+    unknown = parts - BINDER_TEST_INCLUDES
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include value(s): {', '.join(sorted(unknown))}; expected {', '.join(sorted(BINDER_TEST_INCLUDES))}",
+        )
+    return parts
+
+
+def _heavy_columns_sql(parts: set[str]) -> str:
+    return ",\n          ".join(
+        f'{expr if name in parts else "NULL::jsonb"} AS "{name}"' for name, expr in HEAVY_BINDER_TEST_COLUMNS.items()
+    )
+
+
+@app.get("/db/binder-tests/{test_id}", response_model=BinderTestDetail)
+def get_binder_test(test_id: str, include: Optional[str] = None, uow: UnitOfWork = Depends(get_uow)):
+    parts = _parse_binder_test_include(include)
+    # tr."batchId"::text matches the TestResult_batchId_text_createdAt_idx expression index
+    linked_sql = f"""(
+            SELECT {LINKED_TEST_RESULT_JSON}
             FROM "TestResult" tr
             WHERE tr."batchId"::text = bt."batchId"
             ORDER BY tr."createdAt" DESC
             LIMIT 1
-          ) AS "linkedTestResult",
-          bt."createdAt",
-          bt."updatedAt"
+          )""" if "linkedTestResult" in parts else "NULL::json"
+    row = uow.fetch_one(
+        f"""
+        SELECT
+          {BINDER_TEST_DETAIL_COLUMNS},
+          {_heavy_columns_sql(parts)},
+          {linked_sql} AS "linkedTestResult"
         FROM "BinderTest" bt
         WHERE bt."id" = %s
         """,
@@ -568,28 +713,348 @@ def get_binder_test(test_id: str):
     )
     if not row:
         raise HTTPException(status_code=404, detail="Binder test not found")
-    files = fetch_all(
-        """
+    row["files"] = None
+    if "files" in parts:
+        row["files"] = uow.fetch_all(
+            f"""
+            SELECT {BINDER_TEST_FILE_COLUMNS}
+            FROM "BinderTestDataFile"
+            WHERE "binderTestId" = %s
+            ORDER BY "createdAt" DESC
+            """,
+            (test_id,),
+        )
+    return row
+
+
+class BinderTestJsonSlice(BaseModel):
+    binderTestId: str
+    column: str
+    path: List[str]
+    data: Any
+
+
+JSON_PATH_DESCRIPTION = "Dot-separated key/index path, sliced inside Postgres via #>"
+
+
+def _binder_test_json_slice(uow: UnitOfWork, test_id: str, column: str, path: Optional[str]) -> dict:
+    keys = [k for k in (path or "").split(".") if k]
+    row = uow.fetch_one(
+        f'SELECT "{column}" #> %s AS "data" FROM "BinderTest" WHERE "id" = %s',
+        (keys, test_id),
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Binder test not found")
+    return {"binderTestId": test_id, "column": column, "path": keys, "data": row["data"]}
+
+
+@app.get("/db/binder-tests/{test_id}/dsr-data", response_model=BinderTestJsonSlice)
+def get_binder_test_dsr_data(
+    test_id: str,
+    path: Optional[str] = Query(None, description=JSON_PATH_DESCRIPTION),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    return _binder_test_json_slice(uow, test_id, "dsrData", path)
+
+
+@app.get("/db/binder-tests/{test_id}/ai-extracted-data", response_model=BinderTestJsonSlice)
+def get_binder_test_ai_extracted_data(
+    test_id: str,
+    path: Optional[str] = Query(None, description=JSON_PATH_DESCRIPTION),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    return _binder_test_json_slice(uow, test_id, "aiExtractedData", path)
+
+
+PACKED_ARRAYS_MEDIA_TYPE = ARRAY_MEDIA_TYPES["packed"]
+DSR_CURVE_DEFAULT_POINTS = 500
+DSR_ARRAYS_BACKFILL_LIMIT = 1000
+
+# Arrays are usable when they were uploaded directly (no source hash) or still match dsrData.
+DSR_ARRAYS_FRESH_SQL = (
+    '"dsrArrays" IS NOT NULL AND ("dsrArraysSourceHash" IS NULL'
+    ' OR "dsrArraysSourceHash" = md5("dsrData"::text))'
+)
+
+
+class DsrArraysWrite(BaseModel):
+    columns: dict[str, List[float]]
+    dtype: str = Field("float64", pattern="^float(32|64)$")
+
+
+class DsrArraysWriteResponse(BaseModel):
+    binderTestId: str
+    columns: List[str]
+    rows: int
+    bytes: int
+
+
+class DsrArraysBackfillResponse(BaseModel):
+    converted: int
+    failed: List[str]
+
+
+def _store_dsr_arrays(uow: UnitOfWork, test_id: str, packed: bytes) -> None:
+    with uow.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE "BinderTest"
+            SET "dsrArrays" = %s, "dsrArraysSourceHash" = NULL, "updatedAt" = NOW()
+            WHERE "id" = %s
+            """,
+            (packed, test_id),
+        )
+        if cur.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Binder test not found")
+    uow.commit()
+
+
+@app.put("/db/binder-tests/{test_id}/dsr-arrays", response_model=DsrArraysWriteResponse)
+async def put_binder_test_dsr_arrays(test_id: str, request: Request, uow: UnitOfWork = Depends(get_uow)):
+    """Store raw DSR sweeps as packed column arrays: either a JSON {columns, dtype} body or an
+    already packed application/octet-stream buffer (services/dsr_arrays.py layout)."""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(PACKED_ARRAYS_MEDIA_TYPE):
+            packed = body
+        else:
+            payload = DsrArraysWrite.model_validate_json(body)
+            packed = pack_columns(payload.columns, payload.dtype)
+        columns = unpack_columns(packed)
+    except (ValueError, struct.error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    await run_in_threadpool(_store_dsr_arrays, uow, test_id, packed)
+    return {
+        "binderTestId": test_id,
+        "columns": list(columns),
+        "rows": next(iter(columns.values())).size,
+        "bytes": len(packed),
+    }
+
+
+def _load_dsr_columns(uow: UnitOfWork, test_id: str) -> Optional[dict]:
+    """DSR columns from fresh packed arrays, else converted from dsrData; None when neither exists."""
+    row = uow.fetch_one(
+        f"""
         SELECT
-          "id",
-          COALESCE("label", "fileUrl") AS "fileName",
-          "fileType" AS "mimeType",
-          NULL::int AS "size",
-          "fileUrl" AS "url",
-          "createdAt"
-        FROM "BinderTestDataFile"
-        WHERE "binderTestId" = %s
-        ORDER BY "createdAt" DESC
+          CASE WHEN {DSR_ARRAYS_FRESH_SQL} THEN "dsrArrays" END AS "dsrArrays",
+          CASE WHEN {DSR_ARRAYS_FRESH_SQL} THEN NULL ELSE "dsrData" END AS "dsrData"
+        FROM "BinderTest"
+        WHERE "id" = %s
         """,
         (test_id,),
     )
-    row["files"] = files
-    return row
+    if not row:
+        raise HTTPException(status_code=404, detail="Binder test not found")
+    try:
+        if row["dsrArrays"] is not None:
+            return unpack_columns(row["dsrArrays"])
+        if row["dsrData"]:
+            return dsr_json_to_columns(row["dsrData"])
+    except (ValueError, struct.error) as exc:
+        raise HTTPException(status_code=422, detail=f"DSR data cannot be read as arrays: {exc}")
+    return None
+
+
+@app.get("/db/binder-tests/{test_id}/dsr-curve")
+def get_binder_test_dsr_curve(
+    test_id: str,
+    x: Optional[str] = Query(None, description="Column for the x axis; defaults to the first column"),
+    y: Optional[str] = Query(None, description="Column for the y axis; defaults to the second column"),
+    points: int = Query(DSR_CURVE_DEFAULT_POINTS, ge=3, le=100_000),
+    format: str = Query("json", pattern="^(json|packed)$"),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """LTTB-decimated curve read from the packed arrays without materialising the full JSON."""
+    columns = _load_dsr_columns(uow, test_id)
+    if columns is None:
+        raise HTTPException(status_code=404, detail="Binder test has no DSR data")
+
+    names = list(columns)
+    x_name = x or names[0]
+    y_name = y or (names[1] if len(names) > 1 else None)
+    if x_name not in columns or y_name not in columns:
+        raise HTTPException(status_code=400, detail=f"Unknown column; available: {', '.join(names)}")
+
+    x_values, y_values = columns[x_name], columns[y_name]
+    # Sweeps are stored in acquisition order and any column can be the x axis; LTTB buckets
+    # assume x is sorted, so reorder (stably, keeping repeated x in acquisition order) if not.
+    if np.any(np.diff(x_values) < 0):
+        order = np.argsort(x_values, kind="stable")
+        x_values, y_values = x_values[order], y_values[order]
+    keep = lttb_indices(x_values, y_values, points)
+    x_values, y_values = x_values[keep], y_values[keep]
+
+    if format == "packed":
+        return Response(
+            content=pack_columns({x_name: x_values, y_name: y_values}, x_values.dtype.name),
+            media_type=PACKED_ARRAYS_MEDIA_TYPE,
+            headers={"X-Source-Points": str(columns[x_name].size)},
+        )
+    return {
+        "binderTestId": test_id,
+        "x": x_name,
+        "y": y_name,
+        "sourcePoints": int(columns[x_name].size),
+        "points": int(keep.size),
+        "xValues": x_values.tolist(),
+        "yValues": y_values.tolist(),
+    }
+
+
+@app.post("/db/binder-tests/dsr-arrays/backfill", response_model=DsrArraysBackfillResponse)
+def backfill_binder_test_dsr_arrays(
+    limit: int = Query(DSR_ARRAYS_BACKFILL_LIMIT, ge=1, le=10_000),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Pack dsrData into dsrArrays for rows that have none or whose derived copy went stale."""
+    rows = uow.fetch_all(
+        """
+        SELECT "id", "dsrData", md5("dsrData"::text) AS "sourceHash"
+        FROM "BinderTest"
+        WHERE "dsrData" IS NOT NULL
+          AND ("dsrArrays" IS NULL
+            OR ("dsrArraysSourceHash" IS NOT NULL AND "dsrArraysSourceHash" <> md5("dsrData"::text)))
+        ORDER BY "id"
+        LIMIT %s
+        """,
+        (limit,),
+    )
+    updates, failed = [], []
+    for row in rows:
+        try:
+            packed = pack_columns(dsr_json_to_columns(row["dsrData"]))
+        except (TypeError, ValueError):
+            failed.append(row["id"])
+            continue
+        updates.append((packed, row["sourceHash"], row["id"], row["sourceHash"]))
+
+    if updates:
+        with uow.cursor() as cur:
+            # The hash guard skips rows whose dsrData changed since they were read.
+            cur.executemany(
+                """
+                UPDATE "BinderTest"
+                SET "dsrArrays" = %s, "dsrArraysSourceHash" = %s
+                WHERE "id" = %s AND md5("dsrData"::text) = %s
+                """,
+                updates,
+            )
+        uow.commit()
+    return {"converted": len(updates), "failed": failed}
+
+
+class BinderTestBatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BINDER_TEST_BATCH_GET_LIMIT)
+    include: Optional[str] = Field(None, description="Same values as the detail endpoint's include=")
+
+
+class BinderTestBatchGetResponse(BaseModel):
+    items: List[BinderTestDetail]
+    missing: List[str]
+
+
+@app.post("/db/binder-tests/batch-get", response_model=BinderTestBatchGetResponse)
+def batch_get_binder_tests(payload: BinderTestBatchGetRequest, uow: UnitOfWork = Depends(get_uow)):
+    ids = list(dict.fromkeys(payload.ids))
+    parts = _parse_binder_test_include(payload.include)
+    rows = uow.fetch_all(
+        f"""
+        SELECT
+          {BINDER_TEST_DETAIL_COLUMNS},
+          {_heavy_columns_sql(parts)}
+        FROM "BinderTest" bt
+        WHERE bt."id" = ANY(%s)
+        """,
+        (ids,),
+    )
+    batch_ids = list({row["batchId"] for row in rows if row.get("batchId")})
+    linked = {}
+    if batch_ids and "linkedTestResult" in parts:
+        linked_rows = uow.fetch_all(
+            f"""
+            SELECT DISTINCT ON (tr."batchId"::text)
+              tr."batchId"::text AS "batchKey",
+              {LINKED_TEST_RESULT_JSON} AS "linkedTestResult"
+            FROM "TestResult" tr
+            WHERE tr."batchId"::text = ANY(%s)
+            ORDER BY tr."batchId"::text, tr."createdAt" DESC
+            """,
+            (batch_ids,),
+        )
+        linked = {r["batchKey"]: r["linkedTestResult"] for r in linked_rows}
+
+    files_by_test: dict[str, list] = {}
+    if "files" in parts:
+        for f in uow.fetch_all(
+            f"""
+            SELECT "binderTestId", {BINDER_TEST_FILE_COLUMNS}
+            FROM "BinderTestDataFile"
+            WHERE "binderTestId" = ANY(%s)
+            ORDER BY "binderTestId", "createdAt" DESC
+            """,
+            (ids,),
+        ):
+            files_by_test.setdefault(f.pop("binderTestId"), []).append(f)
+
+    by_id = {}
+    for row in rows:
+        row["linkedTestResult"] = linked.get(row.get("batchId"))
+        row["files"] = files_by_test.get(row["id"], []) if "files" in parts else None
+        by_id[row["id"]] = row
+    return {
+        "items": [by_id[i] for i in ids if i in by_id],
+        "missing": [i for i in ids if i not in by_id],
+    }
+
+
+SSE_KEEPALIVE_SECONDS = 15
+SSE_EVENT_NAMES = {"BinderTest": "lifecycle", "BinderTestMetric": "metrics", "BinderTestSummary": "summary"}
+
+
+@app.get("/db/binder-tests/{test_id}/events")
+async def stream_binder_test_events(test_id: str, request: Request, uow: UnitOfWork = Depends(get_uow)):
+    if not change_feed_enabled():
+        raise HTTPException(status_code=503, detail="Change feed is disabled; poll /db/binder-tests/{id} instead")
+    # Subscribe before reading the snapshot so a transition committed in between is still
+    # delivered (at worst after a snapshot that already shows it).
+    queue = change_feed.subscribe()
+    try:
+        binder = await run_in_threadpool(_load_binder_test_basic, uow, test_id)
+    except BaseException:
+        change_feed.unsubscribe(queue)
+        raise
+    finally:
+        # The stream can stay open for hours; don't hold the request connection for it.
+        await run_in_threadpool(uow.close)
+    snapshot = {"binderTestId": test_id, "status": binder.get("status"), "lifecycleStatus": binder.get("lifecycleStatus")}
+
+    async def events():
+        try:
+            yield f"event: lifecycle\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                name = SSE_EVENT_NAMES.get(event.get("table"))
+                if name and event.get("binderTestId") == test_id:
+                    yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ----------------------------- Binder test VM endpoints -----------------------------
-def _load_binder_test_basic(binder_test_id: str):
-    binder = fetch_one(
+def _load_binder_test_basic(uow: UnitOfWork, binder_test_id: str):
+    binder = uow.fetch_one(
         'SELECT "id", "status", "lifecycleStatus", "testName", "name" FROM "BinderTest" WHERE "id" = %s',
         (binder_test_id,),
     )
@@ -598,8 +1063,8 @@ def _load_binder_test_basic(binder_test_id: str):
     return binder
 
 
-def _collect_candidate_files(binder_test_id: str):
-    files = fetch_all(
+def _collect_candidate_files(uow: UnitOfWork, binder_test_id: str):
+    files = uow.fetch_all(
         """
         SELECT "id", "fileUrl", "fileType", "label", "createdAt"
         FROM "BinderTestDataFile"
@@ -635,10 +1100,10 @@ def _stable_metrics_hash(metrics: List[dict]) -> str:
     return stable_hash(parts) if parts else stable_hash(["empty"])
 
 
-def _hydrate_source_files(file_ids: list[str]):
+def _hydrate_source_files(uow: UnitOfWork, file_ids: list[str]):
     if not file_ids:
         return {}
-    rows = fetch_all(
+    rows = uow.fetch_all(
         """
         SELECT "id", COALESCE("label", "fileUrl") AS "filename"
         FROM "BinderTestDataFile"
@@ -654,9 +1119,10 @@ def parse_binder_test(
     binder_test_id: str,
     x_user_id: Optional[str] = Header(None, convert_underscores=False),
     x_user_role: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
 ):
-    binder = _load_binder_test_basic(binder_test_id)
-    candidate_files = _collect_candidate_files(binder_test_id)
+    binder = _load_binder_test_basic(uow, binder_test_id)
+    candidate_files = _collect_candidate_files(uow, binder_test_id)
     if not candidate_files:
         raise HTTPException(status_code=400, detail="No parseable files found (expected PDF or Excel under DATA)")
 
@@ -670,10 +1136,10 @@ def parse_binder_test(
     inserted_count = 0
     parser_version = "binder-parser-v1"
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         try:
             log_audit_event(
-                cur,
+                uow,
                 binder_test_id,
                 "PARSE_STARTED",
                 entity_type="parse_run",
@@ -782,7 +1248,7 @@ def parse_binder_test(
                 ("COMPLETED", parse_run_id),
             )
             log_audit_event(
-                cur,
+                uow,
                 binder_test_id,
                 "PARSE_COMPLETED",
                 entity_type="parse_run",
@@ -792,7 +1258,7 @@ def parse_binder_test(
                 user_role=x_user_role,
             )
             log_audit_event(
-                cur,
+                uow,
                 binder_test_id,
                 "METRICS_UPSERTED",
                 entity_type="parse_run",
@@ -805,16 +1271,16 @@ def parse_binder_test(
                 'UPDATE "BinderTest" SET "lifecycleStatus" = %s, "status" = %s, "updatedAt" = NOW() WHERE "id" = %s',
                 ("REVIEW_REQUIRED", "PENDING_REVIEW", binder_test_id),
             )
-            conn.commit()
+            uow.commit()
         except Exception as exc:
-            conn.rollback()
-            with get_conn() as fail_conn, fail_conn.cursor() as fail_cur:
+            uow.rollback()
+            with uow.cursor() as fail_cur:
                 fail_cur.execute(
                     'UPDATE "BinderTestParseRun" SET "status" = %s, "errorMessage" = %s, "completedAt" = NOW() WHERE "id" = %s',
                     ("FAILED", str(exc), parse_run_id),
                 )
                 log_audit_event(
-                    fail_cur,
+                    uow,
                     binder_test_id,
                     "PARSE_COMPLETED",
                     entity_type="parse_run",
@@ -823,16 +1289,16 @@ def parse_binder_test(
                     user_id=x_user_id,
                     user_role=x_user_role,
                 )
-                fail_conn.commit()
+            uow.commit()
             raise
 
     return {"status": "PARSED", "metricsInserted": inserted_count, "parseRunId": parse_run_id}
 
 
 @app.get("/binder-tests/{binder_test_id}/metrics", response_model=List[BinderTestMetric])
-def list_binder_test_metrics(binder_test_id: str):
-    _load_binder_test_basic(binder_test_id)
-    rows = fetch_all(
+def list_binder_test_metrics(binder_test_id: str, uow: UnitOfWork = Depends(get_uow)):
+    _load_binder_test_basic(uow, binder_test_id)
+    rows = uow.fetch_all(
         """
         SELECT
           m."id",
@@ -872,9 +1338,10 @@ def confirm_binder_test_metrics(
     binder_test_id: str,
     x_user_id: Optional[str] = Header(None, convert_underscores=False),
     x_user_role: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
 ):
-    _load_binder_test_basic(binder_test_id)
-    metrics = fetch_all(
+    _load_binder_test_basic(uow, binder_test_id)
+    metrics = uow.fetch_all(
         'SELECT "id", "position", "isUserConfirmed" FROM "BinderTestMetric" WHERE "binderTestId" = %s',
         (binder_test_id,),
     )
@@ -884,7 +1351,7 @@ def confirm_binder_test_metrics(
     if has_unknown_position:
         raise HTTPException(status_code=400, detail='Cannot confirm while metrics contain position "UNKNOWN"')
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute(
             """
             UPDATE "BinderTestMetric"
@@ -904,7 +1371,7 @@ def confirm_binder_test_metrics(
             ("READY", "READY", binder_test_id),
         )
         log_audit_event(
-            cur,
+            uow,
             binder_test_id,
             "METRICS_CONFIRMED",
             entity_type="metric",
@@ -912,23 +1379,21 @@ def confirm_binder_test_metrics(
             user_id=x_user_id,
             user_role=x_user_role,
         )
-        conn.commit()
-
-    return {"status": "READY", "metricsConfirmed": metrics_confirmed}
+        # Confirming fires the invalidation trigger; recompute in the same transaction.
+        derived = _derived_results_or_none(uow, binder_test_id)
+        if derived:
+            _store_derived_results(cur, derived)
+        uow.commit()
 
+    return {
+        "status": "READY",
+        "metricsConfirmed": metrics_confirmed,
+        "metricsHash": derived["metricsHash"] if derived else None,
+    }
 
-@app.post("/binder-tests/{binder_test_id}/summaries")
-def create_binder_test_summary(
-    binder_test_id: str,
-    x_user_id: Optional[str] = Header(None, convert_underscores=False),
-    x_user_role: Optional[str] = Header(None, convert_underscores=False),
-):
-    binder = _load_binder_test_basic(binder_test_id)
-    lifecycle = binder.get("lifecycleStatus") or binder.get("status")
-    if lifecycle != "READY":
-        raise HTTPException(status_code=400, detail="Binder test must be READY to create summary")
 
-    metrics = fetch_all(
+def _load_confirmed_metrics(uow: UnitOfWork, binder_test_id: str) -> List[dict]:
+    return uow.fetch_all(
         """
         SELECT
           "id", "metricType", "metricName", "position", "value", "units",
@@ -940,52 +1405,177 @@ def create_binder_test_summary(
         """,
         (binder_test_id,),
     )
-    if not metrics:
-        raise HTTPException(status_code=400, detail="No confirmed metrics to summarize")
 
-    derived_hash = _stable_metrics_hash(metrics)
-    next_version_row = fetch_one(
-        'SELECT COALESCE(MAX("version"), 0) + 1 AS "nextVersion" FROM "BinderTestSummary" WHERE "binderTestId" = %s',
-        (binder_test_id,),
+
+class BinderTestWorkup(BaseModel):
+    binderTestId: str
+    metricsHash: str
+    workupVersion: int
+    metricCount: int
+    dsr: Optional[dict]
+    pg: Optional[dict]
+    trendlines: List[dict]
+    viscosity: List[dict]
+    stored: bool = False
+    computedAt: Optional[datetime] = None
+
+
+def _compute_derived_results(uow: UnitOfWork, binder_test_id: str, metrics: Optional[List[dict]] = None) -> dict:
+    dsr_columns = _load_dsr_columns(uow, binder_test_id)
+    if metrics is None:
+        metrics = _load_confirmed_metrics(uow, binder_test_id)
+    if not metrics and dsr_columns is None:
+        raise HTTPException(status_code=400, detail="No confirmed metrics or DSR data to work up")
+    try:
+        result = run_workup(metrics, dsr_columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"binderTestId": binder_test_id, "metricsHash": _stable_metrics_hash(metrics), **result}
+
+
+def _derived_results_or_none(
+    uow: UnitOfWork, binder_test_id: str, metrics: Optional[List[dict]] = None
+) -> Optional[dict]:
+    # Unreadable DSR data must not block confirming metrics or creating a summary.
+    try:
+        return _compute_derived_results(uow, binder_test_id, metrics)
+    except HTTPException:
+        return None
+
+
+def _read_derived_results(uow: UnitOfWork, binder_test_id: str) -> Optional[dict]:
+    """Stored results from the current workup version; triggers delete the row when confirmed
+    metrics or DSR data change, so a present row is never stale."""
+    row = uow.fetch_one(
+        """
+        SELECT "metricsHash", "results", "computedAt"
+        FROM "BinderTestDerivedResult"
+        WHERE "binderTestId" = %s AND "workupVersion" = %s
+        """,
+        (binder_test_id, WORKUP_VERSION),
     )
-    next_version = int(next_version_row["nextVersion"]) if next_version_row else 1
-    summary_id = str(uuid4())
+    if not row:
+        return None
+    return {
+        **row["results"],
+        "binderTestId": binder_test_id,
+        "metricsHash": row["metricsHash"],
+        "stored": True,
+        "computedAt": row["computedAt"],
+    }
+
 
-    parse_run_row = fetch_one(
+def _derived_results_payload(derived: dict) -> dict:
+    return {k: v for k, v in derived.items() if k not in ("binderTestId", "metricsHash", "stored", "computedAt")}
+
+
+def _store_derived_results(cur, derived: dict) -> None:
+    results = _derived_results_payload(derived)
+    cur.execute(
         """
-        SELECT "id", "inputFileIds"
-        FROM "BinderTestParseRun"
-        WHERE "binderTestId" = %s AND "status" = 'COMPLETED'
-        ORDER BY "startedAt" DESC
-        LIMIT 1
+        INSERT INTO "BinderTestDerivedResult" ("binderTestId", "metricsHash", "workupVersion", "results", "computedAt")
+        VALUES (%s, %s, %s, %s, NOW())
+        ON CONFLICT ("binderTestId") DO UPDATE SET
+          "metricsHash" = EXCLUDED."metricsHash",
+          "workupVersion" = EXCLUDED."workupVersion",
+          "results" = EXCLUDED."results",
+          "computedAt" = EXCLUDED."computedAt"
         """,
-        (binder_test_id,),
+        (derived["binderTestId"], derived["metricsHash"], results["workupVersion"], results),
     )
-    input_file_ids = parse_run_row.get("inputFileIds") if parse_run_row else []
-    evidence_lookup = _hydrate_source_files(input_file_ids or [])
-    evidence_files = [
-        {"id": fid, "filename": evidence_lookup.get(fid)}
-        for fid in input_file_ids or []
-    ]
 
-    now = datetime.utcnow()
-    doi_like_id = f"ecotek.binder.{now.year}.{now.strftime('%m%d')}.{binder_test_id[:8]}v{next_version}"
-    summary_json = {
-        "binder_test_id": binder_test_id,
-        "version": next_version,
-        "doi_like_id": doi_like_id,
-        "created_at": now.isoformat() + "Z",
-        "created_by_user_id": x_user_id,
-        "created_by_role": x_user_role,
-        "metrics": metrics,
-        "evidence_files": evidence_files,
-        "notes": "Derived from confirmed metrics only.",
-    }
 
-    with get_conn() as conn, conn.cursor() as cur:
-        prev_summary = fetch_one(
+@app.get("/binder-tests/{binder_test_id}/derived-results", response_model=BinderTestWorkup)
+def get_binder_test_derived_results(binder_test_id: str, uow: UnitOfWork = Depends(get_uow)):
+    stored = _read_derived_results(uow, binder_test_id)
+    if stored:
+        return stored
+    _load_binder_test_basic(uow, binder_test_id)
+    return _compute_derived_results(uow, binder_test_id)
+
+
+@app.post("/binder-tests/{binder_test_id}/workup", response_model=BinderTestWorkup)
+def run_binder_test_workup(binder_test_id: str, uow: UnitOfWork = Depends(get_uow)):
+    """DSR smoothing, PG grade, trendlines and viscosity from confirmed metrics and stored DSR
+    arrays in one call, instead of round-tripping the arrays through /compute/*."""
+    stored = _read_derived_results(uow, binder_test_id)
+    if stored:
+        return stored
+    derived = _compute_derived_results(uow, binder_test_id)
+    with uow.cursor() as cur:
+        _store_derived_results(cur, derived)
+    uow.commit()
+    return derived
+
+
+# First key of the two-int advisory lock serializing summary creation per binder test.
+SUMMARY_LOCK_NAMESPACE = 0x5355
+# Versions 1, K+1, 2K+1, ... keep a full summaryJson; the others only a patch from the previous one.
+SUMMARY_SNAPSHOT_EVERY = max(1, int(os.environ.get("SUMMARY_SNAPSHOT_EVERY", "10")))
+
+
+def _reconstruct_summary_json(uow: UnitOfWork, binder_test_id: str, version: int) -> dict:
+    """Nearest snapshot at or below version, with the patches of the versions after it applied."""
+    rows = uow.fetch_all(
+        """
+        SELECT "version", "summaryJson", "summaryPatch"
+        FROM "BinderTestSummary"
+        WHERE "binderTestId" = %s
+          AND "version" <= %s
+          AND "version" >= (
+            SELECT MAX("version") FROM "BinderTestSummary"
+            WHERE "binderTestId" = %s AND "version" <= %s AND "summaryJson" IS NOT NULL
+          )
+        ORDER BY "version" ASC
+        """,
+        (binder_test_id, version, binder_test_id, version),
+    )
+    if not rows or rows[-1]["version"] != version:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    doc = rows[0]["summaryJson"]
+    for row in rows[1:]:
+        doc = apply_patch(doc, row["summaryPatch"])
+    return doc
+
+
+def _summary_storage(uow: UnitOfWork, binder_test_id: str, prev_version: Optional[int], summary_json: dict):
+    """(summaryJson, summaryPatch) to store for a new version."""
+    if prev_version is None:
+        return summary_json, None
+    patch = make_patch(_reconstruct_summary_json(uow, binder_test_id, prev_version), summary_json)
+    snapshot = prev_version % SUMMARY_SNAPSHOT_EVERY == 0
+    # A rewrite of most of the document is cheaper stored whole.
+    if snapshot or len(json_dumps(patch)) * 2 > len(json_dumps(summary_json)):
+        return summary_json, patch
+    return None, patch
+
+
+@app.post("/binder-tests/{binder_test_id}/summaries")
+def create_binder_test_summary(
+    binder_test_id: str,
+    force: bool = Query(False, description="Create a new version even if confirmed metrics are unchanged"),
+    x_user_id: Optional[str] = Header(None, convert_underscores=False),
+    x_user_role: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    binder = _load_binder_test_basic(uow, binder_test_id)
+    lifecycle = binder.get("lifecycleStatus") or binder.get("status")
+    if lifecycle != "READY":
+        raise HTTPException(status_code=400, detail="Binder test must be READY to create summary")
+
+    metrics = _load_confirmed_metrics(uow, binder_test_id)
+    if not metrics:
+        raise HTTPException(status_code=400, detail="No confirmed metrics to summarize")
+
+    derived_hash = _stable_metrics_hash(metrics)
+
+    with uow.cursor() as cur:
+        # Held until commit/rollback: concurrent creators for the same test queue here, so the
+        # latest-version read below cannot race another insert.
+        cur.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", (SUMMARY_LOCK_NAMESPACE, binder_test_id))
+        prev_summary = uow.fetch_one(
             """
-            SELECT "id", "version"
+            SELECT "id", "version", "doiLikeId", "derivedFromMetricsHash"
             FROM "BinderTestSummary"
             WHERE "binderTestId" = %s
             ORDER BY "version" DESC
@@ -993,16 +1583,72 @@ def create_binder_test_summary(
             """,
             (binder_test_id,),
         )
-        cur.execute(
+        if prev_summary and not force and prev_summary["derivedFromMetricsHash"] == derived_hash:
+            uow.rollback()
+            return {
+                "version": prev_summary["version"],
+                "doiLikeId": prev_summary["doiLikeId"],
+                "summaryId": str(prev_summary["id"]),
+                "created": False,
+            }
+
+        next_version = prev_summary["version"] + 1 if prev_summary else 1
+        summary_id = str(uuid4())
+
+        derived = _read_derived_results(uow, binder_test_id)
+        if not derived or derived["metricsHash"] != derived_hash:
+            derived = _derived_results_or_none(uow, binder_test_id, metrics)
+
+        parse_run_row = uow.fetch_one(
             """
-            INSERT INTO "BinderTestSummary" (
-              "id", "binderTestId", "version", "doiLikeId", "status",
+            SELECT "id", "inputFileIds"
+            FROM "BinderTestParseRun"
+            WHERE "binderTestId" = %s AND "status" = 'COMPLETED'
+            ORDER BY "startedAt" DESC
+            LIMIT 1
+            """,
+            (binder_test_id,),
+        )
+        input_file_ids = parse_run_row.get("inputFileIds") if parse_run_row else []
+        evidence_lookup = _hydrate_source_files(uow, input_file_ids or [])
+        evidence_files = [
+            {"id": fid, "filename": evidence_lookup.get(fid)}
+            for fid in input_file_ids or []
+        ]
+
+        now = datetime.utcnow()
+        doi_like_id = f"ecotek.binder.{now.year}.{now.strftime('%m%d')}.{binder_test_id[:8]}v{next_version}"
+        summary_json = {
+            "binder_test_id": binder_test_id,
+            "version": next_version,
+            "doi_like_id": doi_like_id,
+            "created_at": now.isoformat() + "Z",
+            "created_by_user_id": x_user_id,
+            "created_by_role": x_user_role,
+            "metrics": metrics,
+            "evidence_files": evidence_files,
+            # The smoothed DSR curve stays in BinderTestDerivedResult; summaries keep the figures.
+            "derived_results": (
+                {k: v for k, v in _derived_results_payload(derived).items() if k != "dsr"} if derived else None
+            ),
+            "notes": "Derived from confirmed metrics only.",
+        }
+        # Compare and store in the jsonb form (UUIDs and timestamps as strings).
+        summary_json = json.loads(json_dumps(summary_json))
+        stored_json, stored_patch = _summary_storage(
+            uow, binder_test_id, prev_summary["version"] if prev_summary else None, summary_json
+        )
+
+        cur.execute(
+            """
+            INSERT INTO "BinderTestSummary" (
+              "id", "binderTestId", "version", "doiLikeId", "status",
               "createdAt", "createdByUserId", "createdByRole",
-              "derivedFromMetricsHash", "summaryJson", "supersedesSummaryId"
+              "derivedFromMetricsHash", "summaryJson", "summaryPatch", "supersedesSummaryId"
             ) VALUES (
               %s, %s, %s, %s, %s,
               %s, %s, %s,
-              %s, %s, %s
+              %s, %s, %s, %s
             )
             """,
             (
@@ -1015,7 +1661,8 @@ def create_binder_test_summary(
                 x_user_id,
                 x_user_role,
                 derived_hash,
-                summary_json,
+                stored_json,
+                Jsonb(stored_patch) if stored_patch is not None else None,
                 prev_summary["id"] if prev_summary else None,
             ),
         )
@@ -1025,7 +1672,7 @@ def create_binder_test_summary(
                 ("SUPERSEDED", prev_summary["id"]),
             )
             log_audit_event(
-                cur,
+                uow,
                 binder_test_id,
                 "SUMMARY_SUPERSEDED",
                 entity_type="summary",
@@ -1036,7 +1683,7 @@ def create_binder_test_summary(
             )
 
         log_audit_event(
-            cur,
+            uow,
             binder_test_id,
             "SUMMARY_CREATED",
             entity_type="summary",
@@ -1045,15 +1692,15 @@ def create_binder_test_summary(
             user_id=x_user_id,
             user_role=x_user_role,
         )
-        conn.commit()
+        uow.commit()
 
-    return {"version": next_version, "doiLikeId": doi_like_id, "summaryId": summary_id}
+    return {"version": next_version, "doiLikeId": doi_like_id, "summaryId": summary_id, "created": True}
 
 
 @app.get("/binder-tests/{binder_test_id}/summaries", response_model=List[BinderTestSummaryListItem])
-def list_binder_test_summaries(binder_test_id: str):
-    _load_binder_test_basic(binder_test_id)
-    rows = fetch_all(
+def list_binder_test_summaries(binder_test_id: str, uow: UnitOfWork = Depends(get_uow)):
+    _load_binder_test_basic(uow, binder_test_id)
+    rows = uow.fetch_all(
         """
         SELECT
           "version",
@@ -1072,9 +1719,37 @@ def list_binder_test_summaries(binder_test_id: str):
     return rows
 
 
+def _summary_cache_headers(row: dict) -> dict:
+    # summaryJson never changes once written; only status flips FINAL -> SUPERSEDED, after which
+    # the whole row is frozen and can be cached indefinitely.
+    etag = make_etag(row["binderTestId"], row["version"], row["derivedFromMetricsHash"], row["status"])
+    cache_control = IMMUTABLE_CACHE_CONTROL if row["status"] == "SUPERSEDED" else REVALIDATE_CACHE_CONTROL
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
 @app.get("/binder-tests/{binder_test_id}/summaries/{version}", response_model=BinderTestSummaryDetail)
-def get_binder_test_summary(binder_test_id: str, version: int):
-    row = fetch_one(
+def get_binder_test_summary(
+    binder_test_id: str,
+    version: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    if if_none_match:
+        head = uow.fetch_one(
+            """
+            SELECT "binderTestId", "version", "status", "derivedFromMetricsHash"
+            FROM "BinderTestSummary"
+            WHERE "binderTestId" = %s AND "version" = %s
+            """,
+            (binder_test_id, version),
+        )
+        if head:
+            headers = _summary_cache_headers(head)
+            if etag_matches(if_none_match, headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+
+    row = uow.fetch_one(
         """
         SELECT
           "id",
@@ -1095,17 +1770,74 @@ def get_binder_test_summary(binder_test_id: str, version: int):
     )
     if not row:
         raise HTTPException(status_code=404, detail="Summary not found")
+    if row["summaryJson"] is None:
+        row["summaryJson"] = _reconstruct_summary_json(uow, binder_test_id, version)
+    response.headers.update(_summary_cache_headers(row))
     return row
 
 
+class BinderTestSummaryDiff(BaseModel):
+    binderTestId: str
+    fromVersion: int
+    toVersion: int
+    operations: List[dict]
+
+
+@app.get(
+    "/binder-tests/{binder_test_id}/summaries/{from_version}/diff/{to_version}",
+    response_model=BinderTestSummaryDiff,
+)
+def diff_binder_test_summaries(
+    binder_test_id: str,
+    from_version: int,
+    to_version: int,
+    response: Response,
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """JSON Patch turning version from_version into to_version, chained from the stored
+    per-version patches (inverted when going backwards) rather than diffing two documents."""
+    low, high = sorted((from_version, to_version))
+    rows = uow.fetch_all(
+        """
+        SELECT "version", "summaryPatch"
+        FROM "BinderTestSummary"
+        WHERE "binderTestId" = %s AND "version" BETWEEN %s AND %s
+        ORDER BY "version" ASC
+        """,
+        (binder_test_id, low, high),
+    )
+    if len(rows) != high - low + 1:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    patches = [row["summaryPatch"] for row in rows[1:]]
+    if any(patch is None for patch in patches):
+        # Versions written before delta storage have no patch; fall back to a full diff.
+        operations = make_patch(
+            _reconstruct_summary_json(uow, binder_test_id, low),
+            _reconstruct_summary_json(uow, binder_test_id, high),
+        )
+    else:
+        operations = [op for patch in patches for op in patch]
+    if from_version > to_version:
+        operations = invert_patch(operations)
+    # Stored versions never change, so neither does their diff.
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return {
+        "binderTestId": binder_test_id,
+        "fromVersion": from_version,
+        "toVersion": to_version,
+        "operations": operations,
+    }
+
+
 @app.post("/binder-tests/{binder_test_id}/peer-comments", response_model=BinderTestPeerComment)
 def create_peer_comment(
     binder_test_id: str,
     payload: dict,
     x_user_id: Optional[str] = Header(None, convert_underscores=False),
     x_user_role: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
 ):
-    _load_binder_test_basic(binder_test_id)
+    _load_binder_test_basic(uow, binder_test_id)
     comment_type = (payload.get("commentType") or "").upper()
     comment_text = payload.get("commentText")
     summary_version = payload.get("summaryVersion")
@@ -1113,7 +1845,7 @@ def create_peer_comment(
         raise HTTPException(status_code=400, detail="commentType and commentText are required")
     comment_id = str(uuid4())
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute(
             """
             INSERT INTO "BinderTestPeerComment" (
@@ -1142,7 +1874,7 @@ def create_peer_comment(
         )
         created = cur.fetchone()
         log_audit_event(
-            cur,
+            uow,
             binder_test_id,
             "PEER_COMMENT_ADDED",
             entity_type="comment",
@@ -1151,13 +1883,17 @@ def create_peer_comment(
             user_id=x_user_id,
             user_role=x_user_role,
         )
-        conn.commit()
+        uow.commit()
     return created
 
 
 @app.get("/binder-tests/{binder_test_id}/peer-comments", response_model=List[BinderTestPeerComment])
-def list_peer_comments(binder_test_id: str, version: Optional[int] = None):
-    _load_binder_test_basic(binder_test_id)
+def list_peer_comments(
+    binder_test_id: str,
+    version: Optional[int] = None,
+    uow: UnitOfWork = Depends(get_uow),
+):
+    _load_binder_test_basic(uow, binder_test_id)
     clauses = ['"binderTestId" = %s']
     params: list[Any] = [binder_test_id]
     if version is not None:
@@ -1165,7 +1901,7 @@ def list_peer_comments(binder_test_id: str, version: Optional[int] = None):
         params.append(version)
 
     where_sql = " AND ".join(clauses)
-    rows = fetch_all(
+    rows = uow.fetch_all(
         f"""
         SELECT
           "id", "binderTestId", "summaryVersion", "commentType", "commentText",
@@ -1186,8 +1922,9 @@ def create_peer_review_decision(
     payload: dict,
     x_user_id: Optional[str] = Header(None, convert_underscores=False),
     x_user_role: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
 ):
-    _load_binder_test_basic(binder_test_id)
+    _load_binder_test_basic(uow, binder_test_id)
     summary_version = payload.get("summaryVersion")
     decision = (payload.get("decision") or "").upper()
     notes = payload.get("decisionNotes")
@@ -1195,7 +1932,7 @@ def create_peer_review_decision(
         raise HTTPException(status_code=400, detail="summaryVersion and decision are required")
     decision_id = str(uuid4())
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute(
             """
             INSERT INTO "BinderTestPeerReviewDecision" (
@@ -1221,7 +1958,7 @@ def create_peer_review_decision(
         )
         created = cur.fetchone()
         log_audit_event(
-            cur,
+            uow,
             binder_test_id,
             "PEER_REVIEW_DECISION_ADDED",
             entity_type="review_decision",
@@ -1230,14 +1967,14 @@ def create_peer_review_decision(
             user_id=x_user_id,
             user_role=x_user_role,
         )
-        conn.commit()
+        uow.commit()
     return created
 
 
 @app.get("/binder-tests/{binder_test_id}/peer-review-decisions", response_model=List[BinderTestPeerReviewDecision])
-def list_peer_review_decisions(binder_test_id: str, version: int):
-    _load_binder_test_basic(binder_test_id)
-    rows = fetch_all(
+def list_peer_review_decisions(binder_test_id: str, version: int, uow: UnitOfWork = Depends(get_uow)):
+    _load_binder_test_basic(uow, binder_test_id)
+    rows = uow.fetch_all(
         """
         SELECT
           "id", "binderTestId", "summaryVersion", "decision", "decisionNotes",
@@ -1251,11 +1988,57 @@ def list_peer_review_decisions(binder_test_id: str, version: int):
     return rows
 
 
+AUDIT_PAGE_LIMIT = 200
+AUDIT_PAGE_MAX_LIMIT = 1000
+
+
+def _encode_audit_cursor(row: dict) -> str:
+    raw = f'{row["performedAt"].isoformat()}|{row["id"]}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_audit_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        performed_at, event_id = raw.split("|", 1)
+        return datetime.fromisoformat(performed_at), str(UUID(event_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/binder-tests/{binder_test_id}/audit", response_model=List[BinderTestAuditEvent])
-def list_audit_events(binder_test_id: str):
-    _load_binder_test_basic(binder_test_id)
-    rows = fetch_all(
-        """
+def list_audit_events(
+    binder_test_id: str,
+    response: Response,
+    performed_from: Optional[datetime] = Query(None, alias="from"),
+    performed_to: Optional[datetime] = Query(None, alias="to"),
+    event_type: Optional[str] = Query(None, alias="eventType"),
+    cursor: Optional[str] = None,
+    limit: int = Query(AUDIT_PAGE_LIMIT, ge=1, le=AUDIT_PAGE_MAX_LIMIT),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Newest first, one page at a time; X-Next-Cursor is set when more events remain.
+
+    from/to bound "performedAt" (the partition key), so only the overlapping monthly partitions
+    are scanned.
+    """
+    _load_binder_test_basic(uow, binder_test_id)
+    clauses = ['"binderTestId" = %s']
+    params: list[object] = [binder_test_id]
+    if performed_from:
+        clauses.append('"performedAt" >= %s')
+        params.append(performed_from)
+    if performed_to:
+        clauses.append('"performedAt" < %s')
+        params.append(performed_to)
+    if event_type:
+        clauses.append('"eventType" = %s')
+        params.append(event_type)
+    if cursor:
+        clauses.append('("performedAt", "id") < (%s, %s::uuid)')
+        params.extend(_decode_audit_cursor(cursor))
+    rows = uow.fetch_all(
+        f"""
         SELECT
           "id",
           "binderTestId",
@@ -1269,14 +2052,132 @@ def list_audit_events(binder_test_id: str):
           "afterJson",
           "notes"
         FROM "BinderTestAuditEvent"
-        WHERE "binderTestId" = %s
-        ORDER BY "performedAt" DESC
+        WHERE {" AND ".join(clauses)}
+        ORDER BY "performedAt" DESC, "id" DESC
+        LIMIT %s
         """,
-        (binder_test_id,),
+        (*params, limit + 1),
     )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_audit_cursor(rows[-1])
     return rows
 
 
+class AuditMaintenanceResponse(BaseModel):
+    ensured: List[str]
+    cutoff: datetime
+    detached: List[str]
+
+
+@app.post("/db/binder-tests/audit/maintenance", response_model=AuditMaintenanceResponse)
+def maintain_audit_partitions(
+    months_ahead: int = Query(AUDIT_PARTITIONS_AHEAD, alias="monthsAhead", ge=0, le=24),
+    retain_months: int = Query(AUDIT_RETENTION_MONTHS, alias="retainMonths", ge=1),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Create upcoming monthly audit partitions and detach those older than the retention window.
+
+    Meant for a scheduled job. Detached partitions stay in the database as plain tables until
+    they are archived and dropped.
+    """
+    cutoff = retention_cutoff(retain_months)
+    with uow.cursor() as cur:
+        ensured = ensure_audit_partitions(cur, months_ahead)
+        detached = detach_audit_partitions(cur, cutoff)
+    uow.commit()
+    return {"ensured": ensured, "cutoff": cutoff, "detached": detached}
+
+
+# ----------------------------- Review dashboard -----------------------------
+class ReviewDecisionSummary(BaseModel):
+    summaryVersion: int
+    decision: str
+    decisionNotes: Optional[str]
+    reviewerUserId: Optional[str]
+    reviewerRole: Optional[str]
+    createdAt: datetime
+
+
+class ReviewDashboardItem(BaseModel):
+    binderTestId: str
+    name: Optional[str]
+    testName: Optional[str]
+    status: Optional[str]
+    lifecycleStatus: Optional[str]
+    updatedAt: Optional[datetime]
+    finalVersion: Optional[int]
+    unresolvedComments: int
+    latestDecisions: List[ReviewDecisionSummary]
+    pendingReview: bool
+
+
+class ReviewDashboard(BaseModel):
+    reviewerUserId: Optional[str]
+    items: List[ReviewDashboardItem]
+
+
+REVIEW_DASHBOARD_LIMIT = 200
+
+# Candidates are tests awaiting review, tests whose FINAL summary the reviewer (anyone, when no
+# reviewer is given) has not decided on, and tests with open comments. Counts and decisions are
+# then gathered per candidate from the ("binderTestId", ...) indexes.
+REVIEW_DASHBOARD_SQL = """
+WITH candidates AS (
+  SELECT
+    bt."id", bt."name", bt."testName", bt."status", bt."lifecycleStatus", bt."updatedAt",
+    f."version" AS "finalVersion",
+    f."version" IS NOT NULL AND NOT EXISTS (
+      SELECT 1 FROM "BinderTestPeerReviewDecision" r
+      WHERE r."binderTestId" = bt."id" AND r."summaryVersion" = f."version"
+        AND (%(reviewer)s::text IS NULL OR r."reviewerUserId" = %(reviewer)s::text)
+    ) AS "pendingReview"
+  FROM "BinderTest" bt
+  LEFT JOIN "BinderTestSummary" f ON f."binderTestId" = bt."id" AND f."status" = 'FINAL'
+  WHERE bt."status" <> 'ARCHIVED'
+)
+SELECT
+  c."id" AS "binderTestId", c."name", c."testName", c."status", c."lifecycleStatus", c."updatedAt",
+  c."finalVersion", c."pendingReview",
+  comments."unresolvedComments",
+  COALESCE(decisions."latestDecisions", '[]'::jsonb) AS "latestDecisions"
+FROM candidates c
+CROSS JOIN LATERAL (
+  SELECT COUNT(*)::int AS "unresolvedComments"
+  FROM "BinderTestPeerComment" pc
+  WHERE pc."binderTestId" = c."id" AND pc."resolved" = false
+) comments
+LEFT JOIN LATERAL (
+  SELECT jsonb_agg(to_jsonb(d) ORDER BY d."summaryVersion" DESC) AS "latestDecisions"
+  FROM (
+    SELECT DISTINCT ON (r."summaryVersion")
+      r."summaryVersion", r."decision", r."decisionNotes", r."reviewerUserId", r."reviewerRole", r."createdAt"
+    FROM "BinderTestPeerReviewDecision" r
+    WHERE r."binderTestId" = c."id"
+    ORDER BY r."summaryVersion", r."createdAt" DESC
+  ) d
+) decisions ON true
+WHERE c."status" = 'PENDING_REVIEW' OR c."pendingReview" OR comments."unresolvedComments" > 0
+ORDER BY c."pendingReview" DESC, comments."unresolvedComments" DESC, c."updatedAt" DESC NULLS LAST
+LIMIT %(limit)s
+"""
+
+
+@app.get("/review/dashboard", response_model=ReviewDashboard)
+def review_dashboard(
+    reviewer_user_id: Optional[str] = Query(None, alias="reviewerUserId"),
+    limit: int = Query(REVIEW_DASHBOARD_LIMIT, ge=1, le=1000),
+    x_user_id: Optional[str] = Header(None, convert_underscores=False),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Open review work across binder tests in one query: unresolved comment counts, the latest
+    decision per summary version, and whether the reviewer still owes a decision on the FINAL
+    summary. The reviewer defaults to the calling user."""
+    reviewer = reviewer_user_id or x_user_id
+    rows = uow.fetch_all(REVIEW_DASHBOARD_SQL, {"reviewer": reviewer, "limit": limit})
+    return {"reviewerUserId": reviewer, "items": rows}
+
+
 # ----------------------------- Analytics intents -----------------------------
 class StorageStabilityPoint(BaseModel):
     label: str
@@ -1286,11 +2187,18 @@ class StorageStabilityPoint(BaseModel):
 class RecoveryVsReagentPoint(BaseModel):
     reagent: Optional[float]
     recovery: Optional[float]
+    # Populated only when the series was binned (maxPoints exceeded)
+    recoveryMin: Optional[float] = None
+    recoveryMax: Optional[float] = None
+    count: Optional[int] = None
 
 
 class EcoCapSofteningPoint(BaseModel):
     ecoCap: Optional[float]
     softeningPoint: Optional[float]
+    softeningPointMin: Optional[float] = None
+    softeningPointMax: Optional[float] = None
+    count: Optional[int] = None
 
 
 class PgImprovementPoint(BaseModel):
@@ -1307,6 +2215,39 @@ class AnalyticsOverview(BaseModel):
     pgImprovement: List[PgImprovementPoint]
 
 
+class ConfidenceBandPoint(BaseModel):
+    x: float
+    fit: float
+    lower: float
+    upper: float
+
+
+class RegressionFit(BaseModel):
+    x: str
+    y: str
+    n: int
+    slope: Optional[float]
+    intercept: Optional[float]
+    r_squared: Optional[float]
+    band: List[ConfidenceBandPoint]
+
+
+class OriginRelationship(BaseModel):
+    originId: Optional[str]
+    refineryName: Optional[str]
+    batchCount: int
+    means: dict[str, Optional[float]]
+    fits: List[RegressionFit]
+
+
+class AnalyticsRelationships(BaseModel):
+    batchCount: int
+    confidenceLevel: float
+    overall: List[RegressionFit]
+    correlation: dict[str, dict[str, Optional[float]]]
+    byOrigin: List[OriginRelationship]
+
+
 class AnalysisSet(BaseModel):
     id: str
     name: str
@@ -1316,7 +2257,11 @@ class AnalysisSet(BaseModel):
 
 
 @app.get("/analytics/binder", response_model=List[AnalysisSet])
-def binder_analytics(owner_id: Optional[str] = None, is_admin: bool = False):
+def binder_analytics(
+    owner_id: Optional[str] = None,
+    is_admin: bool = False,
+    uow: UnitOfWork = Depends(get_uow),
+):
     clauses: list[str] = []
     params: list[object] = []
     if not is_admin:
@@ -1327,7 +2272,7 @@ def binder_analytics(owner_id: Optional[str] = None, is_admin: bool = False):
     if clauses:
         where_sql = "WHERE " + " AND ".join(clauses)
 
-    rows = fetch_all(
+    rows = uow.fetch_all(
         f"""
         SELECT
           "id",
@@ -1344,12 +2289,39 @@ def binder_analytics(owner_id: Optional[str] = None, is_admin: bool = False):
     return rows
 
 
+def _downsample_trend(points: List[dict], timestamps: List[float], max_points: Optional[int]) -> List[dict]:
+    if not max_points or len(points) <= max_points:
+        return points
+    keep = lttb_indices(timestamps, [p["value"] for p in points], max_points)
+    return [points[i] for i in keep.tolist()]
+
+
+def _bin_scatter(points: List[dict], x_key: str, y_key: str, max_points: Optional[int]) -> List[dict]:
+    if not max_points or len(points) <= max_points:
+        return points
+    binned = bin_aggregate([p[x_key] for p in points], [p[y_key] for p in points], max_points)
+    return [
+        {x_key: x, y_key: y, f"{y_key}Min": y_min, f"{y_key}Max": y_max, "count": count}
+        for x, y, y_min, y_max, count in zip(
+            binned["x"].tolist(),
+            binned["y"].tolist(),
+            binned["y_min"].tolist(),
+            binned["y_max"].tolist(),
+            binned["count"].tolist(),
+        )
+    ]
+
+
 @app.get("/analytics/overview", response_model=AnalyticsOverview)
-def analytics_overview():
-    stability_rows = fetch_all(
+def analytics_overview(
+    max_points: Optional[int] = Query(None, alias="maxPoints", ge=3),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    stability_rows = uow.fetch_all(
         """
         SELECT
           pb."batchCode" AS label,
+          pb."createdAt" AS "createdAt",
           tr."storageStabilityDifference" AS value
         FROM "PmaBatch" pb
         LEFT JOIN LATERAL (
@@ -1363,13 +2335,15 @@ def analytics_overview():
         """
     )
 
-    stability = [
-        {"label": row["label"], "value": float(row["value"])}
-        for row in stability_rows
-        if row.get("value") is not None
-    ]
+    stability_rows = [row for row in stability_rows if row.get("value") is not None]
+    stability = [{"label": row["label"], "value": float(row["value"])} for row in stability_rows]
+    stability = _downsample_trend(
+        stability,
+        [row["createdAt"].timestamp() for row in stability_rows],
+        max_points,
+    )
 
-    recovery_rows = fetch_all(
+    recovery_rows = uow.fetch_all(
         """
         SELECT
           pf."reagentPercentage" AS reagent,
@@ -1392,8 +2366,9 @@ def analytics_overview():
         for row in recovery_rows
         if row.get("reagent") is not None and row.get("recovery") is not None
     ]
+    recovery = _bin_scatter(recovery, "reagent", "recovery", max_points)
 
-    eco_cap_rows = fetch_all(
+    eco_cap_rows = uow.fetch_all(
         """
         SELECT
           pf."ecoCapPercentage" AS "ecoCap",
@@ -1416,8 +2391,9 @@ def analytics_overview():
         for row in eco_cap_rows
         if row.get("ecoCap") is not None and row.get("softeningPoint") is not None
     ]
+    eco_cap = _bin_scatter(eco_cap, "ecoCap", "softeningPoint", max_points)
 
-    pg_rows = fetch_all(
+    pg_rows = uow.fetch_all(
         """
         SELECT
           pf."bitumenOriginId" AS "originId",
@@ -1457,6 +2433,327 @@ def analytics_overview():
     }
 
 
+RELATIONSHIP_PAIRS = [("reagent", "recovery"), ("ecoCap", "softeningPoint")]
+RELATIONSHIP_COLUMNS = ["ecoCap", "reagent", "recovery", "softeningPoint", "storageStability", "viscosity135"]
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    return None if value is None or np.isnan(value) else float(value)
+
+
+def _fit_relationship(frame: pd.DataFrame, x_key: str, y_key: str, band_points: int, level: float) -> dict:
+    pair = frame[[x_key, y_key]].dropna()
+    x_arr = pair[x_key].to_numpy()
+    y_arr = pair[y_key].to_numpy()
+    fit = {"x": x_key, "y": y_key, "n": int(x_arr.size), "slope": None, "intercept": None, "r_squared": None, "band": []}
+    if x_arr.size < 2 or np.ptp(x_arr) == 0:
+        return fit
+    slope, intercept, r2 = compute_trendline(x_arr, y_arr)
+    grid = np.linspace(x_arr.min(), x_arr.max(), band_points)
+    line, lower, upper = compute_confidence_band(x_arr, y_arr, grid, level)
+    fit.update(slope=slope, intercept=intercept, r_squared=r2)
+    fit["band"] = [
+        {"x": gx, "fit": gf, "lower": gl, "upper": gu}
+        for gx, gf, gl, gu in zip(grid.tolist(), line.tolist(), lower.tolist(), upper.tolist())
+    ]
+    return fit
+
+
+@app.get("/analytics/relationships", response_model=AnalyticsRelationships)
+def analytics_relationships(
+    band_points: int = Query(20, alias="bandPoints", ge=2, le=200),
+    confidence: float = Query(0.95, gt=0, lt=1),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    rows = uow.fetch_all(
+        """
+        SELECT
+          pf."bitumenOriginId" AS "originId",
+          bo."refineryName" AS "refineryName",
+          pf."ecoCapPercentage" AS "ecoCap",
+          pf."reagentPercentage" AS "reagent",
+          tr."elasticRecovery" AS "recovery",
+          tr."softeningPoint" AS "softeningPoint",
+          tr."storageStabilityDifference" AS "storageStability",
+          tr."viscosity135" AS "viscosity135"
+        FROM "PmaFormula" pf
+        JOIN "PmaBatch" pb ON pb."pmaFormulaId" = pf."id"
+        LEFT JOIN "BitumenOrigin" bo ON bo."id" = pf."bitumenOriginId"
+        LEFT JOIN LATERAL (
+          SELECT "elasticRecovery", "softeningPoint", "storageStabilityDifference", "viscosity135"
+          FROM "PmaTestResult" tr
+          WHERE tr."pmaBatchId" = pb."id"
+          ORDER BY tr."createdAt" DESC
+          LIMIT 1
+        ) tr ON TRUE
+        """
+    )
+    frame = pd.DataFrame(rows, columns=["originId", "refineryName", *RELATIONSHIP_COLUMNS])
+    frame[RELATIONSHIP_COLUMNS] = frame[RELATIONSHIP_COLUMNS].apply(pd.to_numeric, errors="coerce")
+
+    correlation = frame[RELATIONSHIP_COLUMNS].corr()
+    by_origin = []
+    for (origin_id, refinery_name), group in frame.groupby(["originId", "refineryName"], dropna=False, sort=False):
+        origin_means = group[RELATIONSHIP_COLUMNS].mean()
+        by_origin.append(
+            {
+                "originId": None if pd.isna(origin_id) else origin_id,
+                "refineryName": None if pd.isna(refinery_name) else refinery_name,
+                "batchCount": int(len(group)),
+                "means": {col: _nan_to_none(origin_means[col]) for col in RELATIONSHIP_COLUMNS},
+                "fits": [_fit_relationship(group, x, y, band_points, confidence) for x, y in RELATIONSHIP_PAIRS],
+            }
+        )
+
+    return {
+        "batchCount": int(len(frame)),
+        "confidenceLevel": confidence,
+        "overall": [_fit_relationship(frame, x, y, band_points, confidence) for x, y in RELATIONSHIP_PAIRS],
+        "correlation": {
+            row: {col: _nan_to_none(correlation.at[row, col]) for col in RELATIONSHIP_COLUMNS}
+            for row in RELATIONSHIP_COLUMNS
+        },
+        "byOrigin": by_origin,
+    }
+
+
+# ----------------------------- Bulk exports -----------------------------
+BINDER_TEST_EXPORT_COLUMNS = {
+    "id": "str",
+    "name": "str",
+    "testName": "str",
+    "status": "str",
+    "lifecycleStatus": "str",
+    "pgHigh": "int",
+    "pgLow": "int",
+    "batchId": "str",
+    "binderSource": "str",
+    "crmPct": "float",
+    "reagentPct": "float",
+    "aerosilPct": "float",
+    "softeningPointC": "float",
+    "viscosity155_cP": "float",
+    "ductilityCm": "float",
+    "recoveryPct": "float",
+    "jnr_3_2": "float",
+    "lab": "str",
+    "operator": "str",
+    "testPurpose": "str",
+    "materialDescription": "str",
+    "testStandard": "str",
+    "keywords": "json",
+    "createdAt": "timestamp",
+    "updatedAt": "timestamp",
+}
+
+BINDER_TEST_METRIC_EXPORT_COLUMNS = {
+    "id": "str",
+    "binderTestId": "str",
+    "parseRunId": "str",
+    "metricType": "str",
+    "metricName": "str",
+    "position": "str",
+    "value": "float",
+    "units": "str",
+    "temperature": "float",
+    "frequency": "float",
+    "sourceFileId": "str",
+    "sourcePage": "int",
+    "language": "str",
+    "confidence": "float",
+    "isUserConfirmed": "bool",
+    "confirmedAt": "timestamp",
+    "createdAt": "timestamp",
+    "updatedAt": "timestamp",
+}
+
+
+def _export_response(query: str, params: list, columns: dict, fmt: str, chunk_size: int, filename: str):
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_MEDIA_TYPES)}")
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    chunks = stream_rows(query, params, chunk_size, readonly=True)
+    if fmt == "ndjson":
+        body = ndjson_stream(chunks)
+    elif fmt == "csv":
+        body = csv_stream(chunks, columns)
+    else:
+        body = parquet_stream(chunks, columns)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@app.get("/export/binder-tests")
+def export_binder_tests(
+    format: str = "ndjson",
+    status: Optional[str] = None,
+    updated_since: Optional[datetime] = Query(None, alias="updatedSince"),
+    chunk_size: int = Query(2000, alias="chunkSize", ge=100, le=50000),
+):
+    clauses: list[str] = []
+    params: list[object] = []
+    if status:
+        clauses.append('"status" = %s')
+        params.append(status)
+    if updated_since:
+        clauses.append('"updatedAt" >= %s')
+        params.append(updated_since)
+    where_sql = "WHERE " + " AND ".join(clauses) if clauses else ""
+    column_sql = ", ".join(f'"{c}"' for c in BINDER_TEST_EXPORT_COLUMNS)
+    query = f'SELECT {column_sql} FROM "BinderTest" {where_sql} ORDER BY "createdAt" ASC, "id" ASC'
+    return _export_response(query, params, BINDER_TEST_EXPORT_COLUMNS, format, chunk_size, "binder-tests")
+
+
+@app.get("/export/binder-test-metrics")
+def export_binder_test_metrics(
+    format: str = "ndjson",
+    binder_test_id: Optional[str] = Query(None, alias="binderTestId"),
+    confirmed_only: bool = Query(False, alias="confirmedOnly"),
+    chunk_size: int = Query(5000, alias="chunkSize", ge=100, le=50000),
+):
+    clauses: list[str] = []
+    params: list[object] = []
+    if binder_test_id:
+        clauses.append('"binderTestId" = %s')
+        params.append(binder_test_id)
+    if confirmed_only:
+        clauses.append('"isUserConfirmed" = true')
+    where_sql = "WHERE " + " AND ".join(clauses) if clauses else ""
+    column_sql = ", ".join(
+        f'"{c}"::text AS "{c}"' if c in ("id", "parseRunId") else f'"{c}"' for c in BINDER_TEST_METRIC_EXPORT_COLUMNS
+    )
+    query = f'SELECT {column_sql} FROM "BinderTestMetric" {where_sql} ORDER BY "createdAt" ASC, "id" ASC'
+    return _export_response(
+        query, params, BINDER_TEST_METRIC_EXPORT_COLUMNS, format, chunk_size, "binder-test-metrics"
+    )
+
+
+# Every FINAL summary created in the range, preceded by the rows needed to rebuild it: its
+# nearest snapshot and the patches after that, ordered so each chain is contiguous.
+SUMMARY_BUNDLE_SQL = """
+WITH finals AS (
+  SELECT f."binderTestId", f."version" AS "finalVersion", f."createdAt" AS "finalCreatedAt",
+    (
+      SELECT MAX(b."version") FROM "BinderTestSummary" b
+      WHERE b."binderTestId" = f."binderTestId" AND b."version" <= f."version" AND b."summaryJson" IS NOT NULL
+    ) AS "baseVersion"
+  FROM "BinderTestSummary" f
+  WHERE f."status" = 'FINAL' {range_sql}
+)
+SELECT
+  s."id"::text AS "id",
+  s."binderTestId",
+  s."version",
+  s."doiLikeId",
+  s."status",
+  s."createdAt",
+  s."createdByUserId",
+  s."createdByRole",
+  s."derivedFromMetricsHash",
+  s."supersedesSummaryId"::text AS "supersedesSummaryId",
+  CASE WHEN s."version" = f."baseVersion" THEN s."summaryJson" END AS "summaryJson",
+  s."summaryPatch",
+  s."version" = f."finalVersion" AS "isFinal",
+  CASE WHEN s."version" = f."finalVersion" THEN (
+    SELECT COALESCE(
+      jsonb_agg(
+        jsonb_build_object(
+          'id', d."id", 'fileUrl', d."fileUrl", 'fileType', d."fileType",
+          'label', d."label", 'createdAt', d."createdAt"
+        )
+        ORDER BY d."createdAt", d."id"
+      ),
+      '[]'::jsonb
+    )
+    FROM "BinderTestDataFile" d
+    WHERE d."binderTestId" = s."binderTestId"
+  ) END AS "evidenceFiles"
+FROM finals f
+JOIN "BinderTestSummary" s
+  ON s."binderTestId" = f."binderTestId" AND s."version" BETWEEN f."baseVersion" AND f."finalVersion"
+ORDER BY f."finalCreatedAt" ASC, f."binderTestId" ASC, s."version" ASC
+"""
+
+
+SUMMARY_MANIFEST_SPOOL_BYTES = 1024 * 1024
+
+
+def _manifest_chunks(entries, meta: dict):
+    """manifest.json as {**meta, "summaries": [...]}, read back from the spooled entries."""
+    yield json_dumps(meta)[:-1].encode() + b', "summaries": ['
+    entries.seek(0)
+    while True:
+        chunk = entries.read(64 * 1024)
+        if not chunk:
+            break
+        yield chunk
+    yield b"]}"
+
+
+def _summary_bundle_files(chunks, range_meta: dict):
+    """(name, bytes) per FINAL summary, rebuilt from its delta chain, then the manifest. Manifest
+    entries are spooled to a temporary file as summaries are written, so memory stays flat
+    however many summaries the range holds."""
+    count = 0
+    doc = None
+    with tempfile.SpooledTemporaryFile(max_size=SUMMARY_MANIFEST_SPOOL_BYTES) as entries:
+        for rows in chunks:
+            for row in rows:
+                patch = row.pop("summaryPatch")
+                doc = row["summaryJson"] if row["summaryJson"] is not None else apply_patch(doc, patch)
+                if not row.pop("isFinal"):
+                    continue
+                record = {**row, "summaryJson": doc}
+                data = json_dumps(record).encode()
+                name = f"summaries/{row['doiLikeId']}.json"
+                entry = {
+                    "file": name,
+                    "doiLikeId": row["doiLikeId"],
+                    "binderTestId": row["binderTestId"],
+                    "version": row["version"],
+                    "createdAt": row["createdAt"],
+                    "derivedFromMetricsHash": row["derivedFromMetricsHash"],
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "bytes": len(data),
+                }
+                entries.write((b", " if count else b"") + json_dumps(entry).encode())
+                count += 1
+                yield name, data
+                doc = None
+        meta = {**range_meta, "generatedAt": datetime.utcnow(), "count": count}
+        yield "manifest.json", _manifest_chunks(entries, meta)
+
+
+@app.get("/export/binder-test-summaries")
+def export_binder_test_summaries(
+    created_from: Optional[datetime] = Query(None, alias="from"),
+    created_to: Optional[datetime] = Query(None, alias="to"),
+    chunk_size: int = Query(500, alias="chunkSize", ge=10, le=10000),
+):
+    """Zip of every FINAL summary created in [from, to): one JSON per summary with its evidence
+    files, plus manifest.json. Streamed from a server-side cursor as it is built."""
+    clauses: list[str] = []
+    params: list[object] = []
+    if created_from:
+        clauses.append('f."createdAt" >= %s')
+        params.append(created_from)
+    if created_to:
+        clauses.append('f."createdAt" < %s')
+        params.append(created_to)
+    query = SUMMARY_BUNDLE_SQL.format(range_sql="".join(f"AND {c} " for c in clauses))
+    chunks = stream_rows(query, params, chunk_size, readonly=True)
+    body = zip_stream(_summary_bundle_files(chunks, {"from": created_from, "to": created_to}))
+    return StreamingResponse(
+        body,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="binder-test-summaries.zip"'},
+    )
+
+
 # ----------------------------- Capsule writes -----------------------------
 class CapsuleMaterialInput(BaseModel):
     materialName: str
@@ -1479,17 +2776,21 @@ class CapsuleUpdate(BaseModel):
 class DbQueryRequest(BaseModel):
     query: str
     params: Optional[List[Any]] = None
+    timeoutMs: Optional[int] = Field(None, ge=1, description="statement_timeout for this request")
+    maxRows: Optional[int] = Field(None, ge=1, description="Row cap for buffered responses")
+    stream: bool = Field(False, description="Stream every row as NDJSON instead of capping")
+    readOnly: Optional[bool] = Field(None, description="Force/skip read-only routing; default detects SELECT")
 
 
 @app.post("/db/capsules")
-def create_capsule(payload: CapsuleCreate):
+def create_capsule(payload: CapsuleCreate, uow: UnitOfWork = Depends(get_uow)):
     if not payload.materials:
         raise HTTPException(status_code=400, detail="At least one material is required")
     total = sum(m.percentage for m in payload.materials)
     if abs(round(total, 3) - 100) > 0.001:
         raise HTTPException(status_code=400, detail=f"Material percentages must total 100%. Currently {total}%")
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute(
             """
             INSERT INTO "CapsuleFormula" ("name", "description", "createdById", "updatedAt")
@@ -1510,7 +2811,8 @@ def create_capsule(payload: CapsuleCreate):
                 (capsule["id"], m.materialName, m.percentage),
             )
             materials.append(cur.fetchone())
-        conn.commit()
+        uow.commit()
+    response_cache.invalidate("capsules")
 
     return {
         **capsule,
@@ -1520,7 +2822,7 @@ def create_capsule(payload: CapsuleCreate):
 
 
 @app.patch("/db/capsules/{capsule_id}")
-def update_capsule(capsule_id: str, payload: CapsuleUpdate):
+def update_capsule(capsule_id: str, payload: CapsuleUpdate, uow: UnitOfWork = Depends(get_uow)):
     if payload.materials is not None:
         if len(payload.materials) < 1:
             raise HTTPException(status_code=400, detail="At least one material is required")
@@ -1531,7 +2833,7 @@ def update_capsule(capsule_id: str, payload: CapsuleUpdate):
     if payload.name is None and payload.description is None and payload.materials is None:
         raise HTTPException(status_code=400, detail="No changes provided")
 
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute('SELECT 1 FROM "CapsuleFormula" WHERE "id" = %s', (capsule_id,))
         if cur.fetchone() is None:
             raise HTTPException(status_code=404, detail="Capsule not found")
@@ -1559,32 +2861,33 @@ def update_capsule(capsule_id: str, payload: CapsuleUpdate):
                     (capsule_id, m.materialName, m.percentage),
                 )
 
-        conn.commit()
+        uow.commit()
+        response_cache.invalidate("capsules", "pma-formulas")
 
-            cur.execute(
-                """
-                SELECT
-                  cf."id",
-                  cf."name",
-                  cf."description",
-                  cf."createdAt",
-                  cf."updatedAt",
-                  COALESCE(
-                    (
-                      SELECT json_agg(json_build_object(
-                        'id', m."id",
-                        'materialName', m."materialName",
-                        'percentage', m."percentage"
-                      ) ORDER BY m."createdAt")
-                      FROM "CapsuleFormulaMaterial" m
-                      WHERE m."capsuleFormulaId" = cf."id"
-                    ),
-                    '[]'
-                  ) AS "materials",
-                  (SELECT COUNT(*) FROM "PmaFormula" p WHERE p."capsuleFormulaId" = cf."id") AS "pmaCount"
-                FROM "CapsuleFormula" cf
-                WHERE cf."id" = %s
-                """,
+        cur.execute(
+            """
+            SELECT
+              cf."id",
+              cf."name",
+              cf."description",
+              cf."createdAt",
+              cf."updatedAt",
+              COALESCE(
+                (
+                  SELECT json_agg(json_build_object(
+                    'id', m."id",
+                    'materialName', m."materialName",
+                    'percentage', m."percentage"
+                  ) ORDER BY m."createdAt")
+                  FROM "CapsuleFormulaMaterial" m
+                  WHERE m."capsuleFormulaId" = cf."id"
+                ),
+                '[]'
+              ) AS "materials",
+              (SELECT COUNT(*) FROM "PmaFormula" p WHERE p."capsuleFormulaId" = cf."id") AS "pmaCount"
+            FROM "CapsuleFormula" cf
+            WHERE cf."id" = %s
+            """,
             (capsule_id,),
         )
         updated = cur.fetchone()
@@ -1592,66 +2895,331 @@ def update_capsule(capsule_id: str, payload: CapsuleUpdate):
     return updated
 
 
+BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", "20000"))
+
+
+class BulkImportError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportCreated(BaseModel):
+    row: int
+    id: str
+
+
+class BulkImportResponse(BaseModel):
+    inserted: int
+    created: List[BulkImportCreated]
+    errors: List[BulkImportError]
+
+
+BULK_CSV_MEDIA_TYPES = ("text/csv", "application/csv", "text/plain")
+
+
+def _is_csv_body(request: Request) -> bool:
+    return request.headers.get("content-type", "").split(";")[0].strip().lower() in BULK_CSV_MEDIA_TYPES
+
+
+async def _read_bulk_rows(request: Request) -> List[Tuple[int, Any]]:
+    """(row number, fields) from a JSON array (or {"items": [...]}) or a CSV body with a header.
+
+    JSON rows are numbered from 0 by position; CSV rows by line, so the header is line 1. Empty
+    CSV cells become None.
+    """
+    body = await request.body()
+    if _is_csv_body(request):
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            rows = [
+                (line, {k.strip(): (v.strip() or None) if isinstance(v, str) else v for k, v in row.items() if k})
+                for line, row in enumerate(reader, start=2)
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {exc}")
+    else:
+        try:
+            payload = json.loads(body)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}")
+        if isinstance(payload, dict):
+            payload = payload.get("items")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of rows or {\"items\": [...]}")
+        rows = list(enumerate(payload))
+    if not rows:
+        raise HTTPException(status_code=400, detail="No rows to import")
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_ROWS} rows per request")
+    return rows
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f'{".".join(str(p) for p in e["loc"]) or "row"}: {e["msg"]}' for e in exc.errors())
+
+
+def _bulk_result(created: list, errors: list) -> dict:
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": len(created), "created": created, "errors": errors}
+
+
+def _capsule_bulk_items(rows: List[Tuple[int, Any]], from_csv: bool) -> List[Tuple[int, Any]]:
+    """CSV has one material per line; consecutive lines sharing a name form one capsule."""
+    if not from_csv:
+        return rows
+    items: List[Tuple[int, dict]] = []
+    for line, row in rows:
+        material = {"materialName": row.get("materialName"), "percentage": row.get("percentage")}
+        if items and row.get("name") is not None and items[-1][1].get("name") == row.get("name"):
+            items[-1][1]["materials"].append(material)
+            continue
+        items.append(
+            (
+                line,
+                {
+                    "name": row.get("name"),
+                    "description": row.get("description"),
+                    "createdById": row.get("createdById"),
+                    "materials": [material],
+                },
+            )
+        )
+    return items
+
+
+@app.post("/db/capsules/bulk", response_model=BulkImportResponse, status_code=201)
+async def bulk_create_capsules(
+    request: Request,
+    all_or_nothing: bool = Query(False, alias="allOrNothing", description="Insert nothing if any row fails"),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Create many capsules from a JSON array of CapsuleCreate objects or a CSV with columns
+    name, description, createdById, materialName, percentage (one material per line). Creator
+    references are checked in one query.
+
+    Valid rows are written with COPY in one transaction; invalid rows are reported by row number
+    and skipped (or, with allOrNothing, the request fails with 422 and nothing is written).
+    """
+    rows = await _read_bulk_rows(request)
+    items = _capsule_bulk_items(rows, _is_csv_body(request))
+    return await run_in_threadpool(_bulk_create_capsules, uow, items, all_or_nothing)
+
+
+def _bulk_create_capsules(uow: UnitOfWork, items: List[Tuple[int, Any]], all_or_nothing: bool) -> dict:
+    errors: list[dict] = []
+    valid: list[Tuple[int, CapsuleCreate]] = []
+    for row, fields in items:
+        try:
+            capsule = CapsuleCreate.model_validate(fields)
+        except ValidationError as exc:
+            errors.append({"row": row, "error": _validation_message(exc)})
+            continue
+        total = sum(m.percentage for m in capsule.materials)
+        if not capsule.materials:
+            errors.append({"row": row, "error": "At least one material is required"})
+        elif abs(round(total, 3) - 100) > 0.001:
+            errors.append({"row": row, "error": f"Material percentages must total 100%. Currently {total}%"})
+        else:
+            valid.append((row, capsule))
+
+    # One round trip for the creator check and the transaction's timestamp, shared by every row.
+    existing = uow.fetch_one(
+        'SELECT now() AS "now", ARRAY(SELECT "id" FROM "User" WHERE "id" = ANY(%s)) AS "users"',
+        (list({c.createdById for _, c in valid if c.createdById}),),
+    )
+    users = set(existing["users"])
+    missing_creator = {row for row, c in valid if c.createdById and c.createdById not in users}
+    errors.extend({"row": row, "error": "Creator user not found"} for row in sorted(missing_creator))
+    valid = [(row, c) for row, c in valid if row not in missing_creator]
+    if errors and all_or_nothing:
+        raise HTTPException(status_code=422, detail=_bulk_result([], errors))
+
+    created = [{"row": row, "id": str(uuid4())} for row, _ in valid]
+    if valid:
+        now = existing["now"]
+        with uow.cursor() as cur:
+            with cur.copy(
+                'COPY "CapsuleFormula" ("id", "name", "description", "createdById", "createdAt", "updatedAt") '
+                "FROM STDIN"
+            ) as copy:
+                for (_, capsule), new in zip(valid, created):
+                    copy.write_row((new["id"], capsule.name, capsule.description, capsule.createdById, now, now))
+            with cur.copy(
+                'COPY "CapsuleFormulaMaterial" '
+                '("id", "capsuleFormulaId", "materialName", "percentage", "createdAt", "updatedAt") FROM STDIN'
+            ) as copy:
+                for (_, capsule), new in zip(valid, created):
+                    for index, m in enumerate(capsule.materials):
+                        # Materials are listed by createdAt, so keep the submitted order in it.
+                        created_at = now + timedelta(milliseconds=index)
+                        copy.write_row((str(uuid4()), new["id"], m.materialName, m.percentage, created_at, now))
+        uow.commit()
+        response_cache.invalidate("capsules")
+    return _bulk_result(created, errors)
+
+
+DB_QUERY_TIMEOUT_MS = int(os.environ.get("DB_QUERY_TIMEOUT_MS", "15000"))
+DB_QUERY_MAX_TIMEOUT_MS = int(os.environ.get("DB_QUERY_MAX_TIMEOUT_MS", "120000"))
+DB_QUERY_MAX_ROWS = int(os.environ.get("DB_QUERY_MAX_ROWS", "10000"))
+DB_QUERY_STREAM_CHUNK = 2000
+
+_PLACEHOLDER_RE = re.compile(r"\$(\d+)")
+_LOCKING_READ_RE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b|\bnextval\s*\(", re.IGNORECASE)
+_READ_STATEMENT_RE = re.compile(r"(SELECT|WITH|VALUES|TABLE)\b", re.IGNORECASE)
+# Data-modifying CTEs; a conservative match, so a false positive only costs read routing.
+_CTE_WRITE_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _prepare_gateway_sql(query: str) -> Tuple[str, Tuple[int, ...], bool]:
+    """Rewrite $n placeholders to psycopg's %s (escaping literal %) and classify the statement.
+
+    Returns (sql, param_order, is_plain_select); param_order maps each %s to a 0-based index
+    into the caller's params so reordered or repeated $n references bind correctly. SELECT,
+    VALUES, TABLE and WITH queries are plain selects unless they lock rows, call nextval or (for
+    WITH) contain a data-modifying CTE.
+    """
+    order: list[int] = []
+
+    def _placeholder(match: re.Match) -> str:
+        order.append(int(match.group(1)) - 1)
+        return "%s"
+
+    sql = _PLACEHOLDER_RE.sub(_placeholder, query.replace("%", "%%"))
+    stripped = re.sub(r"^\s*(--[^\n]*\n\s*|/\*.*?\*/\s*)*", "", query, flags=re.DOTALL)
+    leading = _READ_STATEMENT_RE.match(stripped)
+    is_select = (
+        leading is not None
+        and not _LOCKING_READ_RE.search(query)
+        and not (leading.group(1).upper() == "WITH" and _CTE_WRITE_RE.search(query))
+    )
+    return sql, tuple(order), is_select
+
+
+def _query_timing_headers(started: float, truncated: bool = False) -> dict:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    headers = {"Server-Timing": f"db;dur={elapsed_ms:.1f}", "X-Query-Time-Ms": f"{elapsed_ms:.1f}"}
+    if truncated:
+        headers["X-Query-Truncated"] = "1"
+    return headers
+
+
 @app.post("/db/query")
-def db_query(payload: DbQueryRequest):
-    # Convert Postgres-style $1 placeholders to psycopg paramstyle (%s)
-    rewritten_sql = re.sub(r"\$\d+", "%s", payload.query)
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(rewritten_sql, payload.params or [])
-        if cur.description:
-            rows = cur.fetchall()
-            return {"ok": True, "rows": rows}
-        return {"ok": True, "rowcount": cur.rowcount}
+def db_query(payload: DbQueryRequest, response: Response):
+    sql, order, is_select = _prepare_gateway_sql(payload.query)
+    supplied = payload.params or []
+    if any(i < 0 or i >= len(supplied) for i in order):
+        raise HTTPException(status_code=400, detail="Query references a $n placeholder with no matching param")
+    params = [supplied[i] for i in order]
+    readonly = payload.readOnly if payload.readOnly is not None else is_select
+    timeout_ms = min(payload.timeoutMs or DB_QUERY_TIMEOUT_MS, DB_QUERY_MAX_TIMEOUT_MS)
+    max_rows = min(payload.maxRows or DB_QUERY_MAX_ROWS, DB_QUERY_MAX_ROWS)
+    started = time.perf_counter()
+
+    try:
+        if payload.stream:
+            if not is_select:
+                raise HTTPException(status_code=400, detail="Only plain SELECT statements can be streamed")
+            chunks = stream_rows(
+                sql, params, DB_QUERY_STREAM_CHUNK, readonly=readonly, statement_timeout_ms=timeout_ms
+            )
+            first = next(chunks, [])
+            return StreamingResponse(
+                ndjson_stream(itertools.chain([first], chunks)),
+                media_type=EXPORT_MEDIA_TYPES["ndjson"],
+                headers=_query_timing_headers(started),
+            )
+
+        with get_conn(readonly=readonly) as conn:
+            with conn.cursor() as setup:
+                set_statement_timeout(setup, timeout_ms)
+            if is_select:
+                # A client-side cursor would pull the whole result into the worker on execute();
+                # a named cursor fetches only the max_rows + 1 rows needed to detect truncation.
+                with conn.cursor(name=f"gateway_{uuid4().hex}") as cur:
+                    cur.execute(sql, params)
+                    rows = cur.fetchmany(max_rows + 1)
+                if not readonly:
+                    conn.commit()
+                truncated = len(rows) > max_rows
+                response.headers.update(_query_timing_headers(started, truncated))
+                if truncated:
+                    return {"ok": True, "rows": rows[:max_rows], "truncated": True, "maxRows": max_rows}
+                return {"ok": True, "rows": rows}
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                if cur.description:
+                    rows = cur.fetchmany(max_rows + 1)
+                    truncated = len(rows) > max_rows
+                    if not readonly:
+                        conn.commit()
+                    response.headers.update(_query_timing_headers(started, truncated))
+                    if truncated:
+                        return {"ok": True, "rows": rows[:max_rows], "truncated": True, "maxRows": max_rows}
+                    return {"ok": True, "rows": rows}
+                rowcount = cur.rowcount
+            if not readonly:
+                conn.commit()
+            response.headers.update(_query_timing_headers(started))
+            return {"ok": True, "rowcount": rowcount}
+    except psycopg.errors.QueryCanceled:
+        raise HTTPException(status_code=504, detail=f"Query exceeded statement_timeout of {timeout_ms} ms")
+
+
+# Lookups are plain left joins and batch counts one grouped pass over PmaBatch.
+PMA_FORMULA_LIST_SQL = """
+SELECT
+  pf."id",
+  pf."name",
+  pf."capsuleFormulaId",
+  pf."bitumenOriginId",
+  pf."bitumenTestId",
+  pf."ecoCapPercentage",
+  pf."reagentPercentage",
+  pf."pmaTargetPgHigh",
+  pf."pmaTargetPgLow",
+  pf."bitumenGradeOverride",
+  pf."notes",
+  CASE WHEN cf."id" IS NOT NULL THEN json_build_object(
+    'id', cf."id",
+    'name', cf."name"
+  ) END AS "capsuleFormula",
+  CASE WHEN bo."id" IS NOT NULL THEN json_build_object(
+    'id', bo."id",
+    'refineryName', bo."refineryName",
+    'binderGrade', bo."binderGrade"
+  ) END AS "bitumenOrigin",
+  CASE WHEN bt."id" IS NOT NULL THEN json_build_object(
+    'id', bt."id",
+    'batchCode', bt."batchCode"
+  ) END AS "bitumenTest",
+  COALESCE(pb."batchCount", 0) AS "batchCount",
+  pf."createdAt",
+  pf."updatedAt"
+FROM "PmaFormula" pf
+LEFT JOIN "CapsuleFormula" cf ON cf."id" = pf."capsuleFormulaId"
+LEFT JOIN "BitumenOrigin" bo ON bo."id" = pf."bitumenOriginId"
+LEFT JOIN "BitumenBaseTest" bt ON bt."id" = pf."bitumenTestId"
+LEFT JOIN (
+  SELECT "pmaFormulaId", COUNT(*) AS "batchCount"
+  FROM "PmaBatch"
+  GROUP BY "pmaFormulaId"
+) pb ON pb."pmaFormulaId" = pf."id"
+ORDER BY pf."createdAt" DESC
+"""
 
 
 @app.get("/db/pma-formulas", response_model=List[PmaFormulaResponse])
-def list_pma_formulas():
-    rows = fetch_all(
-        """
-        SELECT
-          "id",
-          "name",
-          "capsuleFormulaId",
-          "bitumenOriginId",
-          "bitumenTestId",
-          "ecoCapPercentage",
-          "reagentPercentage",
-          "pmaTargetPgHigh",
-          "pmaTargetPgLow",
-          "bitumenGradeOverride",
-          "notes",
-          (
-            SELECT json_build_object(
-              'id', cf."id",
-              'name', cf."name"
-            ) FROM "CapsuleFormula" cf WHERE cf."id" = pf."capsuleFormulaId"
-          ) AS "capsuleFormula",
-          (
-            SELECT json_build_object(
-              'id', bo."id",
-              'refineryName', bo."refineryName",
-              'binderGrade', bo."binderGrade"
-            ) FROM "BitumenOrigin" bo WHERE bo."id" = pf."bitumenOriginId"
-          ) AS "bitumenOrigin",
-          (
-            SELECT json_build_object(
-              'id', bt."id",
-              'batchCode', bt."batchCode"
-            ) FROM "BitumenBaseTest" bt WHERE bt."id" = pf."bitumenTestId"
-          ) AS "bitumenTest",
-          (SELECT COUNT(*) FROM "PmaBatch" pb WHERE pb."pmaFormulaId" = pf."id") AS "batchCount",
-          "createdAt",
-          "updatedAt"
-        FROM "PmaFormula" pf
-        ORDER BY pf."createdAt" DESC
-        """
-    )
+def list_pma_formulas(uow: UnitOfWork = Depends(get_uow)):
+    rows = cached_fetch_all(uow, "pma-formulas", PMA_FORMULA_LIST_SQL)
     return rows
 
 
 @app.get("/db/pma-formulas/{formula_id}", response_model=PmaFormulaResponse)
-def get_pma_formula(formula_id: str):
-    row = fetch_one(
+def get_pma_formula(formula_id: str, uow: UnitOfWork = Depends(get_uow)):
+    row = cached_fetch_one(
+        uow,
+        "pma-formulas",
         """
         SELECT
           "id",
@@ -1676,22 +3244,22 @@ def get_pma_formula(formula_id: str):
 
 
 @app.post("/db/pma-formulas", response_model=PmaFormulaResponse)
-def create_pma_formula(payload: PmaFormulaCreate):
+def create_pma_formula(payload: PmaFormulaCreate, uow: UnitOfWork = Depends(get_uow)):
     # Basic validation: ensure capsule and origin exist
-    capsule = fetch_one('SELECT "id" FROM "CapsuleFormula" WHERE "id" = %s', (payload.capsuleFormulaId,))
+    capsule = uow.fetch_one('SELECT "id" FROM "CapsuleFormula" WHERE "id" = %s', (payload.capsuleFormulaId,))
     if not capsule:
         raise HTTPException(status_code=400, detail="Capsule formula not found")
-    origin = fetch_one('SELECT "id" FROM "BitumenOrigin" WHERE "id" = %s', (payload.bitumenOriginId,))
+    origin = uow.fetch_one('SELECT "id" FROM "BitumenOrigin" WHERE "id" = %s', (payload.bitumenOriginId,))
     if not origin:
         raise HTTPException(status_code=400, detail="Bitumen origin not found")
 
     if payload.bitumenTestId:
-        test = fetch_one('SELECT "id" FROM "BitumenBaseTest" WHERE "id" = %s', (payload.bitumenTestId,))
+        test = uow.fetch_one('SELECT "id" FROM "BitumenBaseTest" WHERE "id" = %s', (payload.bitumenTestId,))
         if not test:
             raise HTTPException(status_code=400, detail="Bitumen base test not found")
 
     new_id = str(uuid4())
-    with get_conn() as conn, conn.cursor() as cur:
+    with uow.cursor() as cur:
         cur.execute(
             """
             INSERT INTO "PmaFormula" (
@@ -1722,9 +3290,10 @@ def create_pma_formula(payload: PmaFormulaCreate):
                 payload.notes,
             ),
         )
-        conn.commit()
+        uow.commit()
+    response_cache.invalidate("pma-formulas", "capsules")
 
-    created = fetch_one(
+    created = uow.fetch_one(
         """
         SELECT
           pf."id",
@@ -1769,21 +3338,227 @@ def create_pma_formula(payload: PmaFormulaCreate):
     )
     return created
 
-@app.post("/compute/pg", response_model=PGResponse)
-def compute_pg_endpoint(payload: PGRequest):
-    pg_high = compute_pg_grade(payload.temps, payload.gstar_original, payload.gstar_rtfo)
-    return PGResponse(pg_high=pg_high, inputs=payload)
 
+PMA_FORMULA_BULK_COLUMNS = (
+    "name",
+    "capsuleFormulaId",
+    "bitumenOriginId",
+    "bitumenTestId",
+    "ecoCapPercentage",
+    "reagentPercentage",
+    "mixRpm",
+    "mixTimeMinutes",
+    "pmaTargetPgHigh",
+    "pmaTargetPgLow",
+    "bitumenGradeOverride",
+    "notes",
+)
+
+
+@app.post("/db/pma-formulas/bulk", response_model=BulkImportResponse, status_code=201)
+async def bulk_create_pma_formulas(
+    request: Request,
+    all_or_nothing: bool = Query(False, alias="allOrNothing", description="Insert nothing if any row fails"),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    """Create many PMA formulas from a JSON array of PmaFormulaCreate objects or a CSV with the
+    same columns. Capsule, origin and base test references are checked in one query."""
+    rows = await _read_bulk_rows(request)
+    return await run_in_threadpool(_bulk_create_pma_formulas, uow, rows, all_or_nothing)
+
+
+def _bulk_create_pma_formulas(uow: UnitOfWork, rows: List[Tuple[int, Any]], all_or_nothing: bool) -> dict:
+    errors: list[dict] = []
+    parsed: list[Tuple[int, PmaFormulaCreate]] = []
+    for row, fields in rows:
+        try:
+            parsed.append((row, PmaFormulaCreate.model_validate(fields)))
+        except ValidationError as exc:
+            errors.append({"row": row, "error": _validation_message(exc)})
+
+    existing = uow.fetch_one(
+        """
+        SELECT
+          now() AS "now",
+          ARRAY(SELECT "id" FROM "CapsuleFormula" WHERE "id" = ANY(%s)) AS "capsules",
+          ARRAY(SELECT "id" FROM "BitumenOrigin" WHERE "id" = ANY(%s)) AS "origins",
+          ARRAY(SELECT "id" FROM "BitumenBaseTest" WHERE "id" = ANY(%s)) AS "tests"
+        """,
+        (
+            list({f.capsuleFormulaId for _, f in parsed}),
+            list({f.bitumenOriginId for _, f in parsed}),
+            list({f.bitumenTestId for _, f in parsed if f.bitumenTestId}),
+        ),
+    )
+    capsules, origins, tests = (set(existing[key]) for key in ("capsules", "origins", "tests"))
+    valid: list[Tuple[int, PmaFormulaCreate]] = []
+    for row, formula in parsed:
+        if formula.capsuleFormulaId not in capsules:
+            errors.append({"row": row, "error": "Capsule formula not found"})
+        elif formula.bitumenOriginId not in origins:
+            errors.append({"row": row, "error": "Bitumen origin not found"})
+        elif formula.bitumenTestId and formula.bitumenTestId not in tests:
+            errors.append({"row": row, "error": "Bitumen base test not found"})
+        else:
+            valid.append((row, formula))
+    if errors and all_or_nothing:
+        raise HTTPException(status_code=422, detail=_bulk_result([], errors))
+
+    created = [{"row": row, "id": str(uuid4())} for row, _ in valid]
+    if valid:
+        now = existing["now"]
+        column_sql = ", ".join(f'"{c}"' for c in ("id", *PMA_FORMULA_BULK_COLUMNS, "createdAt", "updatedAt"))
+        with uow.cursor() as cur:
+            with cur.copy(f'COPY "PmaFormula" ({column_sql}) FROM STDIN') as copy:
+                for (_, formula), new in zip(valid, created):
+                    copy.write_row((new["id"], *(getattr(formula, c) for c in PMA_FORMULA_BULK_COLUMNS), now, now))
+        uow.commit()
+        response_cache.invalidate("pma-formulas", "capsules")
+    return _bulk_result(created, errors)
+
+
+# ----------------------------- Compute -----------------------------
+def _compute_openapi(model: type[BaseModel]) -> dict:
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    content = {"application/json": {"schema": model.model_json_schema()}}
+    content.update({media: binary for media in ARRAY_MEDIA_TYPES.values()})
+    return {"requestBody": {"required": True, "content": content}}
+
+
+async def _read_compute_inputs(request: Request, model: type[BaseModel]) -> Tuple[dict, Optional[str]]:
+    """Field -> values from a JSON body or, for binary content types, float64 arrays decoded in
+    one pass. Also returns the binary format name (None for JSON) so the reply can match it."""
+    fmt = array_format(request.headers.get("content-type"))
+    body = await request.body()
+    if fmt is None:
+        try:
+            payload = await run_in_threadpool(model.model_validate_json, body)
+        except ValidationError as exc:
+            raise RequestValidationError(exc.errors(include_url=False))
+        return dict(payload), None
+    try:
+        return await run_in_threadpool(decode_arrays, body, fmt, list(model.model_fields)), fmt
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+async def _run_compute(func, *args):
+    try:
+        return await run_in_threadpool(func, *args)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _array_response(columns: dict, fmt: str) -> Response:
+    return Response(content=encode_arrays(columns, fmt), media_type=ARRAY_MEDIA_TYPES[fmt])
+
+
+@app.post("/compute/pg", response_model=PGResponse, openapi_extra=_compute_openapi(PGRequest))
+async def compute_pg_endpoint(request: Request):
+    inputs, fmt = await _read_compute_inputs(request, PGRequest)
+    pg_high = await _run_compute(compute_pg_grade, inputs["temps"], inputs["gstar_original"], inputs["gstar_rtfo"])
+    if fmt:
+        return _array_response({"pg_high": pg_high}, fmt)
+    return PGResponse(pg_high=pg_high, inputs=PGRequest.model_construct(**inputs))
 
-@app.post("/compute/dsr", response_model=DSRResponse)
-def compute_dsr_endpoint(payload: DSRRequest):
-    curve = compute_dsr_curve(payload.temps, payload.gstar)
+
+@app.post("/compute/dsr", response_model=DSRResponse, openapi_extra=_compute_openapi(DSRRequest))
+async def compute_dsr_endpoint(request: Request):
+    inputs, fmt = await _read_compute_inputs(request, DSRRequest)
+    if fmt:
+        temps, gstar = await _run_compute(smooth_dsr_curve, inputs["temps"], inputs["gstar"])
+        return _array_response({"temps": temps, "gstar": gstar}, fmt)
+    curve = await _run_compute(compute_dsr_curve, inputs["temps"], inputs["gstar"])
     return DSRResponse(curve=curve)
 
 
-@app.post("/compute/trendline", response_model=TrendlineResponse)
-def compute_trendline_endpoint(payload: TrendlineRequest):
-    slope, intercept, r2 = compute_trendline(payload.x, payload.y)
+@app.post("/compute/trendline", response_model=TrendlineResponse, openapi_extra=_compute_openapi(TrendlineRequest))
+async def compute_trendline_endpoint(request: Request):
+    inputs, fmt = await _read_compute_inputs(request, TrendlineRequest)
+    slope, intercept, r2 = await _run_compute(compute_trendline, inputs["x"], inputs["y"])
+    if fmt:
+        return _array_response({"slope": slope, "intercept": intercept, "r_squared": r2}, fmt)
+    return TrendlineResponse(slope=slope, intercept=intercept, r_squared=r2)
+
+
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+UPLOAD_SKIP_ROWS_DESCRIPTION = "Preamble lines before the header row"
+UPLOAD_SHEET_DESCRIPTION = "Worksheet for Excel uploads; defaults to the active sheet"
+
+
+async def _read_upload_columns(
+    request: Request,
+    fields: List[str],
+    mapping: dict,
+    skip_rows: int,
+    sheet: Optional[str],
+) -> dict:
+    """Stream a CSV/XLSX instrument export into float64 columns. Header names in mapping select
+    columns; unmapped fields match by name, then by position."""
+    try:
+        upload = MultipartColumnUpload(request.headers.get("content-type", ""), fields, mapping, skip_rows, sheet)
+        async for chunk in request.stream():
+            await run_in_threadpool(upload.write, chunk)
+        return await run_in_threadpool(upload.finish)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except (ValueError, MultipartParseError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.post("/compute/pg/upload", response_model=PGResponse, openapi_extra=UPLOAD_OPENAPI)
+async def compute_pg_upload(
+    request: Request,
+    temps_column: Optional[str] = Query(None, alias="tempsColumn"),
+    gstar_original_column: Optional[str] = Query(None, alias="gstarOriginalColumn"),
+    gstar_rtfo_column: Optional[str] = Query(None, alias="gstarRtfoColumn"),
+    skip_rows: int = Query(0, alias="skipRows", ge=0, description=UPLOAD_SKIP_ROWS_DESCRIPTION),
+    sheet: Optional[str] = Query(None, description=UPLOAD_SHEET_DESCRIPTION),
+):
+    mapping = {"temps": temps_column, "gstar_original": gstar_original_column, "gstar_rtfo": gstar_rtfo_column}
+    inputs = await _read_upload_columns(request, list(mapping), mapping, skip_rows, sheet)
+    pg_high = await _run_compute(compute_pg_grade, inputs["temps"], inputs["gstar_original"], inputs["gstar_rtfo"])
+    return PGResponse(pg_high=pg_high, inputs=PGRequest.model_construct(**{k: v.tolist() for k, v in inputs.items()}))
+
+
+@app.post("/compute/dsr/upload", response_model=DSRResponse, openapi_extra=UPLOAD_OPENAPI)
+async def compute_dsr_upload(
+    request: Request,
+    temps_column: Optional[str] = Query(None, alias="tempsColumn"),
+    gstar_column: Optional[str] = Query(None, alias="gstarColumn"),
+    skip_rows: int = Query(0, alias="skipRows", ge=0, description=UPLOAD_SKIP_ROWS_DESCRIPTION),
+    sheet: Optional[str] = Query(None, description=UPLOAD_SHEET_DESCRIPTION),
+):
+    mapping = {"temps": temps_column, "gstar": gstar_column}
+    inputs = await _read_upload_columns(request, list(mapping), mapping, skip_rows, sheet)
+    curve = await _run_compute(compute_dsr_curve, inputs["temps"], inputs["gstar"])
+    return DSRResponse(curve=curve)
+
+
+@app.post("/compute/trendline/upload", response_model=TrendlineResponse, openapi_extra=UPLOAD_OPENAPI)
+async def compute_trendline_upload(
+    request: Request,
+    x_column: Optional[str] = Query(None, alias="xColumn"),
+    y_column: Optional[str] = Query(None, alias="yColumn"),
+    skip_rows: int = Query(0, alias="skipRows", ge=0, description=UPLOAD_SKIP_ROWS_DESCRIPTION),
+    sheet: Optional[str] = Query(None, description=UPLOAD_SHEET_DESCRIPTION),
+):
+    mapping = {"x": x_column, "y": y_column}
+    inputs = await _read_upload_columns(request, list(mapping), mapping, skip_rows, sheet)
+    slope, intercept, r2 = await _run_compute(compute_trendline, inputs["x"], inputs["y"])
     return TrendlineResponse(slope=slope, intercept=intercept, r_squared=r2)
 
 
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+def lttb_indices(x: Iterable[float], y: Iterable[float], threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection; returns indices of the points to keep."""
+    x_arr = np.asarray(x, dtype=float)
+    y_arr = np.asarray(y, dtype=float)
+    if x_arr.size != y_arr.size:
+        raise ValueError("x and y arrays must have identical length")
+    n = x_arr.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < edges.size else n
+        avg_x = x_arr[end:next_end].mean()
+        avg_y = y_arr[end:next_end].mean()
+        ax, ay = x_arr[anchor], y_arr[anchor]
+        areas = np.abs((ax - avg_x) * (y_arr[start:end] - ay) - (ax - x_arr[start:end]) * (avg_y - ay))
+        anchor = start + int(np.argmax(areas))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def bin_aggregate(x: Iterable[float], y: Iterable[float], bins: int) -> Dict[str, np.ndarray]:
+    """Equal-width bins along x with mean x/y, min/max y and count; empty bins are dropped."""
+    x_arr = np.asarray(x, dtype=float)
+    y_arr = np.asarray(y, dtype=float)
+    if x_arr.size != y_arr.size:
+        raise ValueError("x and y arrays must have identical length")
+    if bins < 1:
+        raise ValueError("bins must be positive")
+    if x_arr.size == 0:
+        empty = np.empty(0)
+        return {"x": empty, "y": empty, "y_min": empty, "y_max": empty, "count": np.empty(0, dtype=int)}
+
+    lo, hi = x_arr.min(), x_arr.max()
+    if hi > lo:
+        idx = np.minimum(((x_arr - lo) / (hi - lo) * bins).astype(int), bins - 1)
+    else:
+        idx = np.zeros(x_arr.size, dtype=int)
+
+    count = np.bincount(idx, minlength=bins)
+    sum_x = np.bincount(idx, weights=x_arr, minlength=bins)
+    sum_y = np.bincount(idx, weights=y_arr, minlength=bins)
+    y_min = np.full(bins, np.inf)
+    y_max = np.full(bins, -np.inf)
+    np.minimum.at(y_min, idx, y_arr)
+    np.maximum.at(y_max, idx, y_arr)
+
+    keep = count > 0
+    return {
+        "x": sum_x[keep] / count[keep],
+        "y": sum_y[keep] / count[keep],
+        "y_min": y_min[keep],
+        "y_max": y_max[keep],
+        "count": count[keep],
+    }
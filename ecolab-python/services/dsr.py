@@ -4,14 +4,24 @@ from typing import Iterable, List, Tuple
 
 import numpy as np
 
+from .memo import memoize
 
-def compute_dsr_curve(temps: Iterable[float], gstar: Iterable[float]) -> List[Tuple[float, float]]:
-    temps_arr = np.array(list(temps), dtype=float)
-    gstar_arr = np.array(list(gstar), dtype=float)
+
+@memoize("dsr.smooth_dsr_curve", version=1)
+def smooth_dsr_curve(temps: Iterable[float], gstar: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+    temps_arr = np.asarray(temps, dtype=float)
+    gstar_arr = np.asarray(gstar, dtype=float)
     if temps_arr.size != gstar_arr.size:
         raise ValueError("Temperature and G* arrays must align")
     order = np.argsort(temps_arr)
     sorted_temps = temps_arr[order]
     sorted_gstar = gstar_arr[order]
     smoothed = np.convolve(sorted_gstar, np.ones(3) / 3, mode="same")
+    return sorted_temps, smoothed
+
+
+# Not memoized itself: smooth_dsr_curve already is, and its arrays are cheaper to keep than a
+# list of point tuples.
+def compute_dsr_curve(temps: Iterable[float], gstar: Iterable[float]) -> List[Tuple[float, float]]:
+    sorted_temps, smoothed = smooth_dsr_curve(temps, gstar)
     return list(zip(sorted_temps.tolist(), smoothed.tolist()))
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, Mapping
+
+import numpy as np
+
+# Packed layout (little-endian):
+#   header  "<4sBBHI": magic b"ECOA", format version, dtype code, column count, row count
+#   names   per column: u8 length + utf-8 bytes
+#   padding to an 8-byte boundary
+#   data    column-major, rows * itemsize bytes per column
+MAGIC = b"ECOA"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBBHI")
+DTYPE_CODES = {1: np.dtype("<f4"), 2: np.dtype("<f8")}
+_CODE_FOR_DTYPE = {dt: code for code, dt in DTYPE_CODES.items()}
+# Field widths of the header and the per-name length prefix.
+MAX_COLUMNS = 0xFFFF
+MAX_ROWS = 0xFFFFFFFF
+MAX_NAME_BYTES = 0xFF
+
+
+def pack_columns(columns: Mapping[str, Any], dtype: str = "float64") -> bytes:
+    target = np.dtype(dtype).newbyteorder("<")
+    if target not in _CODE_FOR_DTYPE:
+        raise ValueError("dtype must be float32 or float64")
+    arrays = [np.ascontiguousarray(np.asarray(v, dtype=target)) for v in columns.values()]
+    if not arrays:
+        raise ValueError("At least one column is required")
+    rows = arrays[0].size
+    if any(a.ndim != 1 or a.size != rows for a in arrays):
+        raise ValueError("Columns must be one-dimensional and of equal length")
+
+    if len(arrays) > MAX_COLUMNS or rows > MAX_ROWS:
+        raise ValueError(f"At most {MAX_COLUMNS} columns of {MAX_ROWS} rows can be packed")
+    encoded_names = [name.encode() for name in columns]
+    too_long = next((name for name in encoded_names if len(name) > MAX_NAME_BYTES), None)
+    if too_long is not None:
+        raise ValueError(f"Column name {too_long[:32].decode(errors='replace')!r}... exceeds {MAX_NAME_BYTES} bytes")
+
+    names = b"".join(struct.pack("<B", len(encoded)) + encoded for encoded in encoded_names)
+    head = _HEADER.pack(MAGIC, FORMAT_VERSION, _CODE_FOR_DTYPE[target], len(arrays), rows) + names
+    head += b"\0" * (-len(head) % 8)
+    return head + b"".join(a.tobytes() for a in arrays)
+
+
+def unpack_columns(buffer: Any) -> Dict[str, np.ndarray]:
+    """Read-only numpy views over the packed buffer; no values are copied. Malformed or truncated
+    buffers raise ValueError."""
+    view = memoryview(buffer).cast("B")
+    if len(view) < _HEADER.size:
+        raise ValueError("Not a packed DSR array buffer")
+    magic, version, code, ncols, rows = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != FORMAT_VERSION or code not in DTYPE_CODES:
+        raise ValueError("Not a packed DSR array buffer")
+    offset = _HEADER.size
+    names = []
+    for _ in range(ncols):
+        if offset >= len(view) or offset + 1 + view[offset] > len(view):
+            raise ValueError("Packed DSR array buffer is truncated")
+        length = view[offset]
+        try:
+            names.append(bytes(view[offset + 1 : offset + 1 + length]).decode())
+        except UnicodeDecodeError:
+            raise ValueError("Packed DSR array column names must be UTF-8")
+        offset += 1 + length
+    offset += -offset % 8
+
+    dtype = DTYPE_CODES[code]
+    if len(view) < offset + ncols * rows * dtype.itemsize:
+        raise ValueError("Packed DSR array buffer is truncated")
+    columns = {}
+    for name in names:
+        columns[name] = np.frombuffer(view, dtype=dtype, count=rows, offset=offset)
+        offset += rows * dtype.itemsize
+    return columns
+
+
+def dsr_json_to_columns(dsr_data: Any) -> Dict[str, np.ndarray]:
+    """Accept either {temperature: value} maps or {column: [values]} arrays as stored in dsrData."""
+    if not isinstance(dsr_data, Mapping) or not dsr_data:
+        raise ValueError("dsrData is empty or not an object")
+    values = list(dsr_data.values())
+    if all(isinstance(v, (list, tuple)) for v in values):
+        return {str(k): np.asarray(v, dtype=float) for k, v in dsr_data.items()}
+    temps = np.asarray([float(k) for k in dsr_data.keys()], dtype=float)
+    readings = np.asarray(values, dtype=float)
+    order = np.argsort(temps)
+    return {"temperature": temps[order], "value": readings[order]}
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+MEMO_MAX_BYTES = int(os.environ.get("COMPUTE_MEMO_MAX_BYTES", str(64 * 1024 * 1024)))
+MEMO_DIR = os.environ.get("COMPUTE_MEMO_DIR") or None
+MEMO_DISK_MAX_BYTES = int(os.environ.get("COMPUTE_MEMO_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+_DISK_PRUNE_EVERY = 256
+
+
+def _feed(digest: "hashlib._Hash", value: Any) -> None:
+    # Sequences become float64 arrays, exactly as the services coerce them, so a JSON list and
+    # the equivalent ndarray share a key.
+    if isinstance(value, (np.ndarray, list, tuple)):
+        try:
+            arr = np.ascontiguousarray(np.asarray(value, dtype=float))
+        except (TypeError, ValueError):
+            arr = None
+        if arr is not None:
+            digest.update(b"a%d:%s|" % (arr.ndim, repr(arr.shape).encode()))
+            digest.update(memoryview(arr).cast("B"))
+            return
+    digest.update(b"s" + repr(value).encode() + b"|")
+
+
+def input_key(name: str, version: int, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{name}@{version}|".encode())
+    for value in args:
+        _feed(digest, value)
+    for key in sorted(kwargs):
+        digest.update(key.encode() + b"=")
+        _feed(digest, kwargs[key])
+    return digest.hexdigest()
+
+
+def _freeze(value: Any) -> Any:
+    """Cached results are shared between callers, so arrays are handed out read-only."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, tuple):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+def _hand_out(value: Any) -> Any:
+    """Lists and dicts cannot be frozen, so each caller gets its own copy of them."""
+    if isinstance(value, (list, dict)) or (
+        isinstance(value, tuple) and any(isinstance(item, (list, dict)) for item in value)
+    ):
+        return copy.deepcopy(value)
+    return value
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size_of(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoStore:
+    """Byte-bounded LRU of function results with an optional pickle-per-key disk tier.
+
+    The disk directory must be private to the service: entries are unpickled on load.
+    """
+
+    def __init__(self, max_bytes: int = MEMO_MAX_BYTES, directory: Optional[str] = MEMO_DIR):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self._entries: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.evictions = 0
+        self.stats_by_function: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, field: str) -> None:
+        counters = self.stats_by_function.setdefault(name, {"hits": 0, "diskHits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(name, "hits")
+                return True, entry[1]
+        value = self._read_disk(name, key)
+        with self._lock:
+            if value is not None:
+                self._count(name, "diskHits")
+                self._remember(key, value[0])
+                return True, value[0]
+            self._count(name, "misses")
+        return False, None
+
+    def put(self, name: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(name, key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[0]
+        self._entries[key] = (size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self.evictions += 1
+
+    def _path(self, name: str, key: str) -> Optional[Path]:
+        return self.directory / name / f"{key}.pkl" if self.directory else None
+
+    def _read_disk(self, name: str, key: str) -> Optional[Tuple[Any]]:
+        path = self._path(name, key)
+        if path is None:
+            return None
+        try:
+            with path.open("rb") as handle:
+                return (_freeze(pickle.load(handle)),)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, name: str, key: str, value: Any) -> None:
+        path = self._path(name, key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _DISK_PRUNE_EVERY == 0
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self) -> None:
+        """Drop the least recently written files until the tier fits MEMO_DISK_MAX_BYTES."""
+        if self.directory is None or not self.directory.exists():
+            return
+        files = []
+        for path in self.directory.glob("*/*.pkl"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            files.append((info.st_mtime, info.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= MEMO_DISK_MAX_BYTES:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            functions = {}
+            for name, counters in self.stats_by_function.items():
+                lookups = counters["hits"] + counters["diskHits"] + counters["misses"]
+                hits = counters["hits"] + counters["diskHits"]
+                functions[name] = {**counters, "hitRate": hits / lookups if lookups else 0.0}
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "evictions": self.evictions,
+                "diskTier": str(self.directory) if self.directory else None,
+                "functions": functions,
+            }
+
+
+memo_store = MemoStore()
+
+
+def memoize(name: str, version: int) -> Callable:
+    """Cache a pure services/ function on the bytes of its inputs.
+
+    Bump version whenever the function's output for the same inputs changes, so stale disk
+    entries are never served.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if memo_store.max_bytes <= 0:
+                return func(*args, **kwargs)
+            key = input_key(name, version, args, kwargs)
+            found, value = memo_store.get(name, key)
+            if found:
+                return _hand_out(value)
+            value = _freeze(func(*args, **kwargs))
+            memo_store.put(name, key, value)
+            return _hand_out(value)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
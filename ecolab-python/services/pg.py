@@ -4,11 +4,14 @@ from typing import Iterable
 
 import numpy as np
 
+from .memo import memoize
 
+
+@memoize("pg.compute_pg_grade", version=1)
 def compute_pg_grade(temps: Iterable[float], gstar_original: Iterable[float], gstar_rtfo: Iterable[float]) -> float:
-    temps_arr = np.array(list(temps), dtype=float)
-    orig = np.array(list(gstar_original), dtype=float)
-    rtfo = np.array(list(gstar_rtfo), dtype=float)
+    temps_arr = np.asarray(temps, dtype=float)
+    orig = np.asarray(gstar_original, dtype=float)
+    rtfo = np.asarray(gstar_rtfo, dtype=float)
 
     if not (len(temps_arr) and len(orig) and len(rtfo)):
         raise ValueError("Empty arrays provided")
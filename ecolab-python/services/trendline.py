@@ -3,11 +3,15 @@ from __future__ import annotations
 from typing import Iterable, Tuple
 
 import numpy as np
+from scipy import stats
 
+from .memo import memoize
 
+
+@memoize("trendline.compute_trendline", version=1)
 def compute_trendline(x: Iterable[float], y: Iterable[float]) -> Tuple[float, float, float]:
-    x_arr = np.array(list(x), dtype=float)
-    y_arr = np.array(list(y), dtype=float)
+    x_arr = np.asarray(x, dtype=float)
+    y_arr = np.asarray(y, dtype=float)
     if x_arr.size != y_arr.size:
         raise ValueError("x and y arrays must have identical length")
     slope, intercept = np.polyfit(x_arr, y_arr, 1)
@@ -16,3 +20,28 @@ def compute_trendline(x: Iterable[float], y: Iterable[float]) -> Tuple[float, fl
     ss_tot = np.sum((y_arr - np.mean(y_arr)) ** 2)
     r_squared = 1 - ss_res / ss_tot if ss_tot != 0 else 0.0
     return float(slope), float(intercept), float(r_squared)
+
+
+@memoize("trendline.compute_confidence_band", version=1)
+def compute_confidence_band(
+    x: Iterable[float],
+    y: Iterable[float],
+    grid: Iterable[float],
+    level: float = 0.95,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fitted line and confidence band of the mean response evaluated at each grid point."""
+    x_arr = np.asarray(x, dtype=float)
+    y_arr = np.asarray(y, dtype=float)
+    grid_arr = np.asarray(grid, dtype=float)
+    slope, intercept, _ = compute_trendline(x_arr, y_arr)
+    fit = slope * grid_arr + intercept
+
+    n = x_arr.size
+    if n < 3:
+        return fit, fit.copy(), fit.copy()
+    residuals = y_arr - (slope * x_arr + intercept)
+    std_err = np.sqrt(np.sum(residuals ** 2) / (n - 2))
+    sxx = np.sum((x_arr - x_arr.mean()) ** 2)
+    t_crit = stats.t.ppf((1 + level) / 2, n - 2)
+    half_width = t_crit * std_err * np.sqrt(1 / n + (grid_arr - x_arr.mean()) ** 2 / sxx)
+    return fit, fit - half_width, fit + half_width
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from .dsr import smooth_dsr_curve
+from .pg import compute_pg_grade
+from .trendline import compute_trendline
+from .viscosity import estimate_viscosity
+
+WORKUP_VERSION = 2
+
+# Normalised (upper-case, alphanumeric only) metricType / position spellings.
+GSTAR_METRIC_TYPES = {"GSTAR", "G", "GSTARSINDELTA", "GSINDELTA", "DSR", "DSRGSTAR"}
+VISCOSITY_METRIC_TYPES = {"VISCOSITY", "ROTATIONALVISCOSITY", "RV"}
+ORIGINAL_POSITIONS = {"ORIGINAL", "UNAGED", "ORIG"}
+RTFO_POSITIONS = {"RTFO", "RTFOT"}
+
+# Metrics do not record the rotational viscometer's shear rate; the model estimate shown next to
+# each measurement assumes the standard SC4-27 spindle at 20 rpm.
+DEFAULT_SHEAR_RATE = 6.8  # 1/s
+
+
+def _norm(value: Optional[str]) -> str:
+    return re.sub(r"[^A-Z0-9]", "", (value or "").upper().replace("Δ", "DELTA"))
+
+
+def metric_columns(metrics: Iterable[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+    """Metric rows as shared column arrays (NaN for missing numbers, normalised type/position)."""
+    rows = list(metrics)
+
+    def numbers(key: str) -> np.ndarray:
+        return np.array([np.nan if r.get(key) is None else float(r[key]) for r in rows], dtype=float)
+
+    return {
+        "type": np.array([_norm(r.get("metricType")) for r in rows], dtype=object),
+        "position": np.array([_norm(r.get("position")) for r in rows], dtype=object),
+        "value": numbers("value"),
+        "temperature": numbers("temperature"),
+        "frequency": numbers("frequency"),
+    }
+
+
+def _series(columns: Dict[str, np.ndarray], mask: np.ndarray) -> Dict[float, float]:
+    """Temperature -> value for the masked rows; repeated temperatures are averaged."""
+    mask = mask & ~np.isnan(columns["value"]) & ~np.isnan(columns["temperature"])
+    temps, inverse = np.unique(columns["temperature"][mask], return_inverse=True)
+    means = np.bincount(inverse, weights=columns["value"][mask]) / np.bincount(inverse)
+    return dict(zip(temps.tolist(), means.tolist()))
+
+
+def _pg_grade(columns: Dict[str, np.ndarray]) -> Optional[dict]:
+    gstar = np.isin(columns["type"], list(GSTAR_METRIC_TYPES))
+    original = _series(columns, gstar & np.isin(columns["position"], list(ORIGINAL_POSITIONS)))
+    rtfo = _series(columns, gstar & np.isin(columns["position"], list(RTFO_POSITIONS)))
+    temps = sorted(set(original) & set(rtfo))
+    if not temps:
+        return None
+    pg_high = compute_pg_grade(temps, [original[t] for t in temps], [rtfo[t] for t in temps])
+    return {"pgHigh": pg_high, "temperatures": temps}
+
+
+def _trendlines(columns: Dict[str, np.ndarray]) -> List[dict]:
+    """One fit of value against temperature per (metricType, position) series; G* is fitted on
+    log10 since it decays exponentially with temperature."""
+    fits = []
+    has_point = ~np.isnan(columns["value"]) & ~np.isnan(columns["temperature"])
+    keys = sorted({(t, p) for t, p, ok in zip(columns["type"], columns["position"], has_point) if ok})
+    for metric_type, position in keys:
+        mask = has_point & (columns["type"] == metric_type) & (columns["position"] == position)
+        x, y = columns["temperature"][mask], columns["value"][mask]
+        if x.size < 2 or np.ptp(x) == 0:
+            continue
+        transform = "log10" if metric_type in GSTAR_METRIC_TYPES and np.all(y > 0) else None
+        slope, intercept, r2 = compute_trendline(x, np.log10(y) if transform else y)
+        fits.append(
+            {
+                "metricType": metric_type,
+                "position": position or None,
+                "transform": transform,
+                "points": int(x.size),
+                "slope": slope,
+                "intercept": intercept,
+                "r_squared": r2,
+            }
+        )
+    return fits
+
+
+def _viscosity(columns: Dict[str, np.ndarray]) -> List[dict]:
+    """Measured viscosity per temperature (repeats averaged); empty when nothing was measured."""
+    measured = _series(columns, np.isin(columns["type"], list(VISCOSITY_METRIC_TYPES)))
+    return [
+        {
+            "temperature": t,
+            "measured": value,
+            "shearRate": DEFAULT_SHEAR_RATE,
+            "estimated": estimate_viscosity(t, DEFAULT_SHEAR_RATE),
+        }
+        for t, value in measured.items()
+    ]
+
+
+def run_workup(metrics: Iterable[Mapping[str, Any]], dsr_columns: Optional[Mapping[str, np.ndarray]]) -> dict:
+    """Derived results for one binder test from its confirmed metrics and raw DSR arrays."""
+    columns = metric_columns(metrics)
+    dsr = None
+    if dsr_columns:
+        names = list(dsr_columns)
+        if len(names) >= 2:
+            temps, smoothed = smooth_dsr_curve(dsr_columns[names[0]], dsr_columns[names[1]])
+            dsr = {"x": names[0], "y": names[1], "temps": temps.tolist(), "smoothed": smoothed.tolist()}
+    return {
+        "workupVersion": WORKUP_VERSION,
+        "metricCount": int(columns["value"].size),
+        "dsr": dsr,
+        "pg": _pg_grade(columns),
+        "trendlines": _trendlines(columns),
+        "viscosity": _viscosity(columns),
+    }
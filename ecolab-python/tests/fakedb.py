@@ -0,0 +1,94 @@
+"""In-memory stand-ins for psycopg connections, so endpoints can run without Postgres.
+
+install(responder) routes every connection opened through db._connect to a FakeConn whose
+cursors answer execute() with responder(query, params) -> list of row dicts.
+"""
+from contextlib import contextmanager
+
+import db
+
+
+class FakeCursor:
+  def __init__(self, conn, name=None):
+    self.conn = conn
+    self.name = name
+    self.rowcount = 1
+    self.description = None
+    self._rows = []
+    self.copied = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    return False
+
+  def execute(self, query, params=()):
+    self.conn.executed.append((query, params, self.name))
+    self._rows = list(self.conn.responder(query, params) or [])
+    self.description = [("column",)] if self._rows or query.lstrip().upper().startswith("SELECT") else None
+
+  def executemany(self, query, params_seq):
+    for params in params_seq:
+      self.execute(query, params)
+
+  def fetchall(self):
+    rows, self._rows = self._rows, []
+    return rows
+
+  def fetchone(self):
+    return self._rows.pop(0) if self._rows else None
+
+  def fetchmany(self, size):
+    rows, self._rows = self._rows[:size], self._rows[size:]
+    return rows
+
+  @contextmanager
+  def copy(self, statement):
+    rows = []
+    self.conn.copies.append((statement, rows))
+    yield _FakeCopy(rows)
+
+
+class _FakeCopy:
+  def __init__(self, rows):
+    self.rows = rows
+
+  def write_row(self, row):
+    self.rows.append(row)
+
+
+class FakeConn:
+  def __init__(self, responder, readonly):
+    self.responder = responder
+    self.readonly = readonly
+    self.on_replica = db.routes_to_replica(readonly)
+    self.executed = []
+    self.copies = []
+    self.commits = 0
+    self.rollbacks = 0
+    self.isolation_level = None
+
+  def cursor(self, name=None, **kwargs):
+    return FakeCursor(self, name)
+
+  def commit(self):
+    self.commits += 1
+
+  def rollback(self):
+    self.rollbacks += 1
+
+  def close(self):
+    pass
+
+
+def install(monkeypatch, responder):
+  conns = []
+
+  def connect(readonly=False):
+    conn = FakeConn(responder, readonly)
+    conns.append(conn)
+    return conn
+
+  monkeypatch.setattr(db, "_connect", connect)
+  return conns
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from array_codec import ARRAY_MEDIA_TYPES, array_format, decode_arrays, encode_arrays
+
+
+@pytest.mark.parametrize("fmt", ["packed", "npy"])
+def test_encode_decode_round_trip(fmt):
+  body = encode_arrays({"x": [1, 2, 3], "y": [2.0, 4.0, 6.5]}, fmt)
+  decoded = decode_arrays(body, fmt, ["x", "y"])
+  np.testing.assert_array_equal(decoded["x"], [1.0, 2.0, 3.0])
+  np.testing.assert_array_equal(decoded["y"], [2.0, 4.0, 6.5])
+
+
+def test_array_format_ignores_parameters_and_json():
+  assert array_format("application/x-npy; charset=binary") == "npy"
+  assert array_format("application/json") is None
+  assert array_format(None) is None
+
+
+def test_decode_reports_missing_fields():
+  with pytest.raises(ValueError, match="y"):
+    decode_arrays(encode_arrays({"x": [1.0]}, "packed"), "packed", ["x", "y"])
+
+
+@pytest.mark.parametrize("fmt,body", [("packed", b"ECOA"), ("packed", b""), ("npy", b"\x93NUMPY")])
+def test_truncated_binary_body_is_a_bad_request(fmt, body):
+  response = TestClient(main.app).post(
+    "/compute/trendline", content=body, headers={"content-type": ARRAY_MEDIA_TYPES[fmt]}
+  )
+  assert response.status_code == 400
+
+
+def test_packed_trendline_reply_matches_request_format():
+  body = encode_arrays({"x": [0.0, 1.0, 2.0], "y": [1.0, 3.0, 5.0]}, "packed")
+  response = TestClient(main.app).post(
+    "/compute/trendline", content=body, headers={"content-type": ARRAY_MEDIA_TYPES["packed"]}
+  )
+  assert response.status_code == 200
+  reply = decode_arrays(response.content, "packed", ["slope", "intercept", "r_squared"])
+  assert reply["slope"][0] == pytest.approx(2.0)
+  assert reply["intercept"][0] == pytest.approx(1.0)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from tests import fakedb
+
+EVENT_ID = "3f2b8a4e-5c1d-4e6f-9a7b-0c1d2e3f4a5b"
+PERFORMED_AT = datetime(2025, 3, 18, 9, 15, 30, 123456, tzinfo=timezone.utc)
+
+
+def _event(index):
+  return {
+    "id": f"3f2b8a4e-5c1d-4e6f-9a7b-0c1d2e3f4a{index:02d}",
+    "binderTestId": "bt-1",
+    "eventType": "METRIC_CONFIRMED",
+    "entityType": None,
+    "entityId": None,
+    "performedByUserId": None,
+    "performedByRole": None,
+    "performedAt": PERFORMED_AT - timedelta(minutes=index),
+    "beforeJson": None,
+    "afterJson": None,
+    "notes": None,
+  }
+
+
+def test_cursor_round_trip():
+  cursor = main._encode_audit_cursor({"performedAt": PERFORMED_AT, "id": EVENT_ID})
+  assert "=" not in cursor
+  assert main._decode_audit_cursor(cursor) == (PERFORMED_AT, EVENT_ID)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "bm8tc2VwYXJhdG9y", "MjAyNS0wMy0xOHxub3QtYS11dWlk", "//8"])
+def test_invalid_cursor_is_rejected(cursor):
+  with pytest.raises(HTTPException) as exc:
+    main._decode_audit_cursor(cursor)
+  assert exc.value.status_code == 400
+
+
+def _responder(query, params):
+  if '"BinderTest" WHERE' in query:
+    return [{"id": "bt-1", "status": "READY", "lifecycleStatus": "READY", "testName": None, "name": None}]
+  if '"BinderTestAuditEvent"' in query:
+    return [_event(i) for i in range(params[-1])]
+  return []
+
+
+def test_next_cursor_points_at_the_last_event(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  client = TestClient(main.app)
+  response = client.get("/binder-tests/bt-1/audit", params={"limit": 2})
+  assert response.status_code == 200
+  assert len(response.json()) == 2
+  assert main._decode_audit_cursor(response.headers["x-next-cursor"]) == (
+    _event(1)["performedAt"],
+    _event(1)["id"],
+  )
+  next_page = client.get("/binder-tests/bt-1/audit", params={"cursor": response.headers["x-next-cursor"]})
+  assert next_page.status_code == 200
+  query, params, _ = conns[-1].executed[-1]
+  assert params[-3:-1] == (_event(1)["performedAt"], _event(1)["id"])
+
+
+def test_garbage_cursor_is_a_bad_request(monkeypatch):
+  fakedb.install(monkeypatch, _responder)
+  assert TestClient(main.app).get("/binder-tests/bt-1/audit", params={"cursor": "%%%"}).status_code == 400
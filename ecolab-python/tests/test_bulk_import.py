@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+import main
+from tests import fakedb
+
+DB_NOW = datetime(2025, 3, 18, 8, 0, tzinfo=timezone.utc)
+
+
+def _responder(query, params):
+  if '"User"' in query:
+    return [{"now": DB_NOW, "users": [u for u in params[0] if u == "user-1"]}]
+  if '"CapsuleFormula" WHERE "id" = ANY' in query:
+    return [{"now": DB_NOW, "capsules": ["cf-1"], "origins": ["bo-1"], "tests": []}]
+  return []
+
+
+def _copied(conn, table):
+  return next(rows for statement, rows in conn.copies if f'COPY "{table}"' in statement)
+
+
+def test_csv_lines_group_into_capsules():
+  rows = [
+    (2, {"name": "A", "description": None, "createdById": None, "materialName": "x", "percentage": "60"}),
+    (3, {"name": "A", "description": None, "createdById": None, "materialName": "y", "percentage": "40"}),
+    (4, {"name": "B", "description": None, "createdById": None, "materialName": "z", "percentage": "100"}),
+    (5, {"name": "A", "description": None, "createdById": None, "materialName": "w", "percentage": "100"}),
+  ]
+  items = main._capsule_bulk_items(rows, from_csv=True)
+  assert [(line, item["name"], len(item["materials"])) for line, item in items] == [
+    (2, "A", 2),
+    (4, "B", 1),
+    (5, "A", 1),
+  ]
+  assert main._capsule_bulk_items(rows, from_csv=False) is rows
+
+
+def test_capsule_rows_report_errors_and_copy_the_rest(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  body = (
+    "name,description,createdById,materialName,percentage\n"
+    "Good,,user-1,x,60\n"
+    "Good,,user-1,y,40\n"
+    "Short,,,x,90\n"
+    "Ghost,,user-404,x,100\n"
+  )
+  response = TestClient(main.app).post("/db/capsules/bulk", content=body, headers={"content-type": "text/csv"})
+  assert response.status_code == 201
+  result = response.json()
+  assert result["inserted"] == 1
+  assert [c["row"] for c in result["created"]] == [2]
+  assert [(e["row"], e["error"]) for e in result["errors"]] == [
+    (4, "Material percentages must total 100%. Currently 90.0%"),
+    (5, "Creator user not found"),
+  ]
+  (conn,) = conns
+  (capsule,) = _copied(conn, "CapsuleFormula")
+  assert capsule[1:] == ("Good", None, "user-1", DB_NOW, DB_NOW)
+  materials = _copied(conn, "CapsuleFormulaMaterial")
+  assert [m[2] for m in materials] == ["x", "y"]
+  assert materials[0][4] == DB_NOW and materials[1][4] > DB_NOW
+  assert conn.commits == 1
+
+
+def test_all_or_nothing_writes_nothing(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  items = [
+    {"name": "Ok", "materials": [{"materialName": "x", "percentage": 100}]},
+    {"name": "Ghost", "createdById": "user-404", "materials": [{"materialName": "x", "percentage": 100}]},
+    {"materials": []},
+  ]
+  response = TestClient(main.app).post("/db/capsules/bulk", params={"allOrNothing": "true"}, json=items)
+  assert response.status_code == 422
+  assert [e["row"] for e in response.json()["detail"]["errors"]] == [1, 2]
+  assert conns[0].copies == [] and conns[0].commits == 0
+
+
+def test_pma_rows_with_unknown_references_are_reported(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  base = {"name": "F", "bitumenOriginId": "bo-1", "ecoCapPercentage": 5, "reagentPercentage": 1}
+  items = [
+    {**base, "capsuleFormulaId": "cf-1"},
+    {**base, "capsuleFormulaId": "cf-404"},
+    {**base, "capsuleFormulaId": "cf-1", "bitumenTestId": "bt-404"},
+  ]
+  response = TestClient(main.app).post("/db/pma-formulas/bulk", json=items)
+  assert response.status_code == 201
+  assert [(e["row"], e["error"]) for e in response.json()["errors"]] == [
+    (1, "Capsule formula not found"),
+    (2, "Bitumen base test not found"),
+  ]
+  (formula,) = _copied(conns[0], "PmaFormula")
+  assert formula[-2:] == (DB_NOW, DB_NOW)
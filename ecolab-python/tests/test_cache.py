@@ -0,0 +1,74 @@
+from cache import ResponseCache
+
+
+def test_hit_after_load():
+  cache = ResponseCache(ttl_seconds=60)
+  calls = []
+  load = lambda: calls.append(1) or len(calls)
+  assert cache.get_or_load("capsules", "k", load) == 1
+  assert cache.get_or_load("capsules", "k", load) == 1
+  assert cache.stats()["hits"] == 1
+
+
+def test_load_racing_invalidate_is_not_stored():
+  cache = ResponseCache(ttl_seconds=60)
+
+  def stale_load():
+    cache.invalidate("pma-formulas")
+    return "stale"
+
+  assert cache.get_or_load("pma-formulas", "k", stale_load) == "stale"
+  assert cache.get_or_load("pma-formulas", "k", lambda: "fresh") == "fresh"
+  assert cache.get_or_load("pma-formulas", "k", lambda: "other") == "fresh"
+
+
+def test_invalidate_other_namespace_keeps_load():
+  cache = ResponseCache(ttl_seconds=60)
+
+  def load():
+    cache.invalidate("users")
+    return "value"
+
+  cache.get_or_load("capsules", "k", load)
+  assert cache.get_or_load("capsules", "k", lambda: "reloaded") == "value"
+
+
+def test_clear_during_load_is_not_stored():
+  cache = ResponseCache(ttl_seconds=60)
+
+  def load():
+    cache.clear()
+    return "stale"
+
+  cache.get_or_load("capsules", "k", load)
+  assert cache.get_or_load("capsules", "k", lambda: "fresh") == "fresh"
+
+
+def test_cached_reads_load_from_the_primary(monkeypatch):
+  import db
+  from cache import cached_fetch_all, response_cache
+  from tests import fakedb
+
+  monkeypatch.setattr(db, "replica_router", lambda: db.ReplicaRouter(["postgresql://replica"]))
+  conns = fakedb.install(monkeypatch, lambda query, params: [{"id": "cf-1"}])
+  response_cache.clear()
+  uow = db.UnitOfWork(readonly=True)
+  uow.fetch_one("SELECT 1")
+  assert cached_fetch_all(uow, "capsules", 'SELECT "id" FROM "CapsuleFormula"') == [{"id": "cf-1"}]
+  assert [conn.on_replica for conn in conns] == [True, False]
+  response_cache.clear()
+
+
+def test_origin_and_base_test_writes_invalidate_pma_listings():
+  from cache import response_cache
+  from changefeed import ChangeFeed
+
+  feed = ChangeFeed()
+  for table in ("BitumenOrigin", "BitumenBaseTest"):
+    response_cache.clear()
+    response_cache.get_or_load("pma-formulas", "list", lambda: ["stale"])
+    response_cache.get_or_load("capsules", "list", lambda: ["kept"])
+    feed.dispatch({"table": table, "op": "UPDATE", "id": "x"})
+    assert response_cache.get_or_load("pma-formulas", "list", lambda: ["fresh"]) == ["fresh"]
+    assert response_cache.get_or_load("capsules", "list", lambda: ["reloaded"]) == ["kept"]
+  response_cache.clear()
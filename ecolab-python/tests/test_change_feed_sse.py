@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_subscribes_before_snapshot_and_unsubscribes_on_error(monkeypatch):
+  order = []
+  subscribers = []
+
+  def subscribe():
+    order.append("subscribe")
+    queue = object()
+    subscribers.append(queue)
+    return queue
+
+  def load(_uow, test_id):
+    order.append("snapshot")
+    raise main.HTTPException(status_code=404, detail="Binder test not found")
+
+  monkeypatch.setattr(main, "change_feed_enabled", lambda: True)
+  monkeypatch.setattr(main.change_feed, "subscribe", subscribe)
+  monkeypatch.setattr(main.change_feed, "unsubscribe", lambda queue: subscribers.remove(queue))
+  monkeypatch.setattr(main, "_load_binder_test_basic", load)
+
+  response = TestClient(main.app).get("/db/binder-tests/missing/events")
+  assert response.status_code == 404
+  assert order == ["subscribe", "snapshot"]
+  assert subscribers == []
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import psycopg
+from psycopg.adapt import PyFormat
+
+import db
+
+SUMMARY = {
+  "summaryId": UUID("6f1c1c1e-8d1f-4a55-9a38-6d3c2f0b9a11"),
+  "createdAt": datetime(2025, 3, 18, 12, 30, tzinfo=timezone.utc),
+  "metrics": [{"value": Decimal("1.25"), "sourceFileId": UUID("00000000-0000-0000-0000-000000000001")}],
+}
+
+
+def test_json_dumps_handles_uuid_datetime_and_decimal():
+  decoded = json.loads(db.json_dumps(SUMMARY))
+  assert decoded["summaryId"] == "6f1c1c1e-8d1f-4a55-9a38-6d3c2f0b9a11"
+  assert decoded["createdAt"] == "2025-03-18T12:30:00+00:00"
+  assert decoded["metrics"][0] == {"value": 1.25, "sourceFileId": "00000000-0000-0000-0000-000000000001"}
+
+
+def test_dict_parameters_are_dumped_as_jsonb():
+  dumper = psycopg.adapters.get_dumper(dict, PyFormat.TEXT)(dict)
+  assert json.loads(bytes(dumper.dump(SUMMARY))) == json.loads(db.json_dumps(SUMMARY))
+
+
+def test_audit_and_export_encoding_match_jsonb():
+  import numpy as np
+
+  from audit import encode_json
+  from exporters import ndjson_stream
+
+  row = {**SUMMARY, "slope": np.float64(0.5), "count": np.int64(3)}
+  assert encode_json(row) == db.json_dumps(row)
+  assert json.loads(db.json_dumps(row))["count"] == 3
+  assert b"".join(ndjson_stream([[row]])) == (db.json_dumps(row) + "\n").encode()
+  assert encode_json(None) is None
@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from tests import fakedb
+
+
+def _responder(query, params):
+  if "set_config" in query:
+    return [{"set_config": "1000"}]
+  if query.lstrip().upper().startswith("SELECT"):
+    return [{"n": i} for i in range(5)]
+  return []
+
+
+def test_select_is_capped_on_a_server_side_cursor(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  response = TestClient(main.app).post("/db/query", json={"query": "SELECT n FROM t WHERE n > $1", "params": [0], "maxRows": 2})
+  assert response.status_code == 200
+  body = response.json()
+  assert body["rows"] == [{"n": 0}, {"n": 1}]
+  assert body["truncated"] is True
+  (conn,) = conns
+  query, params, cursor_name = conn.executed[-1]
+  assert query == "SELECT n FROM t WHERE n > %s" and params == [0]
+  assert cursor_name is not None
+  assert conn.readonly and conn.commits == 0
+
+
+def test_writes_are_committed(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  response = TestClient(main.app).post("/db/query", json={"query": 'UPDATE "t" SET n = $1', "params": [1]})
+  assert response.status_code == 200
+  assert response.json() == {"ok": True, "rowcount": 1}
+  (conn,) = conns
+  assert not conn.readonly and conn.commits == 1
+
+
+@pytest.mark.parametrize(
+  "query",
+  [
+    "SELECT 1",
+    "  -- report\n/* totals */ select 1",
+    'WITH recent AS (SELECT * FROM "BinderTest") SELECT count(*) FROM recent',
+    "VALUES (1), (2)",
+    'TABLE "User"',
+  ],
+)
+def test_read_statements_are_plain_selects(query):
+  assert main._prepare_gateway_sql(query)[2] is True
+
+
+@pytest.mark.parametrize(
+  "query",
+  [
+    'SELECT * FROM "BinderTest" FOR UPDATE',
+    "SELECT nextval('seq')",
+    'WITH gone AS (DELETE FROM "PmaBatch" RETURNING "id") SELECT count(*) FROM gone',
+    'WITH moved AS (UPDATE "User" SET "name" = $1 RETURNING *) SELECT * FROM moved',
+    'with added as (insert into "User" ("id") values ($1) returning "id") select * from added',
+    'UPDATE "User" SET "name" = $1',
+    "TABLESPACE",
+  ],
+)
+def test_writes_and_locking_reads_are_not_plain_selects(query):
+  assert main._prepare_gateway_sql(query)[2] is False
+
+
+def test_cte_select_can_stream(monkeypatch):
+  conns = fakedb.install(monkeypatch, _responder)
+  response = TestClient(main.app).post(
+    "/db/query", json={"query": "WITH t AS (SELECT 1) SELECT * FROM t", "stream": True}
+  )
+  assert response.status_code == 200
+  assert conns and all(conn.readonly for conn in conns)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from services.downsample import bin_aggregate, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+  x = np.arange(1000, dtype=float)
+  y = np.zeros(1000)
+  y[437] = 50.0
+  keep = lttb_indices(x, y, 20)
+  assert keep.size == 20
+  assert keep[0] == 0 and keep[-1] == 999
+  assert np.all(np.diff(keep) > 0)
+  assert 437 in keep
+
+
+def test_lttb_returns_everything_below_threshold():
+  assert lttb_indices([0, 1, 2], [1, 2, 3], 10).tolist() == [0, 1, 2]
+  assert lttb_indices(range(10), range(10), 2).tolist() == list(range(10))
+
+
+def test_lttb_rejects_mismatched_lengths():
+  with pytest.raises(ValueError):
+    lttb_indices([0, 1], [0], 3)
+
+
+def test_bin_aggregate_drops_empty_bins():
+  result = bin_aggregate([0, 1, 9, 10], [1, 3, 5, 7], 5)
+  assert result["count"].tolist() == [2, 2]
+  assert result["y"].tolist() == [2.0, 6.0]
+  assert result["y_min"].tolist() == [1.0, 5.0]
+  assert result["y_max"].tolist() == [3.0, 7.0]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.dsr_arrays import pack_columns, unpack_columns
+from tests import fakedb
+
+
+def test_pack_round_trip():
+  columns = {"temperature": [52.0, 58.0, 64.0], "gStar": [1.5, 2.25, 3.0]}
+  packed = pack_columns(columns, "float32")
+  assert len(packed) % 4 == 0
+  unpacked = unpack_columns(packed)
+  assert list(unpacked) == ["temperature", "gStar"]
+  assert unpacked["gStar"].dtype == np.dtype("<f4")
+  np.testing.assert_array_equal(unpacked["temperature"], columns["temperature"])
+  assert not unpacked["gStar"].flags.writeable
+
+
+def test_pack_rejects_ragged_and_long_names():
+  with pytest.raises(ValueError):
+    pack_columns({"a": [1.0, 2.0], "b": [1.0]})
+  with pytest.raises(ValueError):
+    pack_columns({"x" * 256: [1.0]})
+
+
+def test_put_rejects_long_column_name(monkeypatch):
+  conns = fakedb.install(monkeypatch, lambda query, params: [])
+  response = TestClient(main.app).put(
+    "/db/binder-tests/bt-1/dsr-arrays", json={"columns": {"x" * 300: [1.0, 2.0]}}
+  )
+  assert response.status_code == 400
+  assert conns == []
+
+
+def test_put_stores_packed_body(monkeypatch):
+  conns = fakedb.install(monkeypatch, lambda query, params: [])
+  packed = pack_columns({"temperature": [52.0, 58.0]})
+  response = TestClient(main.app).put(
+    "/db/binder-tests/bt-1/dsr-arrays",
+    content=packed,
+    headers={"content-type": main.PACKED_ARRAYS_MEDIA_TYPE},
+  )
+  assert response.status_code == 200
+  assert response.json() == {"binderTestId": "bt-1", "columns": ["temperature"], "rows": 2, "bytes": len(packed)}
+  (conn,) = conns
+  assert conn.commits == 1
+
+
+@pytest.mark.parametrize("body", [b"", b"ECOA", b"ECOA\x01\x02\x02\x00\x03\x00\x00\x00\x05ab", b"JUNKJUNKJUNKJUNK"])
+def test_unpack_rejects_malformed_buffers(body):
+  with pytest.raises(ValueError):
+    unpack_columns(body)
+
+
+def test_unpack_rejects_truncated_data():
+  packed = pack_columns({"x": [1.0, 2.0, 3.0]})
+  with pytest.raises(ValueError):
+    unpack_columns(packed[:-1])
+
+
+def test_dsr_curve_sorts_x_before_decimating(monkeypatch):
+  temps = [70.0, 52.0, 64.0, 58.0, 76.0, 46.0]
+  gstar = [0.5, 8.0, 1.2, 3.0, 0.2, 20.0]
+  packed = pack_columns({"temperature": temps, "gStar": gstar})
+  fakedb.install(monkeypatch, lambda query, params: [{"dsrArrays": packed, "dsrData": None}])
+  response = TestClient(main.app).get("/db/binder-tests/bt-1/dsr-curve", params={"points": 4})
+  assert response.status_code == 200
+  body = response.json()
+  assert body["xValues"] == sorted(body["xValues"])
+  assert body["xValues"][0] == 46.0 and body["xValues"][-1] == 76.0
+  pairs = dict(zip(temps, gstar))
+  assert all(pairs[x] == y for x, y in zip(body["xValues"], body["yValues"]))
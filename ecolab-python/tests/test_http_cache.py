@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_not_modified_keeps_cors_headers():
+  client = TestClient(main.app)
+  headers = {"Origin": "http://localhost:3000"}
+  first = client.get("/health", headers=headers)
+  assert first.status_code == 200
+  etag = first.headers["etag"]
+  revalidated = client.get("/health", headers={**headers, "If-None-Match": etag})
+  assert revalidated.status_code == 304
+  assert revalidated.headers["etag"] == etag
+  assert revalidated.headers.get("access-control-allow-origin") == first.headers.get("access-control-allow-origin")
+  assert revalidated.headers.get("access-control-allow-origin") is not None
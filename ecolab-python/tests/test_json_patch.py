@@ -0,0 +1,43 @@
+import copy
+
+import pytest
+
+from json_patch import apply_patch, invert_patch, make_patch
+
+OLD = {
+  "pg": {"pgHigh": 64.0, "temperatures": [58.0, 64.0]},
+  "metrics": [{"name": "a/b", "value": 1}, {"name": "c~d", "value": 2}, {"name": "e", "value": 3}],
+  "notes": "draft",
+}
+NEW = {
+  "pg": {"pgHigh": 70.0, "temperatures": [58.0, 64.0, 70.0]},
+  "metrics": [{"name": "a/b", "value": 5}],
+  "status": "final",
+}
+
+
+def test_patch_round_trip():
+  patch = make_patch(OLD, NEW)
+  assert apply_patch(copy.deepcopy(OLD), patch) == NEW
+  assert apply_patch(copy.deepcopy(NEW), invert_patch(patch)) == OLD
+
+
+def test_identical_documents_give_an_empty_patch():
+  assert make_patch(OLD, copy.deepcopy(OLD)) == []
+
+
+def test_keys_are_escaped():
+  patch = make_patch({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}})
+  assert [op["path"] for op in patch] == ["/a~1b/c~0d"]
+  assert apply_patch({"a/b": {"c~d": 1}}, patch) == {"a/b": {"c~d": 2}}
+
+
+def test_type_change_replaces_the_value():
+  patch = make_patch({"x": [1, 2]}, {"x": {"y": 1}})
+  assert patch == [{"op": "replace", "path": "/x", "value": {"y": 1}, "old": [1, 2]}]
+  assert apply_patch({"x": [1, 2]}, invert_patch(invert_patch(patch))) == {"x": {"y": 1}}
+
+
+def test_root_cannot_be_removed():
+  with pytest.raises(ValueError):
+    apply_patch({}, [{"op": "remove", "path": ""}])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from services import memo
+from services.dsr import compute_dsr_curve, smooth_dsr_curve
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+  monkeypatch.setattr(memo, "memo_store", memo.MemoStore(max_bytes=1024 * 1024, directory=None))
+  return memo.memo_store
+
+
+def test_cached_arrays_are_read_only():
+  temps, smoothed = smooth_dsr_curve([64, 52, 58], [1.0, 3.0, 2.0])
+  again = smooth_dsr_curve(np.array([64.0, 52.0, 58.0]), np.array([1.0, 3.0, 2.0]))
+  assert again[1] is smoothed
+  with pytest.raises(ValueError):
+    smoothed[0] = 0.0
+  assert memo.memo_store.stats()["functions"]["dsr.smooth_dsr_curve"]["hits"] == 1
+
+
+def test_dsr_curve_is_stored_once():
+  first = compute_dsr_curve([52, 58, 64], [3.0, 2.0, 1.0])
+  first.append((0.0, 0.0))
+  assert compute_dsr_curve([52, 58, 64], [3.0, 2.0, 1.0]) == first[:-1]
+  assert list(memo.memo_store.stats()["functions"]) == ["dsr.smooth_dsr_curve"]
+  assert memo.memo_store.stats()["entries"] == 1
+
+
+def test_memoized_lists_are_copied_per_caller():
+  @memo.memoize("test.rows", version=1)
+  def rows(values):
+    return [{"value": v} for v in values]
+
+  first = rows([1.0, 2.0])
+  first[0]["value"] = 99
+  assert rows([1.0, 2.0]) == [{"value": 1.0}, {"value": 2.0}]
+
+
+def test_input_key_ignores_container_type():
+  assert memo.input_key("f", 1, ([1, 2, 3],), {}) == memo.input_key("f", 1, (np.array([1.0, 2.0, 3.0]),), {})
+  assert memo.input_key("f", 1, ([1, 2, 3],), {}) != memo.input_key("f", 2, ([1, 2, 3],), {})
+
+
+def test_disk_write_count_is_exact_under_threads(tmp_path, monkeypatch):
+  from concurrent.futures import ThreadPoolExecutor
+
+  store = memo.MemoStore(max_bytes=1024 * 1024, directory=str(tmp_path))
+  monkeypatch.setattr(memo, "_DISK_PRUNE_EVERY", 10_000)
+  with ThreadPoolExecutor(max_workers=8) as pool:
+    list(pool.map(lambda i: store.put("test.f", f"k{i}", i), range(400)))
+  assert store._disk_writes == 400
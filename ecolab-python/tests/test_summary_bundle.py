@@ -0,0 +1,53 @@
+import hashlib
+import io
+import json
+import zipfile
+from datetime import datetime
+
+import main
+from exporters import zip_stream
+from json_patch import make_patch
+
+
+def _row(version, summary_json=None, patch=None, final=False, doi="ECO-1"):
+  return {
+    "id": f"s-{version}",
+    "binderTestId": "bt-1",
+    "version": version,
+    "doiLikeId": f"{doi}.v{version}",
+    "status": "FINAL" if final else "DRAFT",
+    "createdAt": datetime(2025, 3, version),
+    "derivedFromMetricsHash": f"h{version}",
+    "summaryJson": summary_json,
+    "summaryPatch": patch,
+    "isFinal": final,
+  }
+
+
+def test_bundle_rebuilds_finals_and_streams_the_manifest():
+  v1 = {"pg": 64}
+  v2 = {"pg": 70, "notes": "rerun"}
+  chunks = [[_row(1, summary_json=v1)], [_row(2, patch=make_patch(v1, v2), final=True)]]
+  body = b"".join(zip_stream(main._summary_bundle_files(iter(chunks), {"from": None, "to": None})))
+  archive = zipfile.ZipFile(io.BytesIO(body))
+  assert archive.namelist() == ["summaries/ECO-1.v2.json", "manifest.json"]
+  summary = archive.read("summaries/ECO-1.v2.json")
+  assert json.loads(summary)["summaryJson"] == v2
+  manifest = json.loads(archive.read("manifest.json"))
+  assert manifest["count"] == 1 and manifest["from"] is None
+  (entry,) = manifest["summaries"]
+  assert entry["file"] == "summaries/ECO-1.v2.json"
+  assert entry["sha256"] == hashlib.sha256(summary).hexdigest()
+
+
+def test_empty_bundle_has_an_empty_manifest():
+  body = b"".join(zip_stream(main._summary_bundle_files(iter([]), {"from": None, "to": None})))
+  manifest = json.loads(zipfile.ZipFile(io.BytesIO(body)).read("manifest.json"))
+  assert manifest["count"] == 0 and manifest["summaries"] == []
+
+
+def test_zip_stream_accepts_chunked_entries():
+  body = b"".join(zip_stream([("a.txt", b"abc"), ("b.txt", iter([b"de", b"f"]))]))
+  archive = zipfile.ZipFile(io.BytesIO(body))
+  assert archive.read("a.txt") == b"abc"
+  assert archive.read("b.txt") == b"def"
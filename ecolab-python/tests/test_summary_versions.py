@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from tests import fakedb
+
+METRIC = {
+  "id": "m-1",
+  "metricType": "G*/sin δ",
+  "position": "Original",
+  "value": 1.25,
+  "units": "kPa",
+  "temperature": 64.0,
+  "sourceFileId": None,
+  "sourcePage": None,
+}
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+  """BinderTestSummary rows for one READY test, kept by a fake connection across requests."""
+  rows = []
+  metrics = [dict(METRIC)]
+
+  def responder(query, params):
+    if 'FROM "BinderTestSummary"' in query and "ORDER BY" in query:
+      return [max(rows, key=lambda r: r["version"])] if rows else []
+    if 'INSERT INTO "BinderTestSummary"' in query:
+      rows.append(
+        {"id": params[0], "version": params[2], "doiLikeId": params[3], "derivedFromMetricsHash": params[8]}
+      )
+    return []
+
+  monkeypatch.setattr(main, "_load_binder_test_basic", lambda uow, test_id: {"id": test_id, "lifecycleStatus": "READY"})
+  monkeypatch.setattr(main, "_load_confirmed_metrics", lambda uow, test_id: [dict(m) for m in metrics])
+  monkeypatch.setattr(main, "_read_derived_results", lambda uow, test_id: None)
+  monkeypatch.setattr(main, "_derived_results_or_none", lambda uow, test_id, metrics=None: None)
+  monkeypatch.setattr(main, "_summary_storage", lambda uow, test_id, prev, summary_json: (summary_json, None))
+  conns = fakedb.install(monkeypatch, responder)
+  return {"rows": rows, "metrics": metrics, "conns": conns, "client": TestClient(main.app)}
+
+
+def _post(summaries, **params):
+  response = summaries["client"].post("/binder-tests/bt-12345678/summaries", params=params)
+  assert response.status_code == 200
+  return response.json()
+
+
+def test_repeat_post_with_unchanged_metrics_returns_existing_version(summaries):
+  first = _post(summaries)
+  assert first["created"] is True and first["version"] == 1
+  again = _post(summaries)
+  assert again == {**first, "created": False}
+  assert len(summaries["rows"]) == 1
+  assert summaries["conns"][-1].commits == 0 and summaries["conns"][-1].rollbacks >= 1
+
+
+def test_force_and_changed_metrics_create_new_versions(summaries):
+  _post(summaries)
+  forced = _post(summaries, force="true")
+  assert forced["created"] is True and forced["version"] == 2
+  summaries["metrics"][0]["value"] = 1.5
+  changed = _post(summaries)
+  assert changed["created"] is True and changed["version"] == 3
+  assert [r["version"] for r in summaries["rows"]] == [1, 2, 3]
+  assert len({r["derivedFromMetricsHash"] for r in summaries["rows"]}) == 2
+
+
+def test_version_is_read_and_written_under_the_advisory_lock(summaries):
+  _post(summaries)
+  _post(summaries, force="true")
+  conn = summaries["conns"][-1]
+  statements = [query for query, _, _ in conn.executed]
+  lock = next(i for i, q in enumerate(statements) if "pg_advisory_xact_lock" in q)
+  latest = next(i for i, q in enumerate(statements) if 'FROM "BinderTestSummary"' in q)
+  insert = next(i for i, q in enumerate(statements) if 'INSERT INTO "BinderTestSummary"' in q)
+  assert lock < latest < insert
+  lock_params = conn.executed[lock][1]
+  assert lock_params == (main.SUMMARY_LOCK_NAMESPACE, "bt-12345678")
+  # The transaction (and with it the xact lock) ends only after the insert is committed.
+  assert conn.commits == 1
@@ -0,0 +1,127 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import uploads
+from uploads import CsvColumnReader, MultipartColumnUpload, UploadTooLarge
+
+BOUNDARY = "ecolab-test-boundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def _multipart(data: bytes, filename="sweep.csv", part_type="text/csv", name="file") -> bytes:
+  return (
+    f"--{BOUNDARY}\r\n"
+    f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+    f"Content-Type: {part_type}\r\n\r\n"
+  ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _upload(body: bytes, fields, mapping=None, skip_rows=0, chunk=7):
+  upload = MultipartColumnUpload(CONTENT_TYPE, fields, mapping or {}, skip_rows)
+  for start in range(0, len(body), chunk):
+    upload.write(body[start : start + chunk])
+  return upload.finish()
+
+
+def test_unit_rows_and_blanks_are_skipped():
+  csv = b"Temp,G*\n\xc2\xb0C,kPa\n52,3.5\n,\n58,2.25\nn/a,1.0\n64,1.0\n"
+  columns = _upload(_multipart(csv), ["x", "y"])
+  np.testing.assert_array_equal(columns["x"], [52.0, 58.0, 64.0])
+  np.testing.assert_array_equal(columns["y"], [3.5, 2.25, 1.0])
+
+
+def test_columns_map_by_explicit_name_then_field_name_then_position():
+  csv = b"Time,Y,Temperature (C)\n1,10,52\n2,20,58\n"
+  columns = _upload(_multipart(csv), ["x", "y"], {"x": " temperature (c) ", "y": None})
+  np.testing.assert_array_equal(columns["x"], [52.0, 58.0])
+  np.testing.assert_array_equal(columns["y"], [10.0, 20.0])
+  by_position = _upload(_multipart(csv), ["a", "b"])
+  np.testing.assert_array_equal(by_position["a"], [1.0, 2.0])
+  with pytest.raises(ValueError, match="not found"):
+    _upload(_multipart(csv), ["x", "y"], {"x": "Pressure"})
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_delimiter_is_sniffed_from_the_header(delimiter):
+  csv = delimiter.join(["x", "y"]).encode() + b"\n" + delimiter.join(["1.5", "2"]).encode() + b"\n"
+  columns = _upload(_multipart(csv, filename="sweep.tsv"), ["x", "y"])
+  assert columns["x"].tolist() == [1.5] and columns["y"].tolist() == [2.0]
+
+
+def test_preamble_lines_are_skipped():
+  csv = b"Instrument: DSR-1\nOperator: lab\nx,y\n1,2\n3,4\n"
+  columns = _upload(_multipart(csv), ["x", "y"], skip_rows=2)
+  assert columns["x"].tolist() == [1.0, 3.0]
+
+
+def test_large_csv_is_parsed_in_batches(monkeypatch):
+  monkeypatch.setattr(uploads, "CSV_PARSE_CHUNK_BYTES", 64)
+  reader = CsvColumnReader(["x", "y"], {})
+  reader.feed(b"x,y\n")
+  for i in range(200):
+    reader.feed(f"{i},{i * 2}\n".encode())
+  columns = reader.close()
+  assert columns["x"].size == 200 and columns["y"][-1] == 398.0
+
+
+def test_xlsx_part_is_read_after_spooling():
+  openpyxl = pytest.importorskip("openpyxl")
+  workbook = openpyxl.Workbook()
+  sheet = workbook.active
+  for row in (["x", "y"], ["unit", "unit"], [1, 2], [3, 4]):
+    sheet.append(row)
+  data = io.BytesIO()
+  workbook.save(data)
+  body = _multipart(data.getvalue(), filename="sweep.xlsx", part_type="application/octet-stream")
+  columns = _upload(body, ["x", "y"], chunk=4096)
+  assert columns["x"].tolist() == [1.0, 3.0] and columns["y"].tolist() == [2.0, 4.0]
+
+
+def test_upload_too_large_stops_reading(monkeypatch):
+  monkeypatch.setattr(uploads, "UPLOAD_MAX_BYTES", 32)
+  upload = MultipartColumnUpload(CONTENT_TYPE, ["x"], {})
+  with pytest.raises(UploadTooLarge):
+    upload.write(_multipart(b"x\n" + b"1\n" * 40))
+
+
+@pytest.mark.parametrize(
+  "content_type", ["application/json", "multipart/form-data", "text/csv; boundary=x"]
+)
+def test_non_multipart_content_type_is_rejected(content_type):
+  with pytest.raises(ValueError):
+    MultipartColumnUpload(content_type, ["x"], {})
+
+
+def test_missing_file_part_and_unsupported_type():
+  with pytest.raises(ValueError, match="no 'file' part"):
+    _upload(_multipart(b"1,2\n", name="other"), ["x", "y"])
+  with pytest.raises(ValueError, match="Unsupported upload type"):
+    _upload(_multipart(b"%PDF", filename="report.pdf", part_type="application/pdf"), ["x", "y"])
+
+
+def test_trendline_upload_endpoint():
+  client = TestClient(main.app)
+  csv = b"Temperature,Stiffness\nC,kPa\n0,1\n1,3\n2,5\n"
+  response = client.post(
+    "/compute/trendline/upload",
+    params={"xColumn": "Temperature", "yColumn": "Stiffness"},
+    content=_multipart(csv),
+    headers={"content-type": CONTENT_TYPE},
+  )
+  assert response.status_code == 200
+  assert response.json()["slope"] == pytest.approx(2.0)
+
+
+def test_upload_endpoint_error_statuses(monkeypatch):
+  client = TestClient(main.app)
+  bad_type = client.post("/compute/trendline/upload", content=b"x,y\n1,2\n", headers={"content-type": "text/csv"})
+  assert bad_type.status_code == 400
+  monkeypatch.setattr(uploads, "UPLOAD_MAX_BYTES", 16)
+  too_large = client.post(
+    "/compute/trendline/upload", content=_multipart(b"x,y\n1,2\n3,4\n"), headers={"content-type": CONTENT_TYPE}
+  )
+  assert too_large.status_code == 413
@@ -0,0 +1,38 @@
+from services.workup import DEFAULT_SHEAR_RATE, run_workup
+
+
+def _metric(metric_type, value, temperature, position=None, frequency=None):
+  return {
+    "metricType": metric_type,
+    "value": value,
+    "temperature": temperature,
+    "position": position,
+    "frequency": frequency,
+  }
+
+
+def test_viscosity_reports_only_measurements():
+  result = run_workup([_metric("G*", 1.2, 64, "Original")], None)
+  assert result["viscosity"] == []
+
+
+def test_viscosity_ignores_frequency_and_averages_repeats():
+  metrics = [
+    _metric("Viscosity", 400.0, 135, frequency=10.0),
+    _metric("Rotational Viscosity", 500.0, 135),
+    _metric("Viscosity", None, 165),
+  ]
+  (point,) = run_workup(metrics, None)["viscosity"]
+  assert point["temperature"] == 135.0
+  assert point["measured"] == 450.0
+  assert point["shearRate"] == DEFAULT_SHEAR_RATE
+
+
+def test_pg_grade_needs_an_explicit_original_position():
+  metrics = [
+    _metric("G*/sin δ", 1.5, 64),
+    _metric("G*/sin δ", 2.5, 64, "RTFO"),
+  ]
+  assert run_workup(metrics, None)["pg"] is None
+  metrics.append(_metric("G*/sin δ", 1.5, 64, "Unaged"))
+  assert run_workup(metrics, None)["pg"] == {"pgHigh": 64.0, "temperatures": [64.0]}
@@ -0,0 +1,261 @@
+import io
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+try:
+  import openpyxl
+except ImportError:  # Excel uploads are optional
+  openpyxl = None
+
+UPLOAD_MAX_BYTES = int(os.environ.get("COMPUTE_UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+CSV_PARSE_CHUNK_BYTES = 1024 * 1024
+EXCEL_ROW_CHUNK = 10_000
+EXCEL_SPOOL_BYTES = 8 * 1024 * 1024
+CSV_EXTENSIONS = (".csv", ".tsv", ".txt")
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+class UploadTooLarge(ValueError):
+  pass
+
+
+class ColumnBuffer:
+  """Growable float64 array; appends amortise to O(1) by doubling capacity."""
+
+  def __init__(self, capacity: int = 4096):
+    self._data = np.empty(capacity, dtype=np.float64)
+    self._size = 0
+
+  def extend(self, values: np.ndarray) -> None:
+    needed = self._size + values.size
+    if needed > self._data.size:
+      grown = np.empty(max(needed, self._data.size * 2), dtype=np.float64)
+      grown[: self._size] = self._data[: self._size]
+      self._data = grown
+    self._data[self._size : needed] = values
+    self._size = needed
+
+  def values(self) -> np.ndarray:
+    return self._data[: self._size]
+
+
+def _resolve_columns(header: List[str], fields: List[str], mapping: Dict[str, Optional[str]]) -> List[int]:
+  """Explicit header names win, then a case-insensitive match on the field name, then position."""
+  lowered = [h.strip().lower() for h in header]
+  positions = []
+  for index, field in enumerate(fields):
+    wanted = mapping.get(field)
+    if wanted is not None:
+      if wanted.strip().lower() not in lowered:
+        raise ValueError(f"Column {wanted!r} not found; available: {', '.join(header)}")
+      positions.append(lowered.index(wanted.strip().lower()))
+    elif field.lower() in lowered:
+      positions.append(lowered.index(field.lower()))
+    elif index < len(header):
+      positions.append(index)
+    else:
+      raise ValueError(f"No column for {field!r}; available: {', '.join(header)}")
+  return positions
+
+
+class _ColumnSink:
+  """Shared row handling: non-numeric cells (unit rows, blanks) drop the whole row."""
+
+  def __init__(self, fields: List[str], mapping: Dict[str, Optional[str]], skip_rows: int):
+    self.fields = fields
+    self.mapping = mapping
+    self.skip_rows = skip_rows
+    self.positions: Optional[List[int]] = None
+    self.buffers = {field: ColumnBuffer() for field in fields}
+
+  def _append(self, frame: pd.DataFrame) -> None:
+    numeric = frame.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    numeric = numeric[~np.isnan(numeric).any(axis=1)]
+    for column, field in enumerate(self.fields):
+      self.buffers[field].extend(numeric[:, column])
+
+  def columns(self) -> Dict[str, np.ndarray]:
+    columns = {field: buffer.values() for field, buffer in self.buffers.items()}
+    if not next(iter(columns.values())).size:
+      raise ValueError("Upload contains no numeric rows for the selected columns")
+    return columns
+
+
+class CsvColumnReader(_ColumnSink):
+  """Incremental CSV/TSV parser: complete lines are parsed in ~1 MB batches as bytes arrive."""
+
+  def __init__(self, fields: List[str], mapping: Dict[str, Optional[str]], skip_rows: int = 0):
+    super().__init__(fields, mapping, skip_rows)
+    self._pending = bytearray()
+    self._delimiter = ","
+
+  def feed(self, data: bytes) -> None:
+    self._pending += data
+    if self.positions is None:
+      self._read_header()
+    if self.positions is not None and len(self._pending) >= CSV_PARSE_CHUNK_BYTES:
+      cut = self._pending.rfind(b"\n") + 1
+      if cut:
+        self._parse(bytes(self._pending[:cut]))
+        del self._pending[:cut]
+
+  def close(self) -> Dict[str, np.ndarray]:
+    if self.positions is None:
+      self._pending += b"\n"
+      self._read_header()
+      if self.positions is None:
+        raise ValueError("Upload has no header row")
+    if self._pending.strip():
+      self._parse(bytes(self._pending))
+    self._pending.clear()
+    return self.columns()
+
+  def _read_header(self) -> None:
+    lines = self._pending.split(b"\n", self.skip_rows + 1)
+    if len(lines) <= self.skip_rows + 1:
+      return
+    header = lines[self.skip_rows].decode("utf-8-sig").rstrip("\r")
+    self._delimiter = max((",", ";", "\t"), key=header.count)
+    self.positions = _resolve_columns(header.split(self._delimiter), self.fields, self.mapping)
+    self._pending = bytearray(lines[-1])
+
+  def _parse(self, chunk: bytes) -> None:
+    options = dict(sep=self._delimiter, header=None, usecols=self.positions, encoding_errors="replace")
+    try:
+      frame = pd.read_csv(io.BytesIO(chunk), dtype=np.float64, **options)
+    except ValueError:
+      # Unit rows or stray text: fall back to per-cell coercion for this chunk only.
+      frame = pd.read_csv(io.BytesIO(chunk), dtype=str, **options)
+    self._append(frame[self.positions])
+
+
+def read_excel_columns(
+  fileobj,
+  fields: List[str],
+  mapping: Dict[str, Optional[str]],
+  skip_rows: int = 0,
+  sheet: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+  if openpyxl is None:
+    raise ValueError("openpyxl is required for Excel uploads")
+  workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+  try:
+    if sheet is not None and sheet not in workbook.sheetnames:
+      raise ValueError(f"Sheet {sheet!r} not found; available: {', '.join(workbook.sheetnames)}")
+    rows = workbook[sheet].iter_rows(values_only=True) if sheet else workbook.active.iter_rows(values_only=True)
+    sink = _ColumnSink(fields, mapping, skip_rows)
+    for _ in range(skip_rows):
+      next(rows, None)
+    header = next(rows, None)
+    if header is None:
+      raise ValueError("Upload has no header row")
+    sink.positions = _resolve_columns(["" if h is None else str(h) for h in header], fields, mapping)
+    batch = []
+    for row in rows:
+      batch.append([row[p] if p < len(row) else None for p in sink.positions])
+      if len(batch) >= EXCEL_ROW_CHUNK:
+        sink._append(pd.DataFrame(batch))
+        batch = []
+    if batch:
+      sink._append(pd.DataFrame(batch))
+    return sink.columns()
+  finally:
+    workbook.close()
+
+
+class MultipartColumnUpload:
+  """Feeds the "file" part of a multipart body to a column reader as it streams in.
+
+  CSV is parsed on the fly. XLSX is a zip whose directory sits at the end, so it is spooled
+  (memory, then disk past EXCEL_SPOOL_BYTES) and read row by row once the part completes.
+  """
+
+  def __init__(
+    self,
+    content_type: str,
+    fields: List[str],
+    mapping: Dict[str, Optional[str]],
+    skip_rows: int = 0,
+    sheet: Optional[str] = None,
+  ):
+    media, options = parse_options_header(content_type)
+    if media != b"multipart/form-data" or b"boundary" not in options:
+      raise ValueError("Expected a multipart/form-data upload with a 'file' part")
+    self.fields = fields
+    self.mapping = mapping
+    self.skip_rows = skip_rows
+    self.sheet = sheet
+    self.received = 0
+    self._headers: Dict[bytes, bytes] = {}
+    self._field = b""
+    self._value = b""
+    self._target = None
+    self._csv: Optional[CsvColumnReader] = None
+    self._excel = None
+    self._parser = MultipartParser(
+      options[b"boundary"],
+      {
+        "on_part_begin": self._on_part_begin,
+        "on_header_field": self._on_header_field,
+        "on_header_value": self._on_header_value,
+        "on_header_end": self._on_header_end,
+        "on_headers_finished": self._on_headers_finished,
+        "on_part_data": self._on_part_data,
+      },
+    )
+
+  def write(self, chunk: bytes) -> None:
+    self.received += len(chunk)
+    if self.received > UPLOAD_MAX_BYTES:
+      raise UploadTooLarge(f"Upload exceeds {UPLOAD_MAX_BYTES} bytes")
+    self._parser.write(chunk)
+
+  def finish(self) -> Dict[str, np.ndarray]:
+    self._parser.finalize()
+    if self._csv is not None:
+      return self._csv.close()
+    if self._excel is not None:
+      try:
+        self._excel.seek(0)
+        return read_excel_columns(self._excel, self.fields, self.mapping, self.skip_rows, self.sheet)
+      finally:
+        self._excel.close()
+    raise ValueError("Multipart body has no 'file' part")
+
+  def _on_part_begin(self) -> None:
+    self._headers = {}
+    self._target = None
+
+  def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+    self._field += data[start:end]
+
+  def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+    self._value += data[start:end]
+
+  def _on_header_end(self) -> None:
+    self._headers[self._field.lower()] = self._value
+    self._field = self._value = b""
+
+  def _on_headers_finished(self) -> None:
+    _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+    if disposition.get(b"name") != b"file" or self._csv is not None or self._excel is not None:
+      return
+    filename = disposition.get(b"filename", b"").decode(errors="replace").lower()
+    part_type = self._headers.get(b"content-type", b"").decode(errors="replace").lower()
+    if filename.endswith(EXCEL_EXTENSIONS) or "spreadsheetml" in part_type:
+      self._excel = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_BYTES)
+      self._target = self._excel.write
+    elif filename.endswith(CSV_EXTENSIONS) or part_type.startswith("text/") or not filename:
+      self._csv = CsvColumnReader(self.fields, self.mapping, self.skip_rows)
+      self._target = self._csv.feed
+    else:
+      raise ValueError("Unsupported upload type; expected CSV/TSV or XLSX")
+
+  def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+    if self._target is not None:
+      self._target(data[start:end])